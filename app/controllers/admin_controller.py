@@ -1,6 +1,15 @@
-from typing import Dict, Any, List
+import asyncio
+import os
+import random
+import re
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 from app.services.document_processor import DocumentProcessor
-from app.services.vector_service import VectorService
+from app.services.vector_service import VectorService, get_vector_service
+from app.services.federated_search_service import FederatedSearchService
+from app.services.ingestion_manifest import IngestionManifest
+from app.services.directory_watcher import DirectoryWatcher
+from app.core.config import settings
 from app.models.document import Document
 import logging
 
@@ -8,28 +17,49 @@ logger = logging.getLogger(__name__)
 
 class AdminController:
     def __init__(self):
-        self.document_processor = DocumentProcessor()
-        self.vector_service = VectorService()
+        # Mesma instância do RAGService: o que a carga indexa já aparece nas consultas
+        self.vector_service = get_vector_service()
+        # Tokenizer do encoder: chunking por tokens e estatísticas de truncamento
+        embedding_model = self.vector_service.embedding_model
+        self.document_processor = DocumentProcessor(
+            embedding_tokenizer=getattr(embedding_model, "tokenizer", None),
+            max_seq_length=getattr(embedding_model, "max_seq_length", None)
+        )
+        # Fontes federadas com "ingest": true recebem os mesmos chunks (outro modelo/coleção)
+        self.federated_search_service = (
+            FederatedSearchService(self.vector_service) if settings.federated_sources else None
+        )
+        # Hash de cada arquivo já indexado (cargas incrementais)
+        self.manifest = IngestionManifest(self._manifest_path(self.vector_service))
+        self._ingestion_lock = asyncio.Lock()
+        self.document_watcher: Optional[DirectoryWatcher] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        self.rebuild_status: Dict[str, Any] = {"status": "idle"}
         
     async def load_documents_from_directory(
         self, 
         directory_path: str,
-        validate_directory: bool = True
+        validate_directory: bool = True,
+        force_reindex: bool = False,
+        file_paths: Optional[List[str]] = None
     ) -> Dict[str, Any]:
         """
         LÓGICA DE NEGÓCIO: Carrega documentos de um diretório para o sistema RAG
         
-        PROCESSO COMPLETO:
+        PROCESSO COMPLETO (incremental):
         1. Validações de negócio
-        2. Carregamento e processamento de documentos
-        3. Divisão em chunks
-        4. Indexação no vector store
-        5. Cálculo de métricas
-        6. Logging de resultados
+        2. Comparação dos arquivos com o manifesto de ingestão (hash SHA-256)
+        3. Remoção dos chunks de arquivos alterados ou removidos
+        4. Carregamento, limpeza e divisão em chunks apenas dos arquivos novos/alterados
+        5. Indexação no vector store
+        6. Cálculo de métricas (chunks pulados, atualizados e removidos)
         
         Args:
             directory_path: Caminho para diretório com arquivos .txt
             validate_directory: Se deve validar se diretório existe
+            force_reindex: Reprocessa todos os arquivos, ignorando o manifesto
+            file_paths: Restringe a carga a esses arquivos (usado pelo watcher);
+                arquivos da lista que não existem mais têm seus chunks removidos
             
         Returns:
             Dict com métricas do carregamento realizado
@@ -38,41 +68,80 @@ class AdminController:
             AdminBusinessException: Para erros de negócio específicos
             Exception: Para erros técnicos inesperados
         """
+        if self._rebuild_in_progress():
+            raise AdminBusinessException(
+                "Reconstrução da coleção em andamento; tente novamente ao final",
+                error_code="REBUILD_IN_PROGRESS"
+            )
+        
         try:
             if validate_directory:
                 await self._validate_directory_path(directory_path)
             
-            documents = self.document_processor.load_documents_from_directory(directory_path)
+            # Carga via API e watcher não podem alterar o índice ao mesmo tempo
+            async with self._ingestion_lock:
+                self._sync_active_collection()
+                changes = self._detect_changes(directory_path, force_reindex, file_paths)
             
-            if not documents:
-                logger.warning(f"Nenhum documento encontrado em: {directory_path}")
-                return {
-                    "success": False,
-                    "message": f"Nenhum arquivo .txt encontrado em '{directory_path}'",
-                    "total_files": 0,
-                    "total_chunks": 0,
-                    "processing_details": []
-                }
+                chunks_deleted = 0
+                deleted_ids = set()
+                for file_path in changes["removed"]:
+                    chunks_deleted += await self._delete_file_chunks(file_path, deleted_ids)
+                    self.manifest.remove(file_path)
+            
+                # Chunks da versão anterior (ou de cargas antigas, sem manifesto) saem antes da nova indexação
+                for file_path in changes["new"] + changes["changed"]:
+                    chunks_deleted += await self._delete_file_chunks(file_path, deleted_ids)
+                chunks_deleted += await self._requeue_duplicate_holders(changes, deleted_ids)
             
-            processing_results = await self._process_documents_batch(documents)
+                documents = []
+                for file_path in changes["new"] + changes["changed"]:
+                    self.manifest.remove(file_path)
+                    document = self.document_processor.load_document(file_path)
+                    if document is not None:
+                        documents.append(document)
+            
+                processing_results = await self._process_documents_batch(documents, changes["hashes"])
+                self.vector_service.flush_indexes()
+                self.manifest.save()
         
-            total_chunks = sum(result["chunks_created"] for result in processing_results)
-            successful_files = sum(1 for result in processing_results if result["success"])
-            failed_files = len(processing_results) - successful_files
+                total_chunks = sum(result["chunks_created"] for result in processing_results)
+                successful_files = sum(1 for result in processing_results if result["success"])
+                failed_files = len(processing_results) - successful_files
+                chunks_skipped = sum(
+                    len(self.manifest.get(file_path)["chunk_ids"]) for file_path in changes["unchanged"]
+                )
             
-            result = {
-                "success": True,
-                "message": f"Carregamento concluído: {successful_files} arquivos processados com sucesso",
-                "total_files": len(documents),
-                "successful_files": successful_files,
-                "failed_files": failed_files,
-                "total_chunks": total_chunks,
-                "average_chunks_per_file": round(total_chunks / len(documents), 2),
-                "processing_details": processing_results,
-                "directory_processed": directory_path
-            }
+                logger.info(
+                    f"Carga incremental: {len(changes['new'])} novos, {len(changes['changed'])} alterados, "
+                    f"{len(changes['unchanged'])} sem alteração, {len(changes['removed'])} removidos"
+                )
             
-            return result
+                result = {
+                    "success": True,
+                    "message": (
+                        f"Carregamento concluído: {successful_files} arquivos processados com sucesso, "
+                        f"{len(changes['unchanged'])} sem alteração"
+                    ),
+                    "total_files": len(changes["hashes"]),
+                    "successful_files": successful_files,
+                    "failed_files": failed_files,
+                    "total_chunks": total_chunks,
+                    "average_chunks_per_file": round(total_chunks / len(documents), 2) if documents else 0,
+                    "files_new": len(changes["new"]),
+                    "files_changed": len(changes["changed"]),
+                    "files_unchanged": len(changes["unchanged"]),
+                    "files_removed": len(changes["removed"]),
+                    "chunks_skipped": chunks_skipped,
+                    "chunks_updated": sum(result["chunks_indexed"] for result in processing_results),
+                    "chunks_deleted": chunks_deleted,
+                    "deduplication": self._deduplication_report(processing_results),
+                    "chunking": self._chunking_report(processing_results),
+                    "processing_details": processing_results,
+                    "directory_processed": directory_path
+                }
+            
+                return result
             
         except Exception as e:
             logger.error(f"Erro durante carregamento de documentos: {str(e)}")
@@ -85,6 +154,129 @@ class AdminController:
                 "error": str(e)
             }
     
+    @staticmethod
+    def _manifest_path(vector_service: VectorService) -> str:
+        return os.path.join(vector_service.index_directory, "ingestion_manifest.json")
+    
+    def _sync_active_collection(self) -> None:
+        """Segue o alias da coleção e usa o manifesto da versão ativa"""
+        self.vector_service.refresh()
+        if self.manifest.path != self._manifest_path(self.vector_service):
+            self.manifest = IngestionManifest(self._manifest_path(self.vector_service))
+    
+    def _pipeline_fingerprint(self) -> str:
+        fingerprint = f"{settings.embedding_model}|{self.document_processor.pipeline_fingerprint()}"
+        if settings.dedup_enabled:
+            fingerprint += f"|dedup={settings.dedup_action}@{settings.dedup_threshold}"
+        return fingerprint
+    
+    def _detect_changes(
+        self,
+        directory_path: str,
+        force_reindex: bool,
+        file_paths: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Classifica os arquivos do diretório em novos, alterados, sem alteração e removidos"""
+        fingerprint = self._pipeline_fingerprint()
+        changes = {"new": [], "changed": [], "unchanged": [], "removed": [], "hashes": {}}
+        
+        if file_paths is None:
+            candidates = [
+                os.path.join(directory_path, filename)
+                for filename in sorted(os.listdir(directory_path)) if filename.endswith('.txt')
+            ]
+        else:
+            candidates = sorted(file_paths)
+        
+        for file_path in candidates:
+            if not os.path.exists(file_path):
+                if self.manifest.get(file_path) is not None:
+                    changes["removed"].append(file_path)
+                continue
+            file_hash = self.manifest.file_hash(file_path)
+            changes["hashes"][os.path.abspath(file_path)] = file_hash
+            
+            if self.manifest.get(file_path) is None:
+                changes["new"].append(file_path)
+            elif force_reindex or not self.manifest.is_unchanged(file_path, file_hash, fingerprint):
+                changes["changed"].append(file_path)
+            else:
+                changes["unchanged"].append(file_path)
+        
+        if file_paths is None:
+            changes["removed"] = [
+                path for path in self.manifest.files_in(directory_path) if path not in changes["hashes"]
+            ]
+        return changes
+    
+    async def _delete_file_chunks(self, file_path: str, deleted_ids: Optional[set] = None) -> int:
+        entry = self.manifest.get(file_path)
+        chunk_ids = entry["chunk_ids"] if entry else self.vector_service.get_chunk_ids_by_file(file_path)
+        if not chunk_ids:
+            return 0
+        if deleted_ids is not None:
+            deleted_ids.update(chunk_ids)
+        if self.federated_search_service is not None:
+            self.federated_search_service.delete_documents(chunk_ids)
+        return await self.vector_service.delete_documents(chunk_ids)
+    
+    async def _requeue_duplicate_holders(self, changes: Dict[str, Any], deleted_ids: set) -> int:
+        """Reprocessa arquivos cujos chunks foram descartados como duplicatas de chunks que acabaram de ser apagados
+
+        Sem isso, o conteúdo deles sumiria do índice junto com o chunk mantido.
+        """
+        processing = {os.path.abspath(path) for path in changes["new"] + changes["changed"] + changes["removed"]}
+        chunks_deleted = 0
+        for file_path in self.manifest.files_with_duplicates_of(deleted_ids):
+            if file_path in processing or not os.path.exists(file_path):
+                continue
+            changes["unchanged"] = [path for path in changes["unchanged"] if os.path.abspath(path) != file_path]
+            changes["changed"].append(file_path)
+            changes["hashes"][file_path] = self.manifest.file_hash(file_path)
+            chunks_deleted += await self._delete_file_chunks(file_path, deleted_ids)
+        return chunks_deleted
+    
+    def _deduplication_report(self, processing_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Redução do índice obtida com o descarte de chunks quase duplicados nesta carga"""
+        created = sum(result["chunks_created"] for result in processing_results)
+        duplicates = sum(result.get("chunks_duplicate", 0) for result in processing_results)
+        return {
+            "enabled": settings.dedup_enabled,
+            "action": settings.dedup_action,
+            "threshold": settings.dedup_threshold,
+            "chunks_created": created,
+            "chunks_duplicate": duplicates,
+            "index_size_reduction_pct": round(100 * duplicates / created, 2) if created else 0.0,
+            "vector_bytes_saved": duplicates * self.vector_service.embedding_model.get_sentence_embedding_dimension() * 4
+        }
+    
+    def _chunking_report(self, processing_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Tamanho dos chunks em tokens do encoder e quantos foram truncados no embedding"""
+        processor = self.document_processor
+        report = {
+            "mode": processor.chunking_mode,
+            "chunk_size": processor.chunk_size,
+            "chunk_overlap": processor.chunk_overlap,
+            "max_seq_length": processor.max_seq_length
+        }
+        stats = [result["token_stats"] for result in processing_results if result.get("token_stats")]
+        chunks = sum(item["chunks"] for item in stats)
+        if not chunks:
+            return report
+        truncated = sum(item["chunks_truncated"] for item in stats)
+        mean_tokens = sum(item["tokens_total"] for item in stats) / chunks
+        report.update(
+            chunks=chunks,
+            tokens_mean=round(mean_tokens, 1),
+            tokens_max=max(item["tokens_max"] for item in stats),
+            chunks_truncated=truncated,
+            chunks_truncated_pct=round(100 * truncated / chunks, 2),
+            tokens_truncated=sum(item["tokens_truncated"] for item in stats),
+            # Fração da janela do encoder efetivamente usada por chunk
+            sequence_utilization=round(min(mean_tokens, processor.max_seq_length) / processor.max_seq_length, 4)
+        )
+        return report
+    
     async def _validate_directory_path(self, directory_path: str) -> None:
         import os
         
@@ -107,7 +299,17 @@ class AdminController:
                 error_code="NO_TXT_FILES"
             )
         
-    async def _process_documents_batch(self, documents: List[Document]) -> List[Dict[str, Any]]:
+    async def _process_documents_batch(
+        self,
+        documents: List[Document],
+        file_hashes: Optional[Dict[str, str]] = None,
+        vector_service: Optional[VectorService] = None,
+        manifest: Optional[IngestionManifest] = None
+    ) -> List[Dict[str, Any]]:
+        # A reconstrução blue/green grava em outra coleção, com manifesto próprio
+        target = vector_service or self.vector_service
+        if manifest is None:
+            manifest = self.manifest
         processing_results = []
         
         for i, document in enumerate(documents, 1):
@@ -117,10 +319,32 @@ class AdminController:
                 chunked_docs = self.document_processor.chunk_document(document)
                 # Indexar cada chunk no vector store
                 chunks_indexed = 0
+                chunk_ids = []
+                indexed_chunks = []
+                duplicate_of = []
                 for chunk in chunked_docs:
-                    chunk_id = await self.vector_service.add_document(chunk)
+                    # Quase duplicata de um chunk já indexado: não gera outro vetor
+                    duplicate = target.find_near_duplicate(chunk)
+                    if duplicate is not None:
+                        if settings.dedup_action == "merge":
+                            target.merge_duplicate(duplicate[0], chunk)
+                        duplicate_of.append(duplicate[0])
+                        continue
+                    chunk_id = await target.add_document(chunk)
                     if chunk_id:
                         chunks_indexed += 1
+                        chunk_ids.append(chunk_id)
+                        indexed_chunks.append(chunk)
+
+                # Fontes federadas não são versionadas: só a carga normal replica os chunks
+                if self.federated_search_service is not None and chunk_ids and vector_service is None:
+                    self.federated_search_service.add_documents(indexed_chunks, chunk_ids)
+
+                file_path = os.path.abspath(document.metadata.get("file_path", ""))
+                if file_hashes and file_path in file_hashes:
+                    manifest.set(
+                        file_path, file_hashes[file_path], self._pipeline_fingerprint(), chunk_ids, duplicate_of
+                    )
                 
                 result = {
                     "document_title": document.title,
@@ -128,6 +352,8 @@ class AdminController:
                     "success": True,
                     "chunks_created": len(chunked_docs),
                     "chunks_indexed": chunks_indexed,
+                    "chunks_duplicate": len(duplicate_of),
+                    "token_stats": self.document_processor.token_stats([chunk.content for chunk in chunked_docs]),
                     "file_source": document.metadata.get("source_file", "unknown")
                 }
                 
@@ -145,8 +371,205 @@ class AdminController:
                 }
             
             processing_results.append(result)
+            # Libera o event loop entre documentos: consultas continuam sendo atendidas em cargas longas
+            await asyncio.sleep(0)
         
         return processing_results
+
+    def start_document_watcher(self, directory_path: str) -> None:
+        """Inicia o watcher que indexa automaticamente arquivos novos, alterados e removidos"""
+        if self.document_watcher is not None:
+            return
+        self.document_watcher = DirectoryWatcher(
+            directory=directory_path,
+            on_change=lambda file_paths: self._sync_watched_files(directory_path, file_paths),
+            interval=settings.document_watcher_interval,
+            debounce=settings.document_watcher_debounce
+        )
+        self.document_watcher.start()
+
+    async def stop_document_watcher(self) -> None:
+        if self.document_watcher is not None:
+            await self.document_watcher.stop()
+            self.document_watcher = None
+
+    async def _sync_watched_files(self, directory_path: str, file_paths: Optional[List[str]]) -> Dict[str, Any]:
+        result = await self.load_documents_from_directory(
+            directory_path, validate_directory=False, file_paths=file_paths
+        )
+        if not result.get("success"):
+            raise RuntimeError(result.get("message"))
+        return result
+
+    def get_watcher_stats(self) -> Dict[str, Any]:
+        """Estado do watcher e latência entre salvar um arquivo e ele ficar pesquisável"""
+        if self.document_watcher is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.document_watcher.stats()}
+
+    def _rebuild_in_progress(self) -> bool:
+        return self._rebuild_task is not None and not self._rebuild_task.done()
+
+    async def start_rebuild(self, directory_path: str) -> Dict[str, Any]:
+        """
+        LÓGICA DE NEGÓCIO: Reconstrução blue/green da coleção
+
+        PROCESSO:
+        1. Cria uma coleção versionada nova (`<alias>_vAAAAMMDDHHMMSS`)
+        2. Indexa o diretório inteiro nela em segundo plano, enquanto as
+           consultas continuam na versão atual
+        3. Valida contagens e consultas de amostra
+        4. Troca o alias atomicamente; processos que servem consultas passam
+           a usar a nova versão na próxima requisição, sem reiniciar
+
+        Cargas incrementais e o watcher ficam bloqueados (REBUILD_IN_PROGRESS)
+        até o fim da reconstrução.
+        """
+        if self._rebuild_in_progress():
+            raise AdminBusinessException(
+                f"Reconstrução já em andamento: {self.rebuild_status.get('target')}",
+                error_code="REBUILD_IN_PROGRESS"
+            )
+        if self.vector_service.shard_pool is not None:
+            raise AdminBusinessException(
+                "Reconstrução blue/green não é suportada com VECTOR_SHARDS > 1",
+                error_code="REBUILD_UNSUPPORTED"
+            )
+        await self._validate_directory_path(directory_path)
+
+        target = f"{settings.chroma_collection_name}_v{datetime.now():%Y%m%d%H%M%S}"
+        self.rebuild_status = {
+            "status": "building",
+            "alias": settings.chroma_collection_name,
+            "source": self.vector_service.collection_name,
+            "target": target,
+            "directory": directory_path,
+            "started_at": datetime.now().isoformat()
+        }
+        self._rebuild_task = asyncio.create_task(self._run_rebuild(directory_path, target))
+        return dict(self.rebuild_status)
+
+    async def _run_rebuild(self, directory_path: str, target: str) -> None:
+        try:
+            async with self._ingestion_lock:
+                self._sync_active_collection()
+                builder = VectorService(collection_name=target, base=self.vector_service)
+                manifest = IngestionManifest(self._manifest_path(builder))
+
+                documents, file_hashes = [], {}
+                for filename in sorted(os.listdir(directory_path)):
+                    if not filename.endswith('.txt'):
+                        continue
+                    file_path = os.path.join(directory_path, filename)
+                    file_hash = manifest.file_hash(file_path)
+                    document = self.document_processor.load_document(file_path)
+                    if document is not None:
+                        documents.append(document)
+                        file_hashes[os.path.abspath(file_path)] = file_hash
+
+                processing_results = await self._process_documents_batch(documents, file_hashes, builder, manifest)
+                builder.flush_indexes()
+                manifest.save()
+
+                self.rebuild_status["status"] = "validating"
+                validation = await self._validate_rebuild(builder, manifest, documents, processing_results)
+                self.rebuild_status["validation"] = validation
+                if not validation["passed"]:
+                    builder.drop_collection_version(target)
+                    self.rebuild_status.update(
+                        status="failed",
+                        message=f"Validação reprovada; alias mantido em '{self.vector_service.collection_name}'"
+                    )
+                    return
+
+                swap = self.vector_service.alias.swap(settings.chroma_collection_name, target)
+                self._sync_active_collection()
+                self.rebuild_status.update(
+                    status="completed",
+                    message=f"Alias '{settings.chroma_collection_name}' aponta para '{target}'",
+                    previous=swap["previous"],
+                    swapped_at=swap["swapped_at"],
+                    dropped_versions=self._drop_old_versions()
+                )
+                logger.info(f"Reconstrução concluída: {swap['previous']} -> {target}")
+
+        except Exception as e:
+            logger.error(f"Erro durante reconstrução da coleção: {str(e)}")
+            self.rebuild_status.update(status="failed", message=f"Erro durante reconstrução: {str(e)}")
+        finally:
+            self.rebuild_status["finished_at"] = datetime.now().isoformat()
+
+    async def _validate_rebuild(
+        self,
+        builder: VectorService,
+        manifest: IngestionManifest,
+        documents: List[Document],
+        processing_results: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Compara contagens e roda consultas de amostra na coleção nova antes da troca"""
+        new_chunks = builder.get_index_stats()["total_chunks"]
+        current_chunks = self.vector_service.get_index_stats()["total_chunks"]
+        # Chunks idênticos de um mesmo arquivo têm o mesmo id (e viram um único registro)
+        expected_chunks = len({
+            chunk_id for entry in manifest.files.values() for chunk_id in entry["chunk_ids"]
+        })
+        failed_files = sum(1 for result in processing_results if not result["success"])
+
+        # Consulta = início do documento: a coleção nova deve trazer o próprio documento no top-k
+        sample = random.Random(0).sample(documents, min(settings.rebuild_validation_queries, len(documents)))
+        hits, overlaps = 0, []
+        for document in sample:
+            query = document.content[:300]
+            results = await builder.search_documents(query, limit=5)
+            current = await self.vector_service.search_documents(query, limit=5)
+            # Chunks do próprio arquivo ou os chunks mantidos no lugar das suas duplicatas
+            entry = manifest.get(document.metadata.get("file_path", "")) or {}
+            expected_ids = set(entry.get("chunk_ids", [])) | set(entry.get("duplicate_of", []))
+            hits += any(result.id in expected_ids for result in results)
+            if current:
+                overlaps.append(len({r.id for r in results} & {r.id for r in current}) / len(current))
+        hit_rate = hits / len(sample) if sample else 0.0
+
+        checks = {
+            "failed_files": {"passed": failed_files == 0, "value": failed_files},
+            "chunk_count": {"passed": new_chunks == expected_chunks, "expected": expected_chunks, "indexed": new_chunks},
+            "count_vs_current": {
+                "passed": new_chunks >= (1 - settings.rebuild_max_count_drop) * current_chunks,
+                "current": current_chunks,
+                "new": new_chunks,
+                "max_drop": settings.rebuild_max_count_drop
+            },
+            "sample_queries": {
+                "passed": hit_rate >= settings.rebuild_min_hit_rate,
+                "queries": len(sample),
+                "hit_rate": round(hit_rate, 4),
+                "min_hit_rate": settings.rebuild_min_hit_rate,
+                "overlap_with_current": round(sum(overlaps) / len(overlaps), 4) if overlaps else None
+            }
+        }
+        return {"passed": all(check["passed"] for check in checks.values()), "checks": checks}
+
+    def _drop_old_versions(self) -> List[str]:
+        """Apaga versões antigas além de REBUILD_KEEP_VERSIONS (a atual e a anterior nunca são apagadas)"""
+        alias = settings.chroma_collection_name
+        pattern = re.compile(rf"^{re.escape(alias)}_v\d{{14}}$")
+        versions = sorted(
+            (name for name in self.vector_service.collection_names() if pattern.match(name)), reverse=True
+        )
+        keep = {self.vector_service.collection_name, self.vector_service.alias.previous(alias)}
+        dropped = [
+            name for name in versions[max(settings.rebuild_keep_versions, 0):] if name not in keep
+        ]
+        for name in dropped:
+            self.vector_service.drop_collection_version(name)
+        return dropped
+
+    def get_rebuild_status(self) -> Dict[str, Any]:
+        return {**self.rebuild_status, "active_collection": self.vector_service.collection_name}
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Estatísticas do índice vetorial em uso (tamanho, métrica, memória)"""
+        return self.vector_service.get_index_stats()
     
 
 class AdminBusinessException(Exception):
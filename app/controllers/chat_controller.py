@@ -3,7 +3,10 @@
 
 from typing import Dict, Any, Optional
 from app.services.rag_service import RAGService
-from app.models.document import QuestionRequest
+from app.services.federated_search_service import FederatedSearchService
+from app.services.llm_scheduler import LLMOverloadedError
+from app.services.llm_resilience import LLMUnavailableError
+from app.models.document import QuestionRequest, FederatedSearchRequest
 import logging
 from datetime import datetime
 
@@ -26,6 +29,7 @@ class ChatController:
     
     def __init__(self):
         self.rag_service = RAGService()
+        self.federated_search_service = FederatedSearchService(self.rag_service.vector_service)
     
     async def process_question(
         self, 
@@ -57,6 +61,7 @@ class ChatController:
                 question=question_request.question,
                 max_documents=question_request.max_documents,
                 category_filter=question_request.category_filter,
+                search_mode=question_request.search_mode,
                 save_interaction=save_interaction
             )
             
@@ -65,6 +70,14 @@ class ChatController:
         except ChatBusinessException as e:
             logger.error(f"Erro de negócio RAG: {e.message}")
             return self._create_error_response(e.message, "BUSINESS_ERROR", session_start)
+
+        except LLMOverloadedError as e:
+            logger.warning(f"Pergunta recusada pela fila do LLM: {e.message}")
+            raise ChatBusinessException(e.message, error_code=e.error_code, retry_after=e.retry_after)
+
+        except LLMUnavailableError as e:
+            logger.error(f"LLM indisponível: {e.message}")
+            raise ChatBusinessException(e.message, error_code=e.error_code, retry_after=e.retry_after)
             
         except Exception as e:
             logger.error(f"Erro técnico RAG: {str(e)}")
@@ -75,6 +88,52 @@ class ChatController:
                 technical_details=str(e)
             )
     
+    async def federated_search(self, search_request: FederatedSearchRequest) -> Dict[str, Any]:
+        """
+        LÓGICA DE NEGÓCIO: Busca federada em várias coleções/modelos (sem geração)
+
+        Cada fonte configurada em FEDERATED_SOURCES é consultada em paralelo
+        com timeout próprio; os rankings são fundidos via RRF.
+        """
+        if not self.federated_search_service.sources:
+            raise ChatBusinessException(
+                "Nenhuma fonte federada configurada (FEDERATED_SOURCES)",
+                error_code="NO_FEDERATED_SOURCES"
+            )
+
+        if not search_request.query or len(search_request.query.strip()) < 3:
+            raise ChatBusinessException(
+                "Consulta muito curta - mínimo 3 caracteres",
+                error_code="QUESTION_TOO_SHORT"
+            )
+
+        if search_request.limit < 1 or search_request.limit > 20:
+            raise ChatBusinessException(
+                "limit deve estar entre 1 e 20",
+                error_code="INVALID_MAX_DOCUMENTS"
+            )
+
+        known = {source["name"] for source in self.federated_search_service.sources}
+        unknown = set(search_request.sources or []) - known
+        if unknown:
+            raise ChatBusinessException(
+                f"Fontes federadas desconhecidas: {', '.join(sorted(unknown))}",
+                error_code="UNKNOWN_FEDERATED_SOURCE"
+            )
+
+        response = await self.federated_search_service.search(
+            query=search_request.query,
+            limit=search_request.limit,
+            category_filter=search_request.category_filter,
+            source_names=search_request.sources
+        )
+
+        for source in response["search_metadata"]["sources"]:
+            if source["status"] != "ok":
+                logger.warning(f"Fonte federada '{source['name']}' {source['status']}: {source.get('error')}")
+
+        return response
+
     def _validate_question_request(self, request: QuestionRequest) -> None:
         """Validações de negócio para requests de pergunta"""
     
@@ -102,6 +161,12 @@ class ChatController:
                 error_code="INVALID_MAX_DOCUMENTS"
             )
 
+        if request.search_mode not in (None, "dense", "hybrid", "hierarchical"):
+            raise ChatBusinessException(
+                "search_mode deve ser 'dense', 'hybrid' ou 'hierarchical'",
+                error_code="INVALID_SEARCH_MODE"
+            )
+
     
     def _get_no_context_recommendation(self) -> str:
         """Recomendação de negócio quando não há contexto relevante"""
@@ -140,7 +205,8 @@ class ChatController:
 class ChatBusinessException(Exception):
     """Exceção para erros de lógica de negócio em operações de chat/RAG"""
     
-    def __init__(self, message: str, error_code: str = "CHAT_ERROR"):
+    def __init__(self, message: str, error_code: str = "CHAT_ERROR", retry_after: Optional[float] = None):
         self.message = message
         self.error_code = error_code
+        self.retry_after = retry_after
         super().__init__(message)
\ No newline at end of file
@@ -1,7 +1,9 @@
 from typing import Dict, Any, List, Optional
 from app.services.ragas_service import ragas_service
+from app.services.llm_scheduler import LLMOverloadedError
 from app.services.database_service import AsyncSessionLocal
 from app.services.phoenix_service import phoenix_service
+from app.services.interaction_analytics import interaction_analytics, DIMENSIONS, METRICS, TIME_BUCKETS
 from app.models.rag_interaction import RAGInteractionDB, RAGASEvaluation, UserFeedback
 from sqlalchemy import select, desc, func
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -74,6 +76,10 @@ class EvaluationController:
         except EvaluationBusinessException as e:
             logger.error(f"Erro de negócio RAGAS: {e.message}")
             return self._create_evaluation_error_response(e.message, e.error_code, evaluation_start)
+
+        except LLMOverloadedError as e:
+            logger.warning(f"Avaliação RAGAS recusada pela fila do LLM: {e.message}")
+            return self._create_evaluation_error_response(e.message, e.error_code, evaluation_start)
             
         except Exception as e:
             logger.error(f"Erro técnico RAGAS: {str(e)}")
@@ -203,6 +209,59 @@ class EvaluationController:
                 "ADVANCED_METRICS_ERROR"
             )
 
+    async def get_performance_analytics(
+        self,
+        group_by: str = "time",
+        metric: str = "response_time_ms",
+        bucket: str = "hour",
+        since_hours: Optional[float] = 24.0
+    ) -> Dict[str, Any]:
+        """
+        LÓGICA DE NEGÓCIO: Percentis de latência e tokens por grupo
+        
+        Responsável por:
+        - Validar dimensões (time, category, model...), métrica e balde de tempo
+        - Delegar o cálculo (feito no SQL) ao InteractionAnalytics
+        """
+        dimensions = [dimension.strip() for dimension in group_by.split(",") if dimension.strip()]
+        invalid = [d for d in dimensions if d != "time" and d not in DIMENSIONS]
+        if invalid or len(set(dimensions)) != len(dimensions):
+            raise EvaluationBusinessException(
+                f"group_by inválido: {group_by}. Use combinações de: time, {', '.join(DIMENSIONS)}",
+                "INVALID_ANALYTICS_PARAMS"
+            )
+        if metric not in METRICS:
+            raise EvaluationBusinessException(
+                f"Métrica inválida: {metric}. Use: {', '.join(METRICS)}",
+                "INVALID_ANALYTICS_PARAMS"
+            )
+        if bucket not in TIME_BUCKETS:
+            raise EvaluationBusinessException(
+                f"Balde de tempo inválido: {bucket}. Use: {', '.join(TIME_BUCKETS)}",
+                "INVALID_ANALYTICS_PARAMS"
+            )
+        if since_hours is not None and since_hours < 0:
+            raise EvaluationBusinessException("since_hours não pode ser negativo", "INVALID_ANALYTICS_PARAMS")
+        # 0 = todo o histórico
+        since_hours = since_hours or None
+
+        try:
+            groups = await interaction_analytics.performance(dimensions, metric, bucket, since_hours)
+        except Exception as e:
+            raise EvaluationBusinessException(
+                f"Erro ao calcular análise de desempenho: {str(e)}",
+                "ANALYTICS_ERROR"
+            )
+
+        return {
+            "group_by": dimensions,
+            "metric": metric,
+            "bucket": bucket if "time" in dimensions else None,
+            "since_hours": since_hours,
+            "total_interactions": sum(group["interactions"] for group in groups),
+            "groups": groups
+        }
+
     def _interpret_advanced_metrics(self, advanced_metrics: Dict[str, Any]) -> Dict[str, Any]:
         """Interpreta as métricas avançadas fornecendo insights de negócio"""
         interpretation = {}
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field
+from typing import List, Dict, Any
 import os
 class Settings(BaseSettings):
     chroma_host: str = "localhost"
@@ -9,7 +10,125 @@ class Settings(BaseSettings):
     chroma_persist_directory: str = "./chroma_data"
     openai_api_key: str = Field(default="", alias="OPENAI_API_KEY")
     
+    # Índice HNSW da coleção Chroma (aplicado apenas na criação da coleção)
+    chroma_distance_space: str = "cosine"
+    hnsw_m: int = 16
+    hnsw_construction_ef: int = 100
+    hnsw_search_ef: int = 64
+
+    # Modo do índice: "hnsw" (Chroma) ou "int8"/"binary" (quantizado + re-ranking float32)
+    vector_index_mode: str = "hnsw"
+    quantized_rerank_candidates: int = 100
+
+    # Uma coleção por categoria: consultas com category_filter vão direto à partição
+    category_partitioning: bool = False
+
+    # Roteamento automático por centróide de categoria (consultas sem category_filter)
+    category_routing: bool = False
+    category_routing_min_similarity: float = 0.3
+    category_routing_min_margin: float = 0.05
+    category_routing_audit_rate: float = 0.0
+
+    # Sharding: VECTOR_SHARDS > 1 distribui os chunks entre processos (hash do id)
+    vector_shards: int = 1
+    vector_shard_base_port: int = 8100
+    vector_shard_connections: int = 4
+    vector_shard_authkey: str = ""  # vazio = chave aleatória gravada no diretório dos shards (compartilhada pelos workers)
+
+    # Busca lexical BM25 e modo padrão de busca (dense | hybrid | hierarchical)
+    lexical_index_enabled: bool = True
+    default_search_mode: str = "dense"
+    hybrid_candidate_multiplier: int = 4
+    hybrid_rrf_k: int = 60
+    hybrid_lexical_weight: float = 1.0
+
+    # Busca hierárquica documento → chunk (search_mode=hierarchical)
+    document_index_enabled: bool = False
+    hierarchical_top_documents: int = 10
+    hierarchical_chunks_per_document: int = 2
+    hierarchical_title_weight: float = 0.3
+    hierarchical_category_weight: float = 0.1
+
+    # Cache de embeddings por (modelo, hash do texto) em segmentos .f32 (só acrescenta)
+    embedding_cache_enabled: bool = True
+    embedding_cache_shard_size: int = 8192
+
+    # Busca federada: lista JSON de fontes {"name", "collection", "model", "timeout"?, "weight"?, "ingest"?}
+    federated_sources: List[Dict[str, Any]] = []
+    federated_source_timeout: float = 2.0
+
+    # Watcher do diretório de documentos (indexação automática ao salvar arquivos)
+    document_watcher_enabled: bool = False
+    document_watcher_directory: str = "conteudo_ficticio"
+    document_watcher_interval: float = 1.0
+    document_watcher_debounce: float = 2.0
+
+    # Reconstrução blue/green: validação da coleção nova antes da troca do alias
+    rebuild_validation_queries: int = 20
+    rebuild_min_hit_rate: float = 0.8
+    rebuild_max_count_drop: float = 0.2
+    rebuild_keep_versions: int = 2
+
+    # Cliente Chroma: persistent (arquivos locais) | http (servidor em CHROMA_HOST:CHROMA_PORT)
+    chroma_client_mode: str = "persistent"
+    chroma_ssl: bool = False
+    chroma_http_timeout: float = 10.0
+    chroma_http_connect_timeout: float = 2.0
+    chroma_http_max_connections: int = 32
+    chroma_http_max_keepalive_connections: int = 16
+    chroma_http_keepalive_secs: float = 60.0
+    chroma_http_retries: int = 3
+    chroma_http_backoff: float = 0.1
+
+    # Chunking: characters (500/50 caracteres) | tokens (tokenizer do modelo de embedding)
+    chunking_mode: str = "characters"
+    chunk_max_tokens: int = 0  # 0 = max_seq_length do encoder menos [CLS]/[SEP]
+    chunk_overlap_tokens: int = 32
+
+    # Chunks quase duplicados (MinHash/LSH): drop descarta, merge descarta e registra a origem no chunk mantido
+    dedup_enabled: bool = False
+    dedup_threshold: float = 0.85
+    dedup_action: str = "merge"
+    dedup_num_perm: int = 128
+    dedup_shingle_size: int = 3
+
+    # Contexto do prompt: corte por salto de score, fusão de chunks vizinhos e orçamento de tokens
+    context_packing_enabled: bool = False
+    context_max_tokens: int = 2000
+    context_score_gap: float = 0.15
+    context_min_documents: int = 1
+
+    # Compressão extrativa do contexto: mantém as sentenças de cada chunk mais próximas da pergunta
+    context_compression_enabled: bool = False
+    context_compression_max_sentences: int = 3
+
+    # Perguntas idênticas simultâneas compartilham uma execução do pipeline (single-flight)
+    request_coalescing_enabled: bool = True
+
+    # Fila de chamadas ao LLM: limites de concorrência e orçamento de espera (s) por classe
+    llm_max_concurrency: int = 8
+    llm_interactive_concurrency: int = 8
+    llm_evaluation_concurrency: int = 2
+    llm_interactive_queue_budget: float = 10.0
+    llm_evaluation_queue_budget: float = 600.0
+
+    # Provedor do LLM: openai | openai_compatible (LLM_BASE_URL) | fake (benchmarks.fake_openai_server)
+    llm_provider: str = "openai"
+    llm_model: str = "gpt-3.5-turbo"
+    llm_base_url: str = ""
+    llm_api_key: str = ""
+    llm_temperature: float = 0.7
+    llm_streaming: bool = False
+
+    # Cliente do LLM: prazo por chamada (s), hedging após o percentil de latência (0 = desligado) e disjuntor
+    llm_timeout: float = 30.0
+    llm_max_retries: int = 2
+    llm_hedge_percentile: float = 0.0
+    llm_hedge_min_samples: int = 20
+    llm_circuit_failure_threshold: int = 5
+    llm_circuit_reset_timeout: float = 30.0
+
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
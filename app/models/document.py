@@ -21,6 +21,9 @@ class SearchRequest(BaseModel):
     limit: int = 5
     category_filter: Optional[str] = None
 
+class FederatedSearchRequest(SearchRequest):
+    sources: Optional[List[str]] = None
+
 class SearchResponse(BaseModel):
     model_config = ConfigDict(extra='allow')
     
@@ -38,6 +41,7 @@ class QuestionRequest(BaseModel):
     question: str
     max_documents: int = 5
     category_filter: Optional[str] = None
+    search_mode: Optional[str] = None
 
 class Source(BaseModel):
     id: int
@@ -58,4 +62,8 @@ class QuestionResponse(BaseModel):
     question: str
     has_context: bool
     search_results: Optional[List[SearchResult]] = None
+    context_packing: Optional[Dict[str, Any]] = None
+    context_compression: Optional[Dict[str, Any]] = None
+    llm_metrics: Optional[Dict[str, Any]] = None
+    stage_timings: Optional[Dict[str, float]] = None
     error: Optional[str] = None
\ No newline at end of file
@@ -18,9 +18,29 @@ class RAGInteractionDB(Base):
     sources = Column(JSON)
     user_feedback = Column(Integer)
     ragas_scores = Column(JSON)
-    model_version = Column(String, default="gpt-3.5-turbo")
-    embedding_model = Column(String, default="all-MiniLM-L6-v2")
+    # Modelos efetivamente usados na interação (LLM_MODEL e EMBEDDING_MODEL do momento)
+    model_version = Column(String)
+    embedding_model = Column(String)
+    llm_provider = Column(String)
     response_time = Column(Float)
+    # Categoria da pergunta: category_filter ou a do documento mais similar
+    category = Column(String, index=True)
+    # Desempenho por estágio (ms), em colunas para percentis direto no SQL
+    stage_timings = Column(JSON)
+    embedding_ms = Column(Float)
+    search_ms = Column(Float)
+    compression_ms = Column(Float)
+    prompt_ms = Column(Float)
+    llm_queue_ms = Column(Float)
+    llm_ms = Column(Float)
+    ttft_ms = Column(Float)
+    prompt_tokens = Column(Integer)
+    completion_tokens = Column(Integer)
+    # Empacotamento do contexto: estatísticas completas e as principais em colunas
+    context_packing = Column(JSON)
+    context_tokens = Column(Integer)
+    context_tokens_saved = Column(Integer)
+    context_documents_dropped = Column(Integer)
 
 class RAGInteractionCreate(BaseModel):
     question: str
@@ -38,9 +58,19 @@ class RAGInteractionResponse(BaseModel):
     sources: List[Dict]
     user_feedback: Optional[int]
     ragas_scores: Optional[Dict]
-    model_version: str
-    embedding_model: str
+    model_version: Optional[str]
+    embedding_model: Optional[str]
+    llm_provider: Optional[str] = None
     response_time: Optional[float]
+    category: Optional[str] = None
+    stage_timings: Optional[Dict[str, float]] = None
+    ttft_ms: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    context_packing: Optional[Dict] = None
+    context_tokens: Optional[int] = None
+    context_tokens_saved: Optional[int] = None
+    context_documents_dropped: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -5,6 +5,8 @@
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 from app.controllers.admin_controller import AdminController, AdminBusinessException
+from app.services.llm_scheduler import llm_scheduler
+from app.services.llm_resilience import llm_caller
 
 router = APIRouter()
 admin_controller = AdminController()
@@ -14,6 +16,10 @@ async def load_documents_from_directory(
     directory_path: str = Query(
         default="conteudo_ficticio", 
         description="Caminho para diretório contendo arquivos .txt para indexar"
+    ),
+    force_reindex: bool = Query(
+        default=False,
+        description="Reprocessa todos os arquivos, mesmo os que não mudaram desde a última carga"
     )
 ) -> dict:
     """
@@ -27,6 +33,7 @@ async def load_documents_from_directory(
     
     Args:
         directory_path: Caminho para diretório com arquivos .txt
+        force_reindex: Ignora o manifesto de ingestão e reprocessa tudo
         
     Returns:
         Dict com resultado do carregamento e métricas
@@ -35,7 +42,9 @@ async def load_documents_from_directory(
         HTTPException: Para erros HTTP (400, 404, 500)
     """
     try:
-        result = await admin_controller.load_documents_from_directory(directory_path)
+        result = await admin_controller.load_documents_from_directory(
+            directory_path, force_reindex=force_reindex
+        )
         if not result.get("success", True):
             if "DIRECTORY_NOT_FOUND" in result.get("error", ""):
                 raise HTTPException(status_code=404, detail=result["message"])
@@ -50,6 +59,8 @@ async def load_documents_from_directory(
             raise HTTPException(status_code=404, detail=e.message)
         elif e.error_code == "NO_TXT_FILES":
             raise HTTPException(status_code=400, detail=e.message)
+        elif e.error_code == "REBUILD_IN_PROGRESS":
+            raise HTTPException(status_code=409, detail=e.message)
         else:
             raise HTTPException(status_code=400, detail=e.message)
             
@@ -60,3 +71,102 @@ async def load_documents_from_directory(
         )
 
 
+@router.get("/admin/index-stats")
+async def get_index_stats() -> dict:
+    """
+    ENDPOINT ADMINISTRATIVO: Estatísticas do índice vetorial
+
+    Retorna modo do índice, métrica de distância, total de chunks e, no modo
+    quantizado, a memória economizada em relação aos vetores float32.
+    """
+    try:
+        return admin_controller.get_index_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao obter estatísticas do índice: {str(e)}"
+        )
+
+
+@router.get("/admin/watcher")
+async def get_watcher_stats() -> dict:
+    """
+    ENDPOINT ADMINISTRATIVO: Estado do watcher de documentos
+
+    Retorna arquivos monitorados e pendentes, contadores de indexação e a
+    latência (p50/p95/max) entre salvar um arquivo e seus chunks ficarem
+    pesquisáveis. Ativado com DOCUMENT_WATCHER_ENABLED=true.
+    """
+    try:
+        return admin_controller.get_watcher_stats()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao obter estado do watcher: {str(e)}"
+        )
+
+
+@router.get("/admin/llm-scheduler")
+async def get_llm_scheduler_stats() -> dict:
+    """
+    ENDPOINT ADMINISTRATIVO: Fila de chamadas ao LLM
+
+    Retorna, por classe (interactive, evaluation), slots em uso, profundidade
+    da fila, pedidos admitidos/recusados/expirados, tempo médio de serviço e
+    espera na fila (p50/p95/max).
+    """
+    return llm_scheduler.stats()
+
+
+@router.get("/admin/llm-client")
+async def get_llm_client_stats() -> dict:
+    """
+    ENDPOINT ADMINISTRATIVO: Saúde do cliente do LLM
+
+    Retorna prazo, chamadas com sucesso/falha/timeout, requisições redundantes
+    (hedging) disparadas e vencedoras, latência p50/p95/p99 e o estado do
+    disjuntor (closed, open, half_open).
+    """
+    return llm_caller.stats()
+
+
+@router.post("/admin/rebuild")
+async def start_rebuild(
+    directory_path: str = Query(
+        default="conteudo_ficticio",
+        description="Diretório com os arquivos .txt usados na reconstrução"
+    )
+) -> dict:
+    """
+    ENDPOINT ADMINISTRATIVO: Reconstrução blue/green da coleção
+
+    Indexa o diretório em uma coleção versionada nova, em segundo plano,
+    enquanto as consultas continuam na versão atual. Após validar contagens e
+    consultas de amostra, o alias é trocado atomicamente. Acompanhe o
+    andamento em GET /admin/rebuild.
+    """
+    try:
+        return await admin_controller.start_rebuild(directory_path)
+    except AdminBusinessException as e:
+        if e.error_code == "DIRECTORY_NOT_FOUND":
+            raise HTTPException(status_code=404, detail=e.message)
+        elif e.error_code == "REBUILD_IN_PROGRESS":
+            raise HTTPException(status_code=409, detail=e.message)
+        else:
+            raise HTTPException(status_code=400, detail=e.message)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro ao iniciar reconstrução: {str(e)}"
+        )
+
+
+@router.get("/admin/rebuild")
+async def get_rebuild_status() -> dict:
+    """
+    ENDPOINT ADMINISTRATIVO: Estado da última reconstrução
+
+    Retorna a fase (building, validating, completed, failed), a coleção de
+    origem e a nova versão, o resultado de cada verificação e a coleção ativa.
+    """
+    return admin_controller.get_rebuild_status()
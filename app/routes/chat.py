@@ -3,7 +3,7 @@
 # Toda lógica de negócio RAG fica no ChatController
 
 from fastapi import APIRouter, HTTPException
-from app.models.document import QuestionRequest, QuestionResponse
+from app.models.document import QuestionRequest, QuestionResponse, FederatedSearchRequest, SearchResponse
 from app.controllers.chat_controller import ChatController, ChatBusinessException
 
 router = APIRouter()
@@ -27,7 +27,9 @@ async def ask_question(request: QuestionRequest) -> QuestionResponse:
         QuestionResponse com resposta gerada, fontes e métricas
         
     Raises:
-        HTTPException: Para erros HTTP (400, 500)
+        HTTPException: Para erros HTTP (400, 500; 429/503 quando a fila do LLM
+            passa do orçamento de latência, 503 com o circuito do LLM aberto e
+            504 quando o LLM estoura o prazo)
     """
     try:
         response = await chat_controller.process_question(request)
@@ -47,8 +49,19 @@ async def ask_question(request: QuestionRequest) -> QuestionResponse:
             raise HTTPException(status_code=400, detail=e.message)
         elif e.error_code == "INVALID_MAX_DOCUMENTS":
             raise HTTPException(status_code=400, detail=e.message)
+        elif e.error_code in ["LLM_OVERLOADED", "LLM_QUEUE_TIMEOUT", "LLM_CIRCUIT_OPEN"]:
+            raise HTTPException(
+                status_code=429 if e.error_code == "LLM_OVERLOADED" else 503,
+                detail=e.message,
+                headers={"Retry-After": str(max(1, round(e.retry_after or 1)))}
+            )
+        elif e.error_code == "LLM_TIMEOUT":
+            raise HTTPException(status_code=504, detail=e.message)
         else:
             raise HTTPException(status_code=400, detail=e.message)
+
+    except HTTPException:
+        raise
             
     except Exception as e:
         raise HTTPException(
@@ -56,3 +69,23 @@ async def ask_question(request: QuestionRequest) -> QuestionResponse:
             detail=f"Erro interno no pipeline RAG: {str(e)}"
         )
 
+@router.post("/search/federated", response_model=SearchResponse)
+async def federated_search(request: FederatedSearchRequest) -> SearchResponse:
+    """
+    ENDPOINT DE BUSCA FEDERADA: consulta várias coleções/modelos e funde via RRF
+
+    Retorna os chunks fundidos e, em search_metadata.sources, a latência e o
+    status (ok, timeout, error) de cada fonte.
+    """
+    try:
+        response = await chat_controller.federated_search(request)
+        return SearchResponse(**response)
+
+    except ChatBusinessException as e:
+        raise HTTPException(status_code=400, detail=e.message)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro interno na busca federada: {str(e)}"
+        )
@@ -60,6 +60,10 @@ async def run_ragas_evaluation(
                 raise HTTPException(status_code=404, detail=error_details.get("message"))
             elif error_code in ["TOO_MANY_INTERACTIONS", "INVALID_INTERACTION_IDS"]:
                 raise HTTPException(status_code=400, detail=error_details.get("message"))
+            elif error_code == "LLM_OVERLOADED":
+                raise HTTPException(status_code=429, detail=error_details.get("message"))
+            elif error_code == "LLM_QUEUE_TIMEOUT":
+                raise HTTPException(status_code=503, detail=error_details.get("message"))
             else:
                 raise HTTPException(status_code=500, detail=error_details.get("message"))
         
@@ -76,6 +80,9 @@ async def run_ragas_evaluation(
             raise HTTPException(status_code=400, detail=e.message)
         else:
             raise HTTPException(status_code=400, detail=e.message)
+
+    except HTTPException:
+        raise
             
     except Exception as e:
         raise HTTPException(
@@ -130,6 +137,15 @@ async def list_interactions(
                     "context_count": len(i.contexts) if i.contexts else 0,
                     "sources_count": len(i.sources) if i.sources else 0,
                     "response_time": i.response_time,
+                    "category": i.category,
+                    "model_version": i.model_version,
+                    "embedding_model": i.embedding_model,
+                    "stage_timings": i.stage_timings,
+                    "ttft_ms": i.ttft_ms,
+                    "prompt_tokens": i.prompt_tokens,
+                    "completion_tokens": i.completion_tokens,
+                    "context_tokens": i.context_tokens,
+                    "context_tokens_saved": i.context_tokens_saved,
                     "has_ragas_scores": i.ragas_scores is not None,
                     "ragas_scores": i.ragas_scores,
                     "user_feedback": i.user_feedback
@@ -243,3 +259,45 @@ async def get_advanced_metrics(
             detail=f"Erro interno ao calcular métricas avançadas: {str(e)}"
         )
 
+@router.get("/analytics/performance")
+async def get_performance_analytics(
+    group_by: str = "time",
+    metric: str = "response_time_ms",
+    bucket: str = "hour",
+    since_hours: Optional[float] = 24.0
+) -> Dict[str, Any]:
+    """
+    Percentis de latência e uso de tokens das interações salvas, calculados no SQL:
+    - group_by: time, category, model, provider, embedding_model (combináveis: "time,model")
+    - metric: response_time_ms ou um estágio (embedding_ms, search_ms, compression_ms,
+      prompt_ms, llm_queue_ms, llm_ms, ttft_ms) ou tokens do contexto (context_tokens, context_tokens_saved)
+    - bucket: minute, hour ou day (quando agrupado por time)
+    
+    Args:
+        group_by: Dimensões de agrupamento separadas por vírgula
+        metric: Latência analisada (p50/p95/p99 e média)
+        bucket: Tamanho do balde de tempo
+        since_hours: Janela analisada (horas até agora; 0 = todo o histórico)
+        
+    Returns:
+        Dict com uma linha por grupo: percentis, tokens e TTFT médio
+    """
+    try:
+        return await evaluation_controller.get_performance_analytics(
+            group_by=group_by,
+            metric=metric,
+            bucket=bucket,
+            since_hours=since_hours
+        )
+        
+    except EvaluationBusinessException as e:
+        if e.error_code == "INVALID_ANALYTICS_PARAMS":
+            raise HTTPException(status_code=400, detail=e.message)
+        else:
+            raise HTTPException(status_code=500, detail=e.message)
+            
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erro interno na análise de desempenho: {str(e)}"
+        )
@@ -0,0 +1,20 @@
+# METRICS ROUTES - Exposição das métricas para o Prometheus
+# Route é responsável apenas por HTTP: serializa o registro no formato texto do Prometheus
+
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """
+    ENDPOINT DE MÉTRICAS: Formato texto do Prometheus
+
+    - rag_stage_duration_seconds: histograma por estágio do pipeline
+    - rag_request_duration_seconds / rag_requests_total: perguntas por resultado
+    - rag_errors_total: erros por estágio e tipo
+    - rag_cache_hits/misses_total, rag_pipeline_runs_total: caches e coalescência
+    - rag_llm_queue_depth, rag_llm_slots_in_use, rag_llm_circuit_state: fila e cliente do LLM
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,118 @@
+import json
+import os
+from typing import Dict, Any, List, Optional
+import numpy as np
+
+
+class CategoryRouter:
+    """
+    Roteamento automático de consultas para uma categoria
+
+    Mantém um centróide (média dos embeddings normalizados) por categoria,
+    atualizado durante a ingestão. Para uma consulta sem category_filter:
+
+    1. Calcula a similaridade da consulta com cada centróide
+    2. Se a melhor categoria supera `min_similarity` e a diferença para a
+       segunda (margem) supera `min_margin`, a busca é feita só nela
+    3. Caso contrário, a busca continua global (fallback)
+    """
+
+    def __init__(self, path: str, min_similarity: float = 0.3, min_margin: float = 0.05):
+        self.path = path
+        self.min_similarity = min_similarity
+        self.min_margin = min_margin
+        self._sums: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._categories: List[str] = []
+        self.reload()
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._sums
+
+    def reload(self) -> None:
+        """Lê os centróides salvos (inclusive por outra instância), descartando o estado em memória"""
+        sums: Dict[str, np.ndarray] = {}
+        counts: Dict[str, int] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            for category, entry in data.items():
+                sums[category] = np.asarray(entry["sum"], dtype=np.float64)
+                counts[category] = entry["count"]
+        self._sums, self._counts = sums, counts
+        self._centroids = None
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {
+            category: {"sum": self._sums[category].tolist(), "count": self._counts[category]}
+            for category in self._sums
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def update(self, category: str, embeddings: List[List[float]]) -> None:
+        vectors = np.asarray(embeddings, dtype=np.float64).reshape(len(embeddings), -1)
+        if category in self._sums:
+            self._sums[category] += vectors.sum(axis=0)
+            self._counts[category] += len(vectors)
+        else:
+            self._sums[category] = vectors.sum(axis=0)
+            self._counts[category] = len(vectors)
+        self._centroids = None
+
+    def remove(self, category: str, embeddings: List[List[float]]) -> None:
+        """Desconta embeddings de chunks removidos do centróide da categoria"""
+        if category not in self._sums or not len(embeddings):
+            return
+        vectors = np.asarray(embeddings, dtype=np.float64).reshape(len(embeddings), -1)
+        self._counts[category] -= len(vectors)
+        if self._counts[category] <= 0:
+            del self._sums[category]
+            del self._counts[category]
+        else:
+            self._sums[category] -= vectors.sum(axis=0)
+        self._centroids = None
+
+    def _centroid_matrix(self) -> np.ndarray:
+        if self._centroids is None:
+            self._categories = list(self._sums)
+            matrix = np.stack([self._sums[c] for c in self._categories])
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._centroids = (matrix / norms).astype(np.float32)
+        return self._centroids
+
+    def route(self, query_embedding: List[float]) -> Dict[str, Any]:
+        """Decide a categoria da consulta; `category` é None quando não há confiança"""
+        if len(self._sums) < 2:
+            return {"category": None, "reason": "insufficient_categories", "scores": {}}
+
+        scores = self._centroid_matrix() @ np.asarray(query_embedding, dtype=np.float32)
+        order = np.argsort(-scores)
+        best, second = order[0], order[1]
+        best_score = float(scores[best])
+        margin = best_score - float(scores[second])
+
+        if best_score < self.min_similarity:
+            category, reason = None, "low_similarity"
+        elif margin < self.min_margin:
+            category, reason = None, "low_margin"
+        else:
+            category, reason = self._categories[best], "confident"
+
+        return {
+            "category": category,
+            "reason": reason,
+            "best_category": self._categories[best],
+            "best_similarity": round(best_score, 4),
+            "margin": round(margin, 4),
+            "scores": {self._categories[i]: round(float(scores[i]), 4) for i in order}
+        }
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self._counts)
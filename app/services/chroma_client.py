@@ -0,0 +1,102 @@
+import random
+import time
+import chromadb
+import httpx
+from chromadb.config import Settings as ChromaSettings
+from app.core.config import settings
+
+# Respostas de proxy/servidor indisponível que valem uma nova tentativa
+RETRY_STATUS_CODES = {502, 503, 504}
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.RemoteProtocolError)
+
+
+class RetryTransport(httpx.HTTPTransport):
+    """
+    Transporte httpx com novas tentativas e backoff exponencial com jitter
+
+    Repete a requisição em falhas de conexão, timeouts de leitura e respostas
+    502/503/504. As operações que o VectorService faz no Chroma são
+    idempotentes (upsert, delete por id, get, query), então reenviar é seguro.
+    O pool de conexões keep-alive é o do próprio HTTPTransport.
+    """
+
+    def __init__(self, retries: int = 3, backoff: float = 0.1, **kwargs):
+        super().__init__(**kwargs)
+        self.retries = retries
+        self.backoff = backoff
+        self.retried = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(self.retries + 1):
+            try:
+                response = super().handle_request(request)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == self.retries:
+                    return response
+                response.close()
+            except RETRY_EXCEPTIONS:
+                if attempt == self.retries:
+                    raise
+            self.retried += 1
+            time.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+
+
+def create_chroma_client():
+    """Cliente Chroma conforme CHROMA_CLIENT_MODE: arquivos locais ou servidor HTTP"""
+    if settings.chroma_client_mode == "http":
+        return create_http_client(settings.chroma_host, settings.chroma_port)
+    return chromadb.PersistentClient(path=settings.chroma_persist_directory)
+
+
+def create_http_client(host: str, port: int):
+    """
+    Cliente HTTP para um servidor Chroma compartilhado entre réplicas da API
+
+    CONFIGURAÇÃO:
+    - Pool de conexões keep-alive (sem handshake TCP por requisição)
+    - Timeout de conexão e de requisição (o cliente padrão não tem timeout)
+    - Novas tentativas com backoff exponencial (RetryTransport)
+    """
+    client = chromadb.HttpClient(
+        host=host,
+        port=port,
+        ssl=settings.chroma_ssl,
+        settings=ChromaSettings(
+            anonymized_telemetry=False,
+            chroma_http_keepalive_secs=settings.chroma_http_keepalive_secs,
+            chroma_http_max_connections=settings.chroma_http_max_connections,
+            chroma_http_max_keepalive_connections=settings.chroma_http_max_keepalive_connections
+        )
+    )
+    _configure_session(client)
+    return client
+
+
+def _configure_session(client) -> None:
+    """
+    Aplica timeouts e RetryTransport ao cliente HTTP do Chroma
+
+    As Settings públicas do Chroma não têm timeout nem transporte, então a
+    sessão httpx interna do cliente (`_server._session`) é trocada. O atributo
+    é privado: a faixa de versões do chromadb fica fixada em requirements.txt
+    e, se ele sumir, a inicialização falha em vez de seguir sem timeout.
+    """
+    server = getattr(client, "_server", None)
+    session = getattr(server, "_session", None)
+    if not isinstance(session, httpx.Client):
+        raise RuntimeError(
+            f"chromadb {chromadb.__version__}: cliente HTTP sem a sessão httpx interna (_server._session); "
+            f"não é possível aplicar timeouts e retries. Instale a versão de chromadb de requirements.txt"
+        )
+
+    ssl_verify = server._settings.chroma_server_ssl_verify
+    server._session = httpx.Client(
+        timeout=httpx.Timeout(settings.chroma_http_timeout, connect=settings.chroma_http_connect_timeout),
+        headers=session.headers,
+        transport=RetryTransport(
+            retries=settings.chroma_http_retries,
+            backoff=settings.chroma_http_backoff,
+            limits=server.http_limits,
+            verify=True if ssl_verify is None else ssl_verify
+        )
+    )
+    session.close()
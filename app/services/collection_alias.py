@@ -0,0 +1,135 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+
+class CollectionAlias:
+    """
+    Alias de coleção para reconstruções blue/green
+
+    O nome configurado (CHROMA_COLLECTION_NAME) passa a ser um alias que aponta
+    para uma coleção versionada (ex.: `documents_v20250101120000`). O arquivo
+    `collection_aliases.json` guarda, por alias, a versão atual e a anterior.
+
+    TROCA ATÔMICA:
+    - O arquivo é reescrito em um temporário e trocado com `os.replace`, então
+      leitores veem a versão antiga ou a nova, nunca um arquivo parcial
+    - Processos que servem consultas chamam `changed()` (um `stat`, sem ler o
+      arquivo) e reabrem a coleção quando o alias muda, sem reiniciar
+
+    Sem arquivo (ou sem entrada para o alias), o alias resolve para ele mesmo,
+    mantendo o comportamento de instalações antigas.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.aliases: Dict[str, Dict[str, Any]] = {}
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._load()
+
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        # os.replace cria um inode novo: mudança detectada mesmo com mtime de baixa resolução
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _load(self) -> None:
+        self._signature = self._stat()
+        self.aliases = self._read() if self._signature is not None else {}
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write(self, aliases: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(aliases, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def changed(self) -> bool:
+        """Recarrega o arquivo se outro processo trocou algum alias"""
+        if self._stat() == self._signature:
+            return False
+        self._load()
+        return True
+
+    def resolve(self, alias: str) -> str:
+        return self.aliases.get(alias, {}).get("target", alias)
+
+    def previous(self, alias: str) -> Optional[str]:
+        return self.aliases.get(alias, {}).get("previous")
+
+    def swap(self, alias: str, target: str) -> Dict[str, Any]:
+        """Aponta o alias para a nova coleção; a versão atual vira `previous`"""
+        self._load()
+        entry = {
+            "target": target,
+            "previous": self.resolve(alias),
+            "swapped_at": datetime.now().isoformat()
+        }
+        self._write({**self.aliases, alias: entry})
+        self._load()
+        return entry
+
+
+class ChromaCollectionAlias(CollectionAlias):
+    """
+    Alias guardado no próprio servidor Chroma (CHROMA_CLIENT_MODE=http)
+
+    Réplicas da API em máquinas diferentes não compartilham o diretório local,
+    então cada alias vira um registro da coleção `collection_aliases` (id = nome
+    do alias, documento = entrada em JSON). A troca é um único `upsert`.
+
+    `changed()` consulta o servidor no máximo uma vez a cada `check_interval`
+    segundos. Na primeira execução, um `collection_aliases.json` local
+    (instalações anteriores) é copiado para o servidor.
+    """
+
+    def __init__(
+        self,
+        client,
+        collection_name: str = "collection_aliases",
+        check_interval: float = 1.0,
+        legacy_path: Optional[str] = None
+    ):
+        self.collection = client.get_or_create_collection(name=collection_name)
+        self.check_interval = check_interval
+        self._checked_at = 0.0
+        super().__init__(legacy_path or "")
+        if not self.aliases and legacy_path and os.path.exists(legacy_path):
+            self._write(CollectionAlias(legacy_path).aliases)
+            self._load()
+
+    def _load(self) -> None:
+        self._checked_at = time.monotonic()
+        self.aliases = self._read()
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        records = self.collection.get(include=["documents"])
+        return {alias: json.loads(entry) for alias, entry in zip(records["ids"], records["documents"])}
+
+    def _write(self, aliases: Dict[str, Dict[str, Any]]) -> None:
+        if not aliases:
+            return
+        # Registro sem uso na busca: embedding fixo de uma dimensão
+        self.collection.upsert(
+            ids=list(aliases),
+            documents=[json.dumps(entry, ensure_ascii=False) for entry in aliases.values()],
+            embeddings=[[1.0] for _ in aliases]
+        )
+
+    def changed(self) -> bool:
+        """Relê os aliases do servidor (no máximo a cada `check_interval` segundos)"""
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return False
+        previous = self.aliases
+        self._load()
+        return self.aliases != previous
@@ -0,0 +1,94 @@
+import re
+import time
+from typing import List, Dict, Any, Tuple
+import numpy as np
+from app.models.document import DocumentResponse
+from app.services.embedding_cache import EmbeddingCache
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+class ContextCompressor:
+    """
+    Compressão extrativa do contexto guiada pela pergunta
+
+    Cada chunk recuperado é dividido em sentenças; cada sentença é pontuada
+    pela similaridade de cosseno com o embedding da pergunta e só as
+    `max_sentences` melhores são mantidas, na ordem original do texto.
+
+    EMBEDDINGS DAS SENTENÇAS:
+    - Calculados na ingestão (`precompute`) com o mesmo SentenceTransformer
+      dos chunks e guardados em um EmbeddingCache próprio (hash da sentença)
+    - Na consulta só há leitura do cache (memory-map) e um produto escalar;
+      sentenças ausentes (chunks indexados antes da compressão existir) são
+      codificadas na hora e contadas em `encoded_at_query`
+    """
+
+    def __init__(self, embedding_model, cache: EmbeddingCache, max_sentences: int = 3):
+        self.embedding_model = embedding_model
+        self.cache = cache
+        self.max_sentences = max_sentences
+
+    def _embeddings(self, sentences: List[str]) -> np.ndarray:
+        keys = [EmbeddingCache.key(sentence) for sentence in sentences]
+        cached = self.cache.get_many(keys)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            encoded = self.embedding_model.encode([sentences[i] for i in missing], normalize_embeddings=True)
+            self.cache.put_many([keys[i] for i in missing], encoded)
+            for i, vector in zip(missing, encoded):
+                cached[i] = vector
+        return np.asarray(cached, dtype=np.float32).reshape(len(sentences), -1)
+
+    def precompute(self, texts: List[str]) -> int:
+        """Garante os embeddings das sentenças dos chunks no cache; retorna quantas foram codificadas"""
+        sentences = list(dict.fromkeys(sentence for text in texts for sentence in split_sentences(text)))
+        if not sentences:
+            return 0
+        misses = self.cache.misses
+        self._embeddings(sentences)
+        return self.cache.misses - misses
+
+    def compress(
+        self,
+        query_embedding: List[float],
+        documents: List[DocumentResponse]
+    ) -> Tuple[List[DocumentResponse], Dict[str, Any]]:
+        """Retorna (documentos com conteúdo reduzido, estatísticas da compressão)"""
+        start = time.perf_counter()
+        query = np.asarray(query_embedding, dtype=np.float32)
+        misses = self.cache.misses
+
+        compressed = []
+        sentences_in = sentences_kept = 0
+        for document in documents:
+            sentences = split_sentences(document.content)
+            sentences_in += len(sentences)
+            if len(sentences) <= self.max_sentences:
+                sentences_kept += len(sentences)
+                compressed.append(document)
+                continue
+            scores = self._embeddings(sentences) @ query
+            keep = sorted(np.argsort(-scores)[:self.max_sentences])
+            sentences_kept += len(keep)
+            compressed.append(document.model_copy(update={
+                "content": " ".join(sentences[i] for i in keep),
+                "metadata": {**document.metadata, "compressed_from_chars": len(document.content)}
+            }))
+
+        chars_in = sum(len(document.content) for document in documents)
+        chars_out = sum(len(document.content) for document in compressed)
+        stats: Dict[str, Any] = {
+            "sentences_in": sentences_in,
+            "sentences_kept": sentences_kept,
+            "chars_in": chars_in,
+            "chars_out": chars_out,
+            "reduction_pct": round(100 * (1 - chars_out / chars_in), 1) if chars_in else 0.0,
+            "encoded_at_query": self.cache.misses - misses,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+        }
+        return compressed, stats
@@ -0,0 +1,166 @@
+from typing import List, Dict, Any, Tuple
+
+
+class ContextPacker:
+    """
+    Monta o contexto do prompt dentro de um orçamento de tokens
+
+    PROCESSO:
+    1. Corte adaptativo por score: ordena os documentos pela similaridade e
+       descarta tudo a partir do primeiro salto >= `score_gap` entre dois
+       scores consecutivos (os documentos depois do salto são de outro assunto)
+    2. Fusão de vizinhos: chunks consecutivos do mesmo `source_file`
+       (chunk_index i, i+1, ...) viram um único bloco, sem repetir o trecho de
+       sobreposição do chunking nem o cabeçalho do documento
+    3. Orçamento: adiciona os blocos do maior para o menor score enquanto
+       couberem em `max_tokens`; se nem o primeiro cabe, ele é truncado
+
+    Os tokens são contados com o tokenizer do modelo de chat (tiktoken). Sem o
+    arquivo do tokenizer (ambiente sem internet), usa a estimativa de
+    ~4 caracteres por token.
+    """
+
+    def __init__(self, model: str, max_tokens: int = 2000, score_gap: float = 0.15, min_documents: int = 1):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.score_gap = score_gap
+        self.min_documents = min_documents
+        self._encoding = None
+        self._encoding_loaded = False
+
+    def _get_encoding(self):
+        if not self._encoding_loaded:
+            self._encoding_loaded = True
+            try:
+                import tiktoken
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model)
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                print(f"Tokenizer do modelo {self.model} indisponível ({e}): estimando 4 caracteres por token")
+        return self._encoding
+
+    def count_tokens(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is None:
+            return (len(text) + 3) // 4
+        return len(encoding.encode(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        encoding = self._get_encoding()
+        if encoding is None:
+            return text[:max_tokens * 4]
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+
+    @staticmethod
+    def format_document(position: int, doc: Dict[str, Any]) -> str:
+        return (
+            f"[Documento {position}]\n"
+            f"Título: {doc.get('title', 'N/A')}\n"
+            f"Categoria: {doc.get('category', 'N/A')}\n"
+            f"Conteúdo: {doc.get('content', '')}\n\n"
+        )
+
+    def _score_cutoff(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        ranked = sorted(
+            documents,
+            key=lambda doc: doc.get("similarity_score") if doc.get("similarity_score") is not None else float("-inf"),
+            reverse=True
+        )
+        for i in range(max(self.min_documents, 1), len(ranked)):
+            previous, current = ranked[i - 1].get("similarity_score"), ranked[i].get("similarity_score")
+            if previous is not None and current is not None and previous - current >= self.score_gap:
+                return ranked[:i]
+        return ranked
+
+    @staticmethod
+    def _join_overlapping(first: str, second: str, min_overlap: int = 10) -> str:
+        # O chunking repete o fim do chunk anterior no início do seguinte
+        for size in range(min(len(first), len(second)), min_overlap - 1, -1):
+            if first.endswith(second[:size]):
+                return first + second[size:]
+        return f"{first} {second}"
+
+    def _merge_adjacent(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        by_position: Dict[Tuple[str, int], Dict[str, Any]] = {}
+        for doc in documents:
+            metadata = doc.get("metadata") or {}
+            if metadata.get("source_file") is not None and metadata.get("chunk_index") is not None:
+                by_position[(metadata["source_file"], int(metadata["chunk_index"]))] = doc
+
+        merged, merges = [], 0
+        consumed = set()
+        for doc in documents:
+            metadata = doc.get("metadata") or {}
+            if metadata.get("source_file") is None or metadata.get("chunk_index") is None:
+                merged.append(doc)
+                continue
+            source, index = metadata["source_file"], int(metadata["chunk_index"])
+            if (source, index) in consumed:
+                continue
+            # Estende o bloco para os vizinhos recuperados antes e depois (ordem do documento)
+            start, end = index, index
+            while (source, start - 1) in by_position and (source, start - 1) not in consumed:
+                start -= 1
+            while (source, end + 1) in by_position and (source, end + 1) not in consumed:
+                end += 1
+            block = [by_position[(source, i)] for i in range(start, end + 1)]
+            consumed.update((source, i) for i in range(start, end + 1))
+
+            if len(block) == 1:
+                merged.append(doc)
+                continue
+            merges += len(block) - 1
+            content = block[0].get("content", "")
+            for neighbour in block[1:]:
+                content = self._join_overlapping(content, neighbour.get("content", ""))
+            scores = [d.get("similarity_score") for d in block if d.get("similarity_score") is not None]
+            merged.append({
+                **block[0],
+                "content": content,
+                "similarity_score": max(scores) if scores else None,
+                "metadata": {**(block[0].get("metadata") or {}), "merged_chunks": len(block)}
+            })
+        return merged, merges
+
+    def pack(self, documents: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], str, Dict[str, Any]]:
+        """Retorna (documentos usados, texto do contexto, estatísticas de tokens)"""
+        baseline_tokens = self.count_tokens(
+            "".join(self.format_document(i, doc) for i, doc in enumerate(documents, 1))
+        )
+        kept = self._score_cutoff(documents)
+        dropped_by_score = len(documents) - len(kept)
+        blocks, merges = self._merge_adjacent(kept)
+
+        packed: List[Dict[str, Any]] = []
+        context_text = ""
+        used_tokens = 0
+        dropped_by_budget = 0
+        for doc in blocks:
+            text = self.format_document(len(packed) + 1, doc)
+            tokens = self.count_tokens(text)
+            if used_tokens + tokens > self.max_tokens:
+                if packed:
+                    dropped_by_budget += 1
+                    continue
+                header_tokens = self.count_tokens(self.format_document(1, {**doc, "content": ""}))
+                doc = {**doc, "content": self.truncate(doc.get("content", ""), max(self.max_tokens - header_tokens, 0))}
+                text = self.format_document(1, doc)
+                tokens = self.count_tokens(text)
+            packed.append(doc)
+            context_text += text
+            used_tokens += tokens
+
+        stats = {
+            "documents_retrieved": len(documents),
+            "documents_used": len(packed),
+            "dropped_by_score": dropped_by_score,
+            "dropped_by_budget": dropped_by_budget,
+            "chunks_merged": merges,
+            "budget_tokens": self.max_tokens,
+            "context_tokens": used_tokens,
+            "baseline_tokens": baseline_tokens,
+            "tokens_saved": max(baseline_tokens - used_tokens, 0)
+        }
+        return packed, context_text, stats
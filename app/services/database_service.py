@@ -1,6 +1,6 @@
 import aiosqlite
 import warnings
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.models.rag_interaction import Base
@@ -15,6 +15,8 @@ warnings.filterwarnings("ignore", category=UserWarning, module="sqlalchemy.*")
 # Configurar logging SQLAlchemy para reduzir ruído
 logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
+logger = logging.getLogger(__name__)
+
 # SQLite database path
 DATABASE_PATH = os.path.join(settings.chroma_persist_directory, "rag_interactions.db")
 DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
@@ -40,9 +42,30 @@ class DatabaseService:
         self.database_url = DATABASE_URL
 
     async def create_tables(self):
-        """Criar todas as tabelas do banco de dados"""
+        """Criar todas as tabelas do banco de dados (e colunas novas em bancos antigos)"""
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(self._add_missing_columns)
+
+    @staticmethod
+    def _add_missing_columns(conn) -> None:
+        """
+        Migração aditiva: create_all não altera tabelas existentes, então
+        colunas adicionadas ao modelo entram via ALTER TABLE ADD COLUMN
+        (registros antigos ficam com NULL)
+        """
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {column_type}'))
+                logger.info(f"Banco de dados: coluna {table.name}.{column.name} adicionada")
+                if column.index:
+                    conn.execute(text(
+                        f'CREATE INDEX IF NOT EXISTS ix_{table.name}_{column.name} ON {table.name} ("{column.name}")'
+                    ))
 
     async def get_session(self) -> AsyncSession:
         """Obter uma sessão assíncrona do banco de dados"""
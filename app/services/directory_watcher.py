@@ -0,0 +1,166 @@
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Any, List, Optional, Tuple
+import numpy as np
+
+
+class DirectoryWatcher:
+    """
+    Observa um diretório de documentos e indexa só os arquivos afetados
+
+    Usa polling com `os.scandir` (só a biblioteca padrão, funciona igual em
+    Linux, macOS e volumes montados, onde inotify nem sempre entrega eventos).
+    Cada varredura compara (mtime, tamanho) dos arquivos .txt com a anterior,
+    então o custo é de um `stat` por arquivo, sem ler conteúdo.
+
+    PROCESSO:
+    1. Arquivos novos, alterados ou removidos entram na fila de pendentes
+    2. Debounce: um arquivo só é despachado depois de `debounce` segundos sem
+       novas alterações (editores salvam em várias escritas)
+    3. Os pendentes estáveis são enviados juntos para `on_change`, que reindexa
+       ou remove os chunks apenas desses arquivos
+    4. Registra a latência entre o arquivo ser salvo (mtime) e os chunks
+       estarem pesquisáveis (após o flush dos índices)
+
+    Ao iniciar, faz uma carga incremental completa do diretório (`on_change(None)`).
+    Arquivos cuja indexação falha voltam para a fila na próxima varredura.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        on_change: Callable[[Optional[List[str]]], Awaitable[Dict[str, Any]]],
+        interval: float = 1.0,
+        debounce: float = 2.0,
+        history: int = 500
+    ):
+        self.directory = os.path.abspath(directory)
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+
+        self._known: Dict[str, Tuple[int, int]] = {}
+        # caminho -> (última alteração vista [monotonic], horário em que foi salvo [epoch])
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        self._latencies: Deque[float] = deque(maxlen=history)
+        self._task: Optional[asyncio.Task] = None
+        self._counters = {"scans": 0, "files_indexed": 0, "files_removed": 0, "batches": 0, "errors": 0}
+        self._last_error: Optional[str] = None
+
+    def _scan(self) -> Optional[Dict[str, Tuple[int, int]]]:
+        try:
+            entries = os.scandir(self.directory)
+        except FileNotFoundError:
+            # Diretório indisponível (volume desmontado): não interpretar como remoção de tudo
+            return None
+        snapshot = {}
+        with entries:
+            for entry in entries:
+                if entry.name.endswith('.txt') and entry.is_file():
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        # Renomeado/apagado durante a varredura: o novo nome aparece na próxima
+                        continue
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def _collect_changes(self, snapshot: Dict[str, Tuple[int, int]]) -> None:
+        now = time.monotonic()
+        for path, signature in snapshot.items():
+            if self._known.get(path) != signature:
+                self._pending[path] = (now, signature[0] / 1e9)
+        for path in self._known.keys() - snapshot.keys():
+            self._pending[path] = (now, time.time())
+        self._known = snapshot
+
+    def _ready(self) -> List[str]:
+        now = time.monotonic()
+        return sorted(path for path, (changed, _) in self._pending.items() if now - changed >= self.debounce)
+
+    async def poll(self) -> Optional[Dict[str, Any]]:
+        """Uma varredura; despacha os arquivos estáveis e retorna o resultado da indexação"""
+        snapshot = await asyncio.to_thread(self._scan)
+        self._counters["scans"] += 1
+        if snapshot is None:
+            print(f"Watcher: diretório indisponível: {self.directory}")
+            return None
+        self._collect_changes(snapshot)
+
+        ready = self._ready()
+        if not ready:
+            return None
+        saved_at = {path: self._pending.pop(path)[1] for path in ready}
+
+        try:
+            result = await self.on_change(ready)
+        except Exception as e:
+            self._counters["errors"] += 1
+            self._last_error = str(e)
+            print(f"Watcher: erro ao indexar {len(ready)} arquivos: {e}")
+            # Tenta de novo na próxima varredura, sem esperar outro debounce
+            for path, saved in saved_at.items():
+                self._pending.setdefault(path, (0.0, saved))
+            return None
+
+        searchable_at = time.time()
+        for path, saved in saved_at.items():
+            self._latencies.append(max(searchable_at - saved, 0.0))
+        removed = sum(1 for path in ready if path not in snapshot)
+        self._counters["batches"] += 1
+        self._counters["files_removed"] += removed
+        self._counters["files_indexed"] += len(ready) - removed
+        return result
+
+    async def _run(self) -> None:
+        # Estado inicial + sincronização completa (alterações feitas com o servidor parado);
+        # essa carga não entra na métrica de latência
+        self._known = await asyncio.to_thread(self._scan) or {}
+        try:
+            await self.on_change(None)
+        except Exception as e:
+            self._counters["errors"] += 1
+            self._last_error = str(e)
+            print(f"Watcher: erro na sincronização inicial: {e}")
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                self._counters["errors"] += 1
+                self._last_error = str(e)
+                print(f"Watcher: erro na varredura: {e}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = np.asarray(self._latencies) * 1000
+        return {
+            "directory": self.directory,
+            "running": self._task is not None and not self._task.done(),
+            "interval_s": self.interval,
+            "debounce_s": self.debounce,
+            "tracked_files": len(self._known),
+            "pending_files": len(self._pending),
+            **self._counters,
+            "last_error": self._last_error,
+            "save_to_searchable_ms": {
+                "samples": len(latencies),
+                "p50": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+                "p95": round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+                "max": round(float(latencies.max()), 2) if len(latencies) else None
+            }
+        }
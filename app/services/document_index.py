@@ -0,0 +1,160 @@
+import json
+import os
+import re
+from typing import Callable, Dict, Any, List, Optional, Tuple
+import numpy as np
+
+
+_CHUNK_SUFFIX = re.compile(r" - Chunk \d+$")
+
+
+def document_title(metadata: Dict[str, Any]) -> str:
+    """Título do documento de origem (chunks antigos, sem `document_title`, têm o sufixo " - Chunk N" removido)"""
+    return metadata.get("document_title") or _CHUNK_SUFFIX.sub("", metadata["title"])
+
+
+def document_key(metadata: Dict[str, Any]) -> str:
+    """Identifica o documento de origem de um chunk (caminho absoluto do arquivo ou, na falta dele, o título)
+
+    `source_file` é só o nome do arquivo: arquivos homônimos em diretórios
+    diferentes são documentos diferentes.
+    """
+    if metadata.get("file_path"):
+        return os.path.abspath(metadata["file_path"])
+    return metadata.get("source_file") or document_title(metadata)
+
+
+class DocumentIndex:
+    """
+    Primeiro nível da busca hierárquica documento → chunk
+
+    Guarda um embedding por documento em uma coleção Chroma própria
+    (`<coleção>__docs`). O embedding combina:
+    - o título do documento
+    - a categoria
+    - um vetor-resumo do conteúdo (média dos embeddings dos chunks)
+
+    Os chunks de um documento são acumulados durante a ingestão e o vetor do
+    documento é gravado em `flush()`, ao final do lote. Os ids dos chunks e a
+    soma dos embeddings ficam nos metadados do documento: chunks que chegam
+    em lotes seguintes somam-se ao documento já gravado (ids repetidos são
+    ignorados), e o segundo nível da busca carrega os chunks por id em vez
+    de usar um filtro `where` (bem mais lento no Chroma).
+    """
+
+    def __init__(
+        self,
+        collection,
+        encode: Callable[[List[str]], List[List[float]]],
+        title_weight: float = 0.3,
+        category_weight: float = 0.1
+    ):
+        self.collection = collection
+        self._encode = encode
+        self.title_weight = title_weight
+        self.category_weight = category_weight
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return self.collection.count()
+
+    def add(
+        self,
+        key: str,
+        title: str,
+        category: str,
+        chunk_ids: List[str],
+        embeddings: List[List[float]]
+    ) -> None:
+        vectors = np.asarray(embeddings, dtype=np.float64).reshape(len(embeddings), -1)
+        entry = self._pending.setdefault(key, {"title": title, "category": category, "chunks": {}})
+        for chunk_id, vector in zip(chunk_ids, vectors):
+            entry["chunks"][chunk_id] = vector
+
+    def _merge_stored(self, keys: List[str]) -> List[Dict[str, Any]]:
+        """Soma os chunks pendentes aos já gravados de cada documento (lotes anteriores)"""
+        stored = self.collection.get(ids=keys, include=["metadatas"])
+        previous = dict(zip(stored["ids"], stored["metadatas"]))
+        merged = []
+        for key in keys:
+            entry = self._pending[key]
+            metadata = previous.get(key)
+            chunk_ids: List[str] = []
+            total = np.zeros(len(next(iter(entry["chunks"].values()))))
+            # Documentos gravados antes da soma existir nos metadados são substituídos
+            if metadata is not None and "sum" in metadata:
+                chunk_ids = json.loads(metadata["chunk_ids"])
+                total = np.asarray(json.loads(metadata["sum"]), dtype=np.float64)
+            known = set(chunk_ids)
+            for chunk_id, vector in entry["chunks"].items():
+                if chunk_id not in known:
+                    chunk_ids.append(chunk_id)
+                    total = total + vector
+            merged.append({"title": entry["title"], "category": entry["category"], "sum": total, "chunk_ids": chunk_ids})
+        return merged
+
+    def remove(self, keys: List[str]) -> None:
+        for key in keys:
+            self._pending.pop(key, None)
+        if keys:
+            self.collection.delete(ids=list(keys))
+
+    def flush(self, batch_size: int = 1000) -> int:
+        """Calcula e grava os embeddings dos documentos acumulados; retorna quantos foram gravados"""
+        keys = list(self._pending)
+        for start in range(0, len(keys), batch_size):
+            batch = self._merge_stored(keys[start:start + batch_size])
+            titles = self._encode([entry["title"] for entry in batch])
+            categories = sorted({entry["category"] for entry in batch})
+            category_vectors = dict(zip(categories, self._encode(categories)))
+
+            embeddings = []
+            for entry, title_vector in zip(batch, titles):
+                summary = entry["sum"] / max(np.linalg.norm(entry["sum"]), 1e-12)
+                vector = (
+                    self.title_weight * np.asarray(title_vector)
+                    + self.category_weight * np.asarray(category_vectors[entry["category"]])
+                    + (1 - self.title_weight - self.category_weight) * summary
+                )
+                embeddings.append((vector / max(np.linalg.norm(vector), 1e-12)).tolist())
+
+            self.collection.upsert(
+                ids=keys[start:start + batch_size],
+                embeddings=embeddings,
+                metadatas=[
+                    {
+                        "title": entry["title"],
+                        "category": entry["category"],
+                        "chunks": len(entry["chunk_ids"]),
+                        "chunk_ids": json.dumps(entry["chunk_ids"]),
+                        "sum": json.dumps(entry["sum"].tolist())
+                    }
+                    for entry in batch
+                ]
+            )
+
+        self._pending = {}
+        return len(keys)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        category_filter: Optional[str] = None
+    ) -> List[Tuple[str, List[str]]]:
+        """Documentos mais próximos da consulta: [(chave, ids dos chunks)]"""
+        total = self.collection.count()
+        if not total:
+            return []
+        results = self.collection.query(
+            query_embeddings=[query_embedding],
+            n_results=min(limit, total),
+            where={"category": category_filter} if category_filter else None,
+            include=["metadatas"]
+        )
+        if not results["ids"]:
+            return []
+        return [
+            (key, json.loads(metadata["chunk_ids"]))
+            for key, metadata in zip(results["ids"][0], results["metadatas"][0])
+        ]
@@ -1,11 +1,12 @@
 
 import os
 import re
-from typing import List, Set
+from typing import List, Set, Optional, Dict, Any
 import spacy
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document as LangChainDocument
 from app.models.document import Document
+from app.core.config import settings
 import numpy as np
 from transformers import AutoTokenizer, AutoModelForCausalLM
 from pathlib import Path
@@ -21,6 +22,7 @@ class DocumentProcessor:
     2. Extrai metadados (título, categoria)
     3. Limpa conteúdo usando perplexidade (remove texto de baixa qualidade)
     4. Divide documentos em chunks menores usando LangChain
+       (por caracteres ou por tokens do tokenizer do modelo de embedding)
     
     TECNOLOGIAS USADAS:
     - LangChain: Divisão inteligente de texto
@@ -29,11 +31,37 @@ class DocumentProcessor:
     - PyTorch: Backend para o modelo
     """
     
-    def __init__(self):
+    def __init__(self, embedding_tokenizer=None, max_seq_length: Optional[int] = None):
+        """
+        Args:
+            embedding_tokenizer: Tokenizer do modelo de embedding (chunking por tokens
+                e estatísticas de truncamento)
+            max_seq_length: Limite de tokens do encoder; o que passar disso é truncado
+        """
+        self.embedding_tokenizer = embedding_tokenizer
+        self.max_seq_length = max_seq_length
+        self.chunking_mode = "characters"
+        self.chunk_size = 500
+        self.chunk_overlap = 50
+        length_function = len
+
+        if settings.chunking_mode == "tokens":
+            if embedding_tokenizer is None or not max_seq_length:
+                print("CHUNKING_MODE=tokens sem tokenizer do modelo de embedding: usando chunks por caracteres")
+            else:
+                # O encoder também conta [CLS] e [SEP]: o texto tem que caber no que sobra
+                self.chunking_mode = "tokens"
+                self.chunk_size = min(
+                    settings.chunk_max_tokens or max_seq_length,
+                    max_seq_length - self._special_tokens_count()
+                )
+                self.chunk_overlap = min(settings.chunk_overlap_tokens, self.chunk_size // 2)
+                length_function = self.count_tokens
+
         self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500,
-            chunk_overlap=50,
-            length_function=len,
+            chunk_size=self.chunk_size,
+            chunk_overlap=self.chunk_overlap,
+            length_function=length_function,
             separators=["\n\n", "\n", " ", ""]
         )
         
@@ -81,41 +109,95 @@ class DocumentProcessor:
         
         for filename in os.listdir(directory_path):
             if filename.endswith('.txt'):
-                file_path = os.path.join(directory_path, filename)
-                
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        content = file.read().strip()
-                    
-                    title, category = self._extract_metadata_from_content(content)
-                    clean_content = self._clean_content(content)
-                    
-                    if not clean_content.strip():
-                        print(f"Arquivo vazio após limpeza: {filename}")
-                        continue
-                    
-                    document = Document(
-                        title=title or filename.replace('.txt', ''),
-                        category=category or "sem_categoria",
-                        content=clean_content,
-                        metadata={
-                            "source_file": filename,
-                            "file_path": file_path
-                        }
-                    )
-                    
+                document = self.load_document(os.path.join(directory_path, filename))
+                if document is not None:
                     documents.append(document)
-                    print(f"Documento processado: {filename} (título: {title})")
-                
-                except Exception as e:
-                    print(f"Erro ao processar {filename}: {e}")
-                    continue
         
         print(f"Total de documentos carregados: {len(documents)}")
         return documents
     
    
 
+    def pipeline_fingerprint(self) -> str:
+        """Identifica a configuração de limpeza/chunking (mudou = arquivos precisam ser reprocessados)"""
+        if self.chunking_mode == "tokens":
+            return f"chunks=tokens:{self.chunk_size}/{self.chunk_overlap}"
+        return f"chunks={self.chunk_size}/{self.chunk_overlap}"
+
+    def _special_tokens_count(self) -> int:
+        return len(self.embedding_tokenizer("", add_special_tokens=True)["input_ids"])
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens do texto para o tokenizer do modelo de embedding (sem [CLS]/[SEP])"""
+        return len(self.embedding_tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    def _enforce_token_budget(self, chunks: List[str]) -> List[str]:
+        """Garante que nenhum chunk passe do orçamento de tokens
+
+        O splitter soma comprimentos de pedaços; a tokenização do texto já unido
+        pode diferir por um ou dois tokens nas emendas. Chunks que passarem do
+        limite são cortados nas fronteiras de tokens (offsets do tokenizer), sem
+        alterar o texto.
+        """
+        budgeted = []
+        for chunk in chunks:
+            encoding = self.embedding_tokenizer(chunk, add_special_tokens=False, return_offsets_mapping=True)
+            offsets = encoding["offset_mapping"]
+            if len(offsets) <= self.chunk_size:
+                budgeted.append(chunk)
+                continue
+            for start in range(0, len(offsets), self.chunk_size):
+                window = offsets[start:start + self.chunk_size]
+                piece = chunk[window[0][0]:window[-1][1]].strip()
+                if piece:
+                    budgeted.append(piece)
+        return budgeted
+
+    def token_stats(self, chunks: List[str]) -> Optional[Dict[str, Any]]:
+        """Tokens por chunk e quantos passam do limite do encoder (truncados silenciosamente no embedding)"""
+        if self.embedding_tokenizer is None or not self.max_seq_length or not chunks:
+            return None
+        counts = [len(ids) for ids in self.embedding_tokenizer(chunks, add_special_tokens=True)["input_ids"]]
+        truncated = [count for count in counts if count > self.max_seq_length]
+        return {
+            "chunks": len(counts),
+            "tokens_total": sum(counts),
+            "tokens_max": max(counts),
+            "chunks_truncated": len(truncated),
+            "tokens_truncated": sum(count - self.max_seq_length for count in truncated)
+        }
+
+    def load_document(self, file_path: str) -> Optional[Document]:
+        """Lê, extrai metadados e limpa um único arquivo .txt (None se vazio ou com erro)"""
+        filename = os.path.basename(file_path)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                content = file.read().strip()
+            
+            title, category = self._extract_metadata_from_content(content)
+            clean_content = self._clean_content(content)
+            
+            if not clean_content.strip():
+                print(f"Arquivo vazio após limpeza: {filename}")
+                return None
+            
+            document = Document(
+                title=title or filename.replace('.txt', ''),
+                category=category or "sem_categoria",
+                content=clean_content,
+                metadata={
+                    "source_file": filename,
+                    "file_path": file_path
+                }
+            )
+            
+            print(f"Documento processado: {filename} (título: {title})")
+            return document
+        
+        except Exception as e:
+            print(f"Erro ao processar {filename}: {e}")
+            return None
+
     def _extract_metadata_from_content(self, content: str) -> tuple:
         """Extrai metadados (título e categoria) do conteúdo do arquivo"""
         lines = content.split('\n')
@@ -189,6 +271,8 @@ class DocumentProcessor:
         
     def chunk_document(self, document: Document) -> List[Document]:
         chunks = self.text_splitter.split_text(document.content)
+        if self.chunking_mode == "tokens":
+            chunks = self._enforce_token_budget(chunks)
         
         chunked_documents = []
         for i, chunk in enumerate(chunks):
@@ -198,6 +282,7 @@ class DocumentProcessor:
                 content=chunk,
                 metadata={
                     **document.metadata,
+                    "document_title": document.title,
                     "chunk_index": i,
                     "total_chunks": len(chunks)
                 }
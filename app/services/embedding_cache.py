@@ -0,0 +1,183 @@
+import glob
+import hashlib
+import os
+import uuid
+from typing import Dict, List, Optional, Tuple, Any
+import numpy as np
+
+
+class EmbeddingCache:
+    """
+    Cache persistente de embeddings endereçado por conteúdo
+
+    Chave: SHA-256 do texto do chunk, em um diretório por modelo de embedding
+    (o par modelo + hash identifica o vetor). Recargas, mudanças de chunking
+    que preservam trechos e reconstruções de coleção reaproveitam os vetores
+    já calculados em vez de chamar o encoder.
+
+    ARMAZENAMENTO:
+    - segment_<instância>_NNNNN.f32: vetores float32 crus [n, dim], lidos via memory-map
+    - segment_<instância>_NNNNN.keys: um hash por linha, na mesma ordem dos vetores
+    - Cada instância só acrescenta aos próprios segmentos: `flush()` grava no
+      fim dos dois arquivos apenas os vetores pendentes (nada é reescrito e
+      processos diferentes não disputam o mesmo arquivo); com `shard_size`
+      linhas a instância passa para um segmento novo
+    - Vetores antes das chaves: quem lê usa só as linhas presentes nos dois
+      arquivos, então uma gravação em andamento ou interrompida nunca expõe
+      uma chave sem vetor
+    - Vetores novos ficam pendentes em memória até `flush()`; com `max_pending`
+      pendentes o flush é automático, então misses no caminho das consultas
+      não acumulam memória sem limite
+    - `reload()` relê os segmentos gravados por outros processos
+    - shard_NNNNN.npy/.keys de versões anteriores continuam sendo lidos
+    """
+
+    def __init__(self, directory: str, dim: int, shard_size: int = 8192, max_pending: Optional[int] = None):
+        self.directory = directory
+        self.dim = dim
+        self.shard_size = shard_size
+        self.max_pending = max_pending or shard_size
+        self.hits = 0
+        self.misses = 0
+
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._shards: List[np.ndarray] = []
+        self._shard_paths: List[Tuple[str, str]] = []
+        self._pending: Dict[str, np.ndarray] = {}
+
+        # Segmento em que esta instância acrescenta vetores
+        self._writer = uuid.uuid4().hex[:12]
+        self._segment = 0
+        self._segment_rows = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self.reload()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._pending)
+
+    def _legacy_paths(self, shard: int) -> Tuple[str, str]:
+        base = os.path.join(self.directory, f"shard_{shard:05d}")
+        return f"{base}.npy", f"{base}.keys"
+
+    def _segment_paths(self, segment: int) -> Tuple[str, str]:
+        base = os.path.join(self.directory, f"segment_{self._writer}_{segment:05d}")
+        return f"{base}.f32", f"{base}.keys"
+
+    @staticmethod
+    def _read_keys(keys_path: str) -> List[str]:
+        with open(keys_path, "r", encoding="utf-8") as f:
+            lines = f.read().split("\n")
+        # A última linha sem quebra é uma gravação em andamento ou interrompida
+        return [line.strip() for line in lines[:-1] if line.strip()]
+
+    def reload(self) -> None:
+        """Lê os segmentos do disco (inclusive os gravados por outro processo); pendentes já gravados são descartados"""
+        found: List[Tuple[Tuple[str, str], np.ndarray, List[str]]] = []
+
+        shard = 0
+        while True:
+            vectors_path, keys_path = self._legacy_paths(shard)
+            if not os.path.exists(vectors_path) or not os.path.exists(keys_path):
+                break
+            vectors = np.load(vectors_path, mmap_mode="r")
+            found.append(((vectors_path, keys_path), vectors, self._read_keys(keys_path)[:len(vectors)]))
+            shard += 1
+
+        for keys_name in sorted(glob.glob(os.path.join(self.directory, "segment_*.keys"))):
+            vectors_path = f"{keys_name[:-len('.keys')]}.f32"
+            if not os.path.exists(vectors_path):
+                continue
+            keys = self._read_keys(keys_name)
+            rows = min(len(keys), os.path.getsize(vectors_path) // (self.dim * 4))
+            if rows:
+                vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+                found.append(((vectors_path, keys_name), vectors, keys[:rows]))
+
+        index: Dict[str, Tuple[int, int]] = {}
+        for slot, (_, _, keys) in enumerate(found):
+            for row, key in enumerate(keys):
+                index[key] = (slot, row)
+        self._index = index
+        self._shards = [vectors for _, vectors, _ in found]
+        self._shard_paths = [paths for paths, _, _ in found]
+        self._pending = {key: vector for key, vector in self._pending.items() if key not in index}
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        found = []
+        for key in keys:
+            if key in self._pending:
+                found.append(self._pending[key])
+            elif key in self._index:
+                shard, row = self._index[key]
+                found.append(np.asarray(self._shards[shard][row]))
+            else:
+                found.append(None)
+        hits = sum(1 for vector in found if vector is not None)
+        self.hits += hits
+        self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        for key, vector in zip(keys, np.asarray(vectors, dtype=np.float32).reshape(len(keys), self.dim)):
+            if key not in self._index:
+                self._pending[key] = vector
+        if len(self._pending) >= self.max_pending:
+            self.flush()
+
+    def flush(self) -> int:
+        """Acrescenta os vetores pendentes ao segmento desta instância; retorna quantos foram gravados"""
+        if not self._pending:
+            return 0
+        keys = list(self._pending)
+        vectors = np.stack([self._pending[key] for key in keys]).astype(np.float32)
+
+        written = 0
+        while written < len(keys):
+            vectors_path, keys_path = self._segment_paths(self._segment)
+            # Segmento cheio ou com sobra de uma gravação que falhou: as linhas deixariam de bater com as chaves
+            if self._segment_rows >= self.shard_size or (
+                os.path.exists(vectors_path) and os.path.getsize(vectors_path) != self._segment_rows * self.dim * 4
+            ):
+                self._segment += 1
+                self._segment_rows = 0
+                vectors_path, keys_path = self._segment_paths(self._segment)
+            batch_keys = keys[written:written + self.shard_size - self._segment_rows]
+            with open(vectors_path, "ab") as f:
+                f.write(vectors[written:written + len(batch_keys)].tobytes())
+            with open(keys_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(batch_keys) + "\n")
+
+            first_row = self._segment_rows
+            self._segment_rows += len(batch_keys)
+            mapped = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(self._segment_rows, self.dim))
+            if first_row == 0:
+                self._shards.append(mapped)
+                self._shard_paths.append((vectors_path, keys_path))
+            slot = self._shard_paths.index((vectors_path, keys_path))
+            self._shards[slot] = mapped
+            for row, key in enumerate(batch_keys, start=first_row):
+                self._index[key] = (slot, row)
+            written += len(batch_keys)
+
+        self._pending = {}
+        return written
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "shards": len(self._shards),
+            "disk_bytes": sum(
+                os.path.getsize(path)
+                for paths in self._shard_paths
+                for path in paths if os.path.exists(path)
+            ),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None
+        }
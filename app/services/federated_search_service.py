@@ -0,0 +1,223 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+from sentence_transformers import SentenceTransformer
+from app.core.config import settings
+from app.models.document import Document, DocumentResponse
+from app.services.rank_fusion import reciprocal_rank_fusion
+
+# Modelos por nome, compartilhados entre instâncias (AdminController e ChatController)
+_MODELS: Dict[str, SentenceTransformer] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def load_model(name: str) -> SentenceTransformer:
+    """Carrega cada modelo uma única vez, mesmo com fontes consultadas em paralelo"""
+    with _MODELS_LOCK:
+        if name not in _MODELS:
+            _MODELS[name] = SentenceTransformer(name)
+        return _MODELS[name]
+
+
+class FederatedSearchService:
+    """
+    Busca federada em vários pares (coleção, modelo de embedding)
+
+    Cada fonte é configurada em FEDERATED_SOURCES (JSON), por exemplo:
+        [{"name": "minilm", "collection": "documents", "model": "all-MiniLM-L6-v2"},
+         {"name": "e5", "collection": "documents_e5", "model": "intfloat/multilingual-e5-small",
+          "ingest": true, "timeout": 1.5}]
+
+    PROCESSO:
+    1. Consulta todas as fontes em paralelo (cada uma com seu modelo)
+    2. Fontes que passam do timeout são descartadas da resposta
+    3. Os rankings restantes são fundidos com Reciprocal Rank Fusion
+    4. Retorna a latência e o status de cada fonte
+
+    Fontes com "ingest": true recebem os mesmos chunks da ingestão principal,
+    embedados com o próprio modelo (útil para A/B de modelos de embedding).
+
+    Os modelos de todas as fontes são carregados na inicialização, fora do
+    timeout das consultas. Uma fonte cuja coleção não existe responde com
+    status "unknown_source" (a coleção não é criada na consulta).
+    """
+
+    def __init__(self, vector_service):
+        self.vector_service = vector_service
+        self.sources = settings.federated_sources
+        with _MODELS_LOCK:
+            _MODELS.setdefault(settings.embedding_model, vector_service.embedding_model)
+        for source in self.sources:
+            load_model(self._source_target(source)[1])
+        self._collections: Dict[str, Any] = {}
+        # Pool dedicado: uma fonte lenta não bloqueia o executor padrão do asyncio
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, 2 * len(self.sources)),
+            thread_name_prefix="federated"
+        )
+
+    @staticmethod
+    def _source_target(source: Dict[str, Any]) -> tuple:
+        return (
+            source.get("collection", settings.chroma_collection_name),
+            source.get("model", settings.embedding_model)
+        )
+
+    @staticmethod
+    def _is_primary(collection_name: str, model_name: str) -> bool:
+        return collection_name == settings.chroma_collection_name and model_name == settings.embedding_model
+
+    def _collection(self, name: str, create: bool = False):
+        """Coleção da fonte; só a ingestão cria coleções (um nome errado na consulta vira LookupError)"""
+        if name not in self._collections:
+            if not create and name not in self.vector_service.collection_names():
+                raise LookupError(f"Coleção '{name}' não existe")
+            self._collections[name] = self.vector_service.client.get_or_create_collection(
+                name=name,
+                metadata=self.vector_service._collection_metadata()
+            )
+        return self._collections[name]
+
+    def _search_source(
+        self,
+        source: Dict[str, Any],
+        query: str,
+        limit: int,
+        category_filter: Optional[str]
+    ) -> List[DocumentResponse]:
+        collection_name, model_name = self._source_target(source)
+        embedding = load_model(model_name).encode([query], normalize_embeddings=True)[0].tolist()
+
+        # Fonte principal: usa o caminho de busca do VectorService (quantizado, shards, partições)
+        if self._is_primary(collection_name, model_name):
+            return self.vector_service._search(embedding, limit, category_filter)
+
+        where_filter = {"category": category_filter} if category_filter else None
+        return self.vector_service._query_collection(
+            self._collection(collection_name), embedding, limit, where_filter
+        )
+
+    async def _timed_search(
+        self,
+        source: Dict[str, Any],
+        query: str,
+        limit: int,
+        category_filter: Optional[str]
+    ) -> Dict[str, Any]:
+        timeout = source.get("timeout", settings.federated_source_timeout)
+        collection_name, model_name = self._source_target(source)
+        report = {"name": source["name"], "collection": collection_name, "model": model_name}
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            documents = await asyncio.wait_for(
+                loop.run_in_executor(self._executor, self._search_source, source, query, limit, category_filter),
+                timeout=timeout
+            )
+            report.update(status="ok", documents=documents)
+        except asyncio.TimeoutError:
+            # A thread segue até terminar, mas a resposta não espera por ela
+            report.update(status="timeout", documents=[], error=f"Fonte excedeu {timeout}s")
+        except LookupError as e:
+            report.update(status="unknown_source", documents=[], error=str(e))
+        except Exception as e:
+            report.update(status="error", documents=[], error=str(e))
+        report["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return report
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 5,
+        category_filter: Optional[str] = None,
+        source_names: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        sources = [source for source in self.sources if not source_names or source["name"] in source_names]
+        if category_filter == "string":
+            category_filter = None
+
+        # Troca do alias (reconstrução blue/green) e índices recarregados antes de despachar as buscas nas threads
+        self.vector_service.refresh()
+        start = time.perf_counter()
+        reports = await asyncio.gather(*[
+            self._timed_search(source, query, limit, category_filter) for source in sources
+        ])
+
+        fused = reciprocal_rank_fusion(
+            [[doc.id for doc in report["documents"]] for report in reports],
+            k=settings.hybrid_rrf_k,
+            weights=[source.get("weight", 1.0) for source in sources]
+        )[:limit]
+
+        # Mantém a primeira ocorrência de cada chunk e registra em quais fontes apareceu
+        by_id: Dict[str, DocumentResponse] = {}
+        found_in: Dict[str, List[str]] = {}
+        for report in reports:
+            for doc in report["documents"]:
+                by_id.setdefault(doc.id, doc)
+                found_in.setdefault(doc.id, []).append(report["name"])
+
+        results = []
+        for doc_id, rrf_score in fused:
+            doc = by_id[doc_id]
+            doc.metadata = {
+                **doc.metadata,
+                "rrf_score": round(rrf_score, 6),
+                "federated_sources": ",".join(found_in[doc_id])
+            }
+            results.append(doc)
+
+        return {
+            "query": query,
+            "results": results,
+            "total_results": len(results),
+            "search_metadata": {
+                "fusion": "rrf",
+                "total_latency_ms": round((time.perf_counter() - start) * 1000, 2),
+                "sources": [
+                    {
+                        **{key: value for key, value in report.items() if key != "documents"},
+                        "results": len(report["documents"])
+                    }
+                    for report in reports
+                ]
+            }
+        }
+
+    def add_documents(self, documents: List[Document], doc_ids: List[str]) -> int:
+        """Replica chunks já indexados nas fontes com "ingest": true (embedados com o modelo da fonte)"""
+        indexed = 0
+        for source in self.sources:
+            collection_name, model_name = self._source_target(source)
+            if not source.get("ingest") or self._is_primary(collection_name, model_name):
+                continue
+
+            embeddings = load_model(model_name).encode(
+                [doc.content for doc in documents], normalize_embeddings=True
+            ).tolist()
+            self._collection(collection_name, create=True).upsert(
+                ids=doc_ids,
+                documents=[doc.content for doc in documents],
+                embeddings=embeddings,
+                metadatas=[
+                    {"title": doc.title, "category": doc.category, **doc.metadata}
+                    for doc in documents
+                ]
+            )
+            indexed += len(documents)
+        return indexed
+
+    def delete_documents(self, doc_ids: List[str]) -> None:
+        """Remove chunks das fontes com "ingest": true (arquivos alterados ou removidos)"""
+        for source in self.sources:
+            collection_name, model_name = self._source_target(source)
+            if not source.get("ingest") or self._is_primary(collection_name, model_name):
+                continue
+            try:
+                self._collection(collection_name).delete(ids=doc_ids)
+            except LookupError:
+                # Nada foi replicado nessa fonte ainda
+                continue
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set
+
+
+class IngestionManifest:
+    """
+    Manifesto de ingestão: o que já foi indexado a partir de cada arquivo
+
+    Para cada arquivo (caminho absoluto) guarda:
+    - hash SHA-256 do conteúdo bruto
+    - fingerprint do pipeline (modelo de embedding, parâmetros de chunking)
+    - ids dos chunks gerados
+    - ids dos chunks já indexados dos quais chunks do arquivo eram quase duplicatas
+      (se um deles for apagado, o arquivo é reprocessado)
+
+    Em uma nova carga, arquivos com o mesmo hash e fingerprint são pulados,
+    arquivos alterados são reprocessados e arquivos que sumiram do diretório
+    têm seus chunks removidos.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.files = json.load(f)
+
+    @staticmethod
+    def file_hash(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        return self.files.get(os.path.abspath(file_path))
+
+    def is_unchanged(self, file_path: str, file_hash: str, fingerprint: str) -> bool:
+        entry = self.get(file_path)
+        return entry is not None and entry["hash"] == file_hash and entry.get("fingerprint") == fingerprint
+
+    def set(
+        self,
+        file_path: str,
+        file_hash: str,
+        fingerprint: str,
+        chunk_ids: List[str],
+        duplicate_of: Optional[List[str]] = None
+    ) -> None:
+        self.files[os.path.abspath(file_path)] = {
+            "hash": file_hash,
+            "fingerprint": fingerprint,
+            "chunk_ids": chunk_ids,
+            "indexed_at": datetime.now().isoformat()
+        }
+        if duplicate_of:
+            self.files[os.path.abspath(file_path)]["duplicate_of"] = duplicate_of
+
+    def remove(self, file_path: str) -> None:
+        self.files.pop(os.path.abspath(file_path), None)
+
+    def files_in(self, directory_path: str) -> List[str]:
+        """Arquivos do manifesto que pertencem ao diretório (outras cargas não são afetadas)"""
+        directory = os.path.abspath(directory_path)
+        return [path for path in self.files if os.path.dirname(path) == directory]
+
+    def files_with_duplicates_of(self, chunk_ids: Set[str]) -> List[str]:
+        """Arquivos que tiveram chunks descartados como duplicatas de algum dos chunks informados"""
+        return [
+            path for path, entry in self.files.items()
+            if not chunk_ids.isdisjoint(entry.get("duplicate_of", ()))
+        ]
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.files, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
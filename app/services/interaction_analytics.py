@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from sqlalchemy import text
+from app.services.database_service import AsyncSessionLocal
+
+# Dimensões e métricas aceitas (listas fechadas: entram no SQL como expressões)
+TIME_BUCKETS = {
+    "minute": "%Y-%m-%d %H:%M",
+    "hour": "%Y-%m-%d %H:00",
+    "day": "%Y-%m-%d"
+}
+DIMENSIONS = {
+    "category": "COALESCE(category, 'sem categoria')",
+    "model": "COALESCE(model_version, 'desconhecido')",
+    "provider": "COALESCE(llm_provider, 'desconhecido')",
+    "embedding_model": "COALESCE(embedding_model, 'desconhecido')"
+}
+METRICS = {
+    "response_time_ms": "response_time * 1000.0",
+    "embedding_ms": "embedding_ms",
+    "search_ms": "search_ms",
+    "compression_ms": "compression_ms",
+    "prompt_ms": "prompt_ms",
+    "llm_queue_ms": "llm_queue_ms",
+    "llm_ms": "llm_ms",
+    "ttft_ms": "ttft_ms",
+    "context_tokens": "context_tokens",
+    "context_tokens_saved": "context_tokens_saved"
+}
+PERCENTILES = (50, 95, 99)
+
+
+class InteractionAnalytics:
+    """
+    Percentis de latência e uso de tokens das interações, calculados no SQLite
+
+    AGRUPAMENTO:
+    - time (balde de minuto, hora ou dia), category, model, provider e
+      embedding_model, combináveis (ex.: time + model)
+
+    PERCENTIS:
+    - Nearest-rank por grupo com funções de janela: o pN é o menor valor cuja
+      posição na ordem crescente alcança N% do grupo; só os registros
+      agregados saem do banco, não as interações
+    """
+
+    def _group_expressions(self, group_by: List[str], bucket: str) -> List[str]:
+        expressions = []
+        for dimension in group_by:
+            if dimension == "time":
+                expressions.append(f"strftime('{TIME_BUCKETS[bucket]}', timestamp)")
+            else:
+                expressions.append(DIMENSIONS[dimension])
+        return expressions
+
+    async def performance(
+        self,
+        group_by: List[str],
+        metric: str = "response_time_ms",
+        bucket: str = "hour",
+        since_hours: Optional[float] = 24.0
+    ) -> List[Dict[str, Any]]:
+        """Uma linha por grupo: contagem, média e p50/p95/p99 da métrica, tokens e TTFT médio"""
+        groups = self._group_expressions(group_by, bucket)
+        group_columns = [f"g{i}" for i in range(len(groups))] or ["g0"]
+        select_groups = ", ".join(
+            f"{expression} AS {column}" for expression, column in zip(groups or ["'todas'"], group_columns)
+        )
+        partition = ", ".join(group_columns)
+        percentiles = ",\n                ".join(
+            f"MIN(CASE WHEN rn * 100 >= n * {p} THEN value END) AS p{p}" for p in PERCENTILES
+        )
+
+        sql = f"""
+            WITH base AS (
+                SELECT {select_groups},
+                       {METRICS[metric]} AS value,
+                       prompt_tokens, completion_tokens, ttft_ms
+                FROM rag_interactions
+                WHERE (:since IS NULL OR timestamp >= :since)
+            ),
+            ranked AS (
+                SELECT {partition}, value,
+                       ROW_NUMBER() OVER (PARTITION BY {partition} ORDER BY value) AS rn,
+                       COUNT(*) OVER (PARTITION BY {partition}) AS n
+                FROM base
+                WHERE value IS NOT NULL
+            ),
+            percentiles AS (
+                SELECT {partition}, MAX(n) AS samples,
+                {percentiles}
+                FROM ranked
+                GROUP BY {partition}
+            ),
+            totals AS (
+                SELECT {partition},
+                       COUNT(*) AS interactions,
+                       AVG(value) AS mean,
+                       AVG(ttft_ms) AS avg_ttft_ms,
+                       SUM(prompt_tokens) AS prompt_tokens,
+                       SUM(completion_tokens) AS completion_tokens,
+                       AVG(prompt_tokens) AS avg_prompt_tokens,
+                       AVG(completion_tokens) AS avg_completion_tokens
+                FROM base
+                GROUP BY {partition}
+            )
+            SELECT totals.*, percentiles.samples, {", ".join(f"percentiles.p{p}" for p in PERCENTILES)}
+            FROM totals
+            LEFT JOIN percentiles USING ({partition})
+            ORDER BY {partition}
+        """
+        since = None
+        if since_hours is not None:
+            since = (datetime.utcnow() - timedelta(hours=since_hours)).strftime("%Y-%m-%d %H:%M:%S")
+
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(text(sql), {"since": since})
+            rows = result.mappings().all()
+
+        def rounded(value):
+            return round(value, 2) if isinstance(value, float) else value
+
+        return [
+            {
+                "group": {dimension: row[column] for dimension, column in zip(group_by, group_columns)},
+                "interactions": row["interactions"],
+                "samples": row["samples"] or 0,
+                "mean": rounded(row["mean"]),
+                **{f"p{p}": rounded(row[f"p{p}"]) for p in PERCENTILES},
+                "avg_ttft_ms": rounded(row["avg_ttft_ms"]),
+                "prompt_tokens": row["prompt_tokens"],
+                "completion_tokens": row["completion_tokens"],
+                "avg_prompt_tokens": rounded(row["avg_prompt_tokens"]),
+                "avg_completion_tokens": rounded(row["avg_completion_tokens"])
+            }
+            for row in rows
+        ]
+
+
+interaction_analytics = InteractionAnalytics()
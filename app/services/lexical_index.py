@@ -0,0 +1,201 @@
+import json
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Tokeniza texto em português para busca lexical
+
+    - Caixa baixa e remoção de acentos ("Crédito" == "credito")
+    - Códigos com separadores internos são mantidos inteiros ("PLD-2023", "4.753")
+    """
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return _TOKEN_PATTERN.findall(normalized)
+
+
+class BM25Index:
+    """
+    Índice invertido BM25 em memória, persistido ao lado do chroma_data
+
+    ESTRUTURA:
+    - Matriz esparsa documento x termo com as frequências (scipy CSR)
+    - Na primeira busca após alterações, os pesos BM25 de cada par
+      (documento, termo) são pré-calculados numa matriz CSC
+
+    BUSCA (vetorizada):
+    - Seleciona as colunas dos termos da consulta e soma por documento
+    - Custo proporcional ao número de postings dos termos, sem loop em Python
+    - O filtro de categoria compara um vetor de códigos inteiros, montado
+      junto com os pesos
+
+    Reindexar um id já presente substitui a linha dele (sem duplicar o chunk
+    no ranking).
+    """
+
+    def __init__(self, directory: str, k1: float = 1.5, b: float = 0.75):
+        self.directory = directory
+        self.k1 = k1
+        self.b = b
+        self.matrix_path = os.path.join(directory, "bm25_tf.npz")
+        self.meta_path = os.path.join(directory, "bm25_meta.json")
+
+        self.ids: List[str] = []
+        self.categories: List[str] = []
+        self.vocabulary: Dict[str, int] = {}
+        self._tf = sparse.csr_matrix((0, 0), dtype=np.float32)
+        self._pending: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._weights: Optional[sparse.csc_matrix] = None
+        self._indexed: set = set()
+        self._category_codes = np.empty(0, dtype=np.int32)
+        self._code_of: Dict[str, int] = {}
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def reload(self) -> None:
+        """Lê o índice salvo (inclusive por outra instância), descartando o estado em memória"""
+        if not os.path.exists(self.meta_path) or not os.path.exists(self.matrix_path):
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        tf = sparse.load_npz(self.matrix_path).tocsr()
+        self._pending = []
+        self._weights = None
+        self.ids = meta["ids"]
+        self.categories = meta["categories"]
+        self.vocabulary = meta["vocabulary"]
+        self._tf = tf
+        self._indexed = set(self.ids)
+
+    def save(self) -> None:
+        self._merge_pending()
+        os.makedirs(self.directory, exist_ok=True)
+        sparse.save_npz(self.matrix_path, self._tf)
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "ids": self.ids,
+                "categories": self.categories,
+                "vocabulary": self.vocabulary
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    def add(self, ids: List[str], texts: List[str], categories: List[str]) -> None:
+        # Último texto de cada id vale; ids já indexados têm a linha antiga removida
+        latest = {doc_id: (text, category) for doc_id, text, category in zip(ids, texts, categories)}
+        existing = [doc_id for doc_id in latest if doc_id in self._indexed]
+        if existing:
+            self.remove(existing)
+        for doc_id, (text, category) in latest.items():
+            counts = Counter(tokenize(text))
+            term_ids = np.fromiter(
+                (self.vocabulary.setdefault(term, len(self.vocabulary)) for term in counts),
+                dtype=np.int64, count=len(counts)
+            )
+            self._pending.append((term_ids, np.fromiter(counts.values(), dtype=np.float32, count=len(counts))))
+            self.ids.append(doc_id)
+            self.categories.append(category)
+            self._indexed.add(doc_id)
+        self._weights = None
+
+    def remove(self, ids: List[str]) -> int:
+        """Remove documentos do índice (linhas da matriz); retorna quantos foram removidos"""
+        to_remove = set(ids)
+        keep = np.fromiter((doc_id not in to_remove for doc_id in self.ids), dtype=bool, count=len(self.ids))
+        removed = int((~keep).sum())
+        if not removed:
+            return 0
+
+        self._merge_pending()
+        self._tf = self._tf[np.flatnonzero(keep)]
+        self.ids = [doc_id for doc_id, kept in zip(self.ids, keep) if kept]
+        self.categories = [category for category, kept in zip(self.categories, keep) if kept]
+        self._indexed.difference_update(to_remove)
+        self._weights = None
+        return removed
+
+    def _merge_pending(self) -> None:
+        if not self._pending:
+            return
+        n_terms = len(self.vocabulary)
+        indptr = np.zeros(len(self._pending) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(term_ids) for term_ids, _ in self._pending])
+        new_rows = sparse.csr_matrix(
+            (
+                np.concatenate([counts for _, counts in self._pending]),
+                np.concatenate([term_ids for term_ids, _ in self._pending]),
+                indptr
+            ),
+            shape=(len(self._pending), n_terms)
+        )
+        existing = self._tf
+        existing.resize((existing.shape[0], n_terms))
+        self._tf = sparse.vstack([existing, new_rows], format="csr")
+        self._pending = []
+
+    def _build_weights(self) -> sparse.csc_matrix:
+        """Pré-calcula idf(t) * tf*(k1+1) / (tf + k1*(1 - b + b*dl/avgdl)) para todos os postings"""
+        self._merge_pending()
+        tf = self._tf
+        n_docs = tf.shape[0]
+        doc_lengths = np.asarray(tf.sum(axis=1)).ravel()
+        avg_length = doc_lengths.mean() if n_docs else 0.0
+
+        doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log(1 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        row_norm = self.k1 * (1 - self.b + self.b * doc_lengths / (avg_length or 1.0))
+        rows = np.repeat(np.arange(n_docs), np.diff(tf.indptr))
+        data = tf.data * (self.k1 + 1) / (tf.data + row_norm[rows]) * idf[tf.indices]
+
+        weights = sparse.csr_matrix((data.astype(np.float32), tf.indices, tf.indptr), shape=tf.shape)
+        return weights.tocsc()
+
+    def search(
+        self,
+        query: str,
+        limit: int = 5,
+        category_filter: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Retorna [(id, score BM25)] dos documentos com ao menos um termo da consulta"""
+        if not self.ids:
+            return []
+        if self._weights is None:
+            self._weights = self._build_weights()
+            self._code_of = {}
+            self._category_codes = np.fromiter(
+                (self._code_of.setdefault(category, len(self._code_of)) for category in self.categories),
+                dtype=np.int32, count=len(self.categories)
+            )
+
+        term_ids = sorted({self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary})
+        if not term_ids:
+            return []
+
+        scores = np.asarray(self._weights[:, term_ids].sum(axis=1)).ravel()
+        if category_filter:
+            scores[self._category_codes != self._code_of.get(category_filter, -1)] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates])]
+
+        return [(self.ids[i], float(scores[i])) for i in candidates]
+
+    def stats(self) -> Dict[str, Any]:
+        self._merge_pending()
+        return {
+            "documents": len(self.ids),
+            "vocabulary_size": len(self.vocabulary),
+            "postings": int(self._tf.nnz)
+        }
@@ -0,0 +1,53 @@
+from typing import Optional
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from app.core.config import settings
+
+# Endereço padrão do servidor falso (python -m benchmarks.fake_openai_server)
+FAKE_LLM_BASE_URL = "http://localhost:8900/v1"
+
+
+def _endpoint() -> tuple:
+    """(base_url, api_key) conforme LLM_PROVIDER"""
+    if settings.llm_provider == "openai":
+        return None, settings.openai_api_key
+    if settings.llm_provider == "fake":
+        return settings.llm_base_url or FAKE_LLM_BASE_URL, settings.llm_api_key or "fake"
+    if settings.llm_provider == "openai_compatible":
+        if not settings.llm_base_url:
+            raise ValueError("LLM_PROVIDER=openai_compatible exige LLM_BASE_URL")
+        return settings.llm_base_url, settings.llm_api_key or settings.openai_api_key or "none"
+    raise ValueError(f"LLM_PROVIDER desconhecido: {settings.llm_provider}")
+
+
+def create_chat_model(temperature: Optional[float] = None) -> ChatOpenAI:
+    """
+    Modelo de chat conforme LLM_PROVIDER
+
+    - openai: API da OpenAI (padrão)
+    - openai_compatible: qualquer servidor com a API de chat da OpenAI em
+      LLM_BASE_URL (vLLM, Ollama, LiteLLM...)
+    - fake: servidor falso local para testes de carga sem gastar cota
+    """
+    base_url, api_key = _endpoint()
+    return ChatOpenAI(
+        model=settings.llm_model,
+        temperature=settings.llm_temperature if temperature is None else temperature,
+        api_key=api_key,
+        base_url=base_url,
+        timeout=settings.llm_timeout,
+        max_retries=settings.llm_max_retries,
+        streaming=settings.llm_streaming,
+        # Uso de tokens também no streaming (último chunk)
+        stream_usage=True
+    )
+
+
+def create_embeddings() -> OpenAIEmbeddings:
+    """Embeddings do mesmo provedor (usados pelo RAGAS em answer_relevancy)"""
+    base_url, api_key = _endpoint()
+    return OpenAIEmbeddings(
+        api_key=api_key,
+        base_url=base_url,
+        # Servidores compatíveis recebem texto, não tokens do tiktoken
+        check_embedding_ctx_length=settings.llm_provider == "openai"
+    )
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Any, Optional, TypeVar
+import numpy as np
+from app.core.config import settings
+from app.services.llm_scheduler import LLMScheduler, llm_scheduler
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailableError(Exception):
+    """LLM sem resposta dentro do prazo ou circuito aberto (a rota responde 503/504)"""
+
+    def __init__(self, message: str, error_code: str = "LLM_UNAVAILABLE", retry_after: float = 1.0):
+        self.message = message
+        self.error_code = error_code
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class CircuitBreaker:
+    """
+    Disjuntor para o provedor do LLM
+
+    ESTADOS:
+    - closed: chamadas normais; `failure_threshold` falhas seguidas abrem o circuito
+    - open: falha imediata (sem esperar timeout) durante `reset_timeout` segundos
+    - half_open: passado o tempo, uma única chamada de teste decide se fecha
+      (sucesso) ou reabre (falha) o circuito
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    def _retry_after(self) -> float:
+        return max(self.reset_timeout - (time.monotonic() - (self.opened_at or 0.0)), 0.0)
+
+    def check(self) -> None:
+        """Levanta LLMUnavailableError se a chamada não deve nem ser tentada"""
+        if self.state == "open" and self._retry_after() <= 0:
+            self.state = "half_open"
+        if self.state == "closed":
+            return
+        if self.state == "half_open" and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        self._reject()
+
+    def fail_fast(self) -> None:
+        """Como `check`, mas sem reservar a chamada de teste (usado antes de entrar na fila)"""
+        if self.state == "open" and self._retry_after() > 0:
+            self._reject()
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        raise LLMUnavailableError(
+            "Provedor do LLM indisponível (circuito aberto após falhas consecutivas)",
+            error_code="LLM_CIRCUIT_OPEN",
+            retry_after=self._retry_after() or 1.0
+        )
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.times_opened += 1
+                logger.warning("LLM: circuito aberto após %s falhas seguidas", self.consecutive_failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def release_probe(self) -> None:
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "reset_timeout_s": self.reset_timeout,
+            "retry_after_s": round(self._retry_after(), 2) if self.state == "open" else None,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected
+        }
+
+
+class ResilientCaller:
+    """
+    Chamadas ao LLM com prazo, requisição redundante (hedging) e disjuntor
+
+    PRAZO:
+    - Cada chamada lógica (incluindo a redundante) termina em `deadline`
+      segundos; ao estourar, é cancelada e conta como falha
+
+    HEDGING (opcional, `hedge_percentile` > 0):
+    - Se a chamada não respondeu depois do percentil configurado das latências
+      recentes (ex.: p95), uma segunda chamada idêntica é disparada; vale a
+      primeira que responder e a outra é cancelada
+    - Só com `hedge_min_samples` latências observadas; corta a cauda (p99)
+      causada por chamadas lentas isoladas ao custo de poucas chamadas extras
+    - Com `scheduler`, a chamada redundante ocupa um slot próprio da classe
+      (`try_acquire`, sem esperar) até terminar; sem slot livre não há hedging,
+      então as chamadas em voo nunca passam de LLM_MAX_CONCURRENCY
+
+    DISJUNTOR:
+    - Falhas e timeouts alimentam o CircuitBreaker; com o circuito aberto a
+      chamada falha na hora em vez de esperar o prazo
+    """
+
+    def __init__(
+        self,
+        deadline: float = 30.0,
+        hedge_percentile: float = 0.0,
+        hedge_min_samples: int = 20,
+        breaker: Optional[CircuitBreaker] = None,
+        scheduler: Optional[LLMScheduler] = None,
+        history: int = 500
+    ):
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self.scheduler = scheduler
+        self._latencies: Deque[float] = deque(maxlen=history)
+        self._counters = {
+            "calls": 0, "succeeded": 0, "failed": 0, "timeouts": 0,
+            "hedged": 0, "hedge_wins": 0, "hedge_skipped": 0
+        }
+
+    def hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile <= 0 or len(self._latencies) < self.hedge_min_samples:
+            return None
+        return float(np.percentile(self._latencies, self.hedge_percentile))
+
+    def _start_hedge(self, factory: Callable[[], Awaitable[T]], llm_class: str) -> Optional[asyncio.Future]:
+        """Dispara a chamada redundante se houver slot livre no scheduler"""
+        if self.scheduler is not None and not self.scheduler.try_acquire(llm_class):
+            self._counters["hedge_skipped"] += 1
+            return None
+        self._counters["hedged"] += 1
+        hedge = asyncio.ensure_future(factory())
+        if self.scheduler is not None:
+            # Slot devolvido só quando a chamada termina de fato (inclusive cancelada)
+            hedge.add_done_callback(lambda _: self.scheduler.release(llm_class))
+        return hedge
+
+    async def _hedged(self, factory: Callable[[], Awaitable[T]], llm_class: str) -> T:
+        primary = asyncio.ensure_future(factory())
+        tasks = [primary]
+        try:
+            delay = self.hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                hedge = None if done else self._start_hedge(factory, llm_class)
+                if hedge is not None:
+                    tasks.append(hedge)
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            self._counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def call(self, factory: Callable[[], Awaitable[T]], llm_class: str = "interactive") -> T:
+        """Executa `factory()` (uma chamada ao LLM, já dentro de um slot de `llm_class`) com prazo, hedging e disjuntor"""
+        self.breaker.check()
+        self._counters["calls"] += 1
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self._hedged(factory, llm_class), timeout=self.deadline)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            self.breaker.record_failure()
+            raise LLMUnavailableError(
+                f"LLM não respondeu em {self.deadline:.1f}s",
+                error_code="LLM_TIMEOUT",
+                retry_after=self.deadline
+            )
+        except asyncio.CancelledError:
+            # Cliente desistiu: não diz nada sobre a saúde do provedor
+            self.breaker.release_probe()
+            raise
+        except Exception:
+            self._counters["failed"] += 1
+            self.breaker.record_failure()
+            raise
+
+        self._counters["succeeded"] += 1
+        self._latencies.append(time.monotonic() - start)
+        self.breaker.record_success()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        latencies = np.asarray(self._latencies) * 1000
+        hedge_delay = self.hedge_delay()
+        return {
+            "deadline_s": self.deadline,
+            "hedge_percentile": self.hedge_percentile or None,
+            "hedge_delay_ms": round(hedge_delay * 1000, 1) if hedge_delay is not None else None,
+            **self._counters,
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+                "p95": round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+                "p99": round(float(np.percentile(latencies, 99)), 2) if len(latencies) else None
+            },
+            "circuit_breaker": self.breaker.stats()
+        }
+
+
+llm_caller = ResilientCaller(
+    deadline=settings.llm_timeout,
+    hedge_percentile=settings.llm_hedge_percentile,
+    hedge_min_samples=settings.llm_hedge_min_samples,
+    breaker=CircuitBreaker(
+        failure_threshold=settings.llm_circuit_failure_threshold,
+        reset_timeout=settings.llm_circuit_reset_timeout
+    ),
+    scheduler=llm_scheduler
+)
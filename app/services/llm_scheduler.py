@@ -0,0 +1,234 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Any, List, Optional
+import numpy as np
+from app.core.config import settings
+
+
+class LLMOverloadedError(Exception):
+    """Fila do LLM acima do orçamento de latência (a rota responde 429/503)"""
+
+    def __init__(self, message: str, error_code: str = "LLM_OVERLOADED", retry_after: float = 1.0):
+        self.message = message
+        self.error_code = error_code
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class _Waiter:
+    __slots__ = ("priority", "sequence", "llm_class", "weight", "future", "enqueued_at")
+
+    def __init__(self, priority: int, sequence: int, llm_class: str, weight: int, future: asyncio.Future):
+        self.priority = priority
+        self.sequence = sequence
+        self.llm_class = llm_class
+        self.weight = weight
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class LLMScheduler:
+    """
+    Controle de admissão e fila com prioridade para chamadas ao LLM
+
+    LIMITES:
+    - Global: no máximo `max_concurrency` slots em uso (chamadas simultâneas à OpenAI)
+    - Por classe: `interactive` (/ask) e `evaluation` (RAGAS) têm limites próprios;
+      uma avaliação ocupa de uma vez os slots que o RAGAS usa em paralelo
+
+    PRIORIDADE:
+    - Os slots livres vão para a classe de maior prioridade na fila (interactive
+      antes de evaluation); dentro da classe, ordem de chegada
+    - Um pedido de maior prioridade bloqueado só pelo limite global reserva os
+      próximos slots: uma avaliação não passa na frente de perguntas esperando
+
+    ADMISSÃO:
+    - Na chegada, a espera é estimada pelos pedidos à frente e pelo tempo médio
+      de serviço da classe; acima do orçamento de latência da classe a
+      requisição é recusada na hora (429) em vez de entrar na fila
+    - Um pedido admitido que espera mais que o orçamento sai da fila (503)
+    - `try_acquire` concede um slot só se houver capacidade livre e ninguém
+      esperando (usado pela chamada redundante do hedging, que nunca espera)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        class_limits: Dict[str, int],
+        priorities: Dict[str, int],
+        queue_budgets: Dict[str, float],
+        history: int = 1000
+    ):
+        self.max_concurrency = max_concurrency
+        self.class_limits = class_limits
+        self.priorities = priorities
+        self.queue_budgets = queue_budgets
+
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._in_use = 0
+        self._class_in_use: Dict[str, int] = {name: 0 for name in class_limits}
+        # Tempo médio de serviço por classe (média móvel exponencial), usado na estimativa de espera
+        self._service_time: Dict[str, Optional[float]] = {name: None for name in class_limits}
+        self._waits: Dict[str, Deque[float]] = {name: deque(maxlen=history) for name in class_limits}
+        self._counters: Dict[str, Dict[str, int]] = {
+            name: {"admitted": 0, "rejected": 0, "timed_out": 0, "completed": 0} for name in class_limits
+        }
+
+    def _fits(self, llm_class: str, weight: int) -> bool:
+        return (
+            self._in_use + weight <= self.max_concurrency
+            and self._class_in_use[llm_class] + weight <= self.class_limits[llm_class]
+        )
+
+    def _grant(self, llm_class: str, weight: int) -> None:
+        self._in_use += weight
+        self._class_in_use[llm_class] += weight
+
+    def _dispatch(self) -> None:
+        for waiter in sorted(self._queue):
+            if waiter.future.done():
+                continue
+            if self._fits(waiter.llm_class, waiter.weight):
+                self._grant(waiter.llm_class, waiter.weight)
+                waiter.future.set_result(None)
+            elif self._in_use + waiter.weight > self.max_concurrency:
+                # Sem slots globais: reserva para este pedido, os de menor prioridade esperam
+                break
+        self._queue = [waiter for waiter in self._queue if not waiter.future.done()]
+        heapq.heapify(self._queue)
+
+    def _estimated_wait(self, llm_class: str) -> float:
+        service_time = self._service_time[llm_class]
+        if service_time is None:
+            return 0.0
+        priority = self.priorities[llm_class]
+        ahead = sum(
+            waiter.weight for waiter in self._queue
+            if self.priorities[waiter.llm_class] <= priority and not waiter.future.done()
+        )
+        capacity = max(min(self.max_concurrency, self.class_limits[llm_class]), 1)
+        # Rodadas de serviço até chegar a vez deste pedido
+        return (ahead // capacity + 1) * service_time
+
+    def _record_service_time(self, llm_class: str, elapsed: float) -> None:
+        previous = self._service_time[llm_class]
+        self._service_time[llm_class] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+
+    @asynccontextmanager
+    async def slot(self, llm_class: str = "interactive", weight: int = 1):
+        """Reserva `weight` slots da classe enquanto o bloco executa"""
+        weight = max(1, min(weight, self.class_limits[llm_class], self.max_concurrency))
+        budget = self.queue_budgets[llm_class]
+        counters = self._counters[llm_class]
+
+        if self._queue or not self._fits(llm_class, weight):
+            estimated = self._estimated_wait(llm_class)
+            if estimated > budget:
+                counters["rejected"] += 1
+                raise LLMOverloadedError(
+                    f"Fila do LLM acima do orçamento ({estimated:.1f}s estimados > {budget:.1f}s)",
+                    error_code="LLM_OVERLOADED",
+                    retry_after=estimated
+                )
+
+        waiter = _Waiter(
+            self.priorities[llm_class], next(self._sequence), llm_class, weight,
+            asyncio.get_running_loop().create_future()
+        )
+        heapq.heappush(self._queue, waiter)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=budget)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                self._dispatch()
+                counters["timed_out"] += 1
+                raise LLMOverloadedError(
+                    f"Tempo de espera na fila do LLM excedeu {budget:.1f}s",
+                    error_code="LLM_QUEUE_TIMEOUT",
+                    retry_after=budget
+                )
+        except asyncio.CancelledError:
+            # Cliente desistiu: devolve o slot se ele já tinha sido concedido
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release(llm_class, weight)
+            else:
+                waiter.future.cancel()
+                self._dispatch()
+            raise
+
+        counters["admitted"] += 1
+        self._waits[llm_class].append(time.monotonic() - waiter.enqueued_at)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record_service_time(llm_class, (time.monotonic() - start) / weight)
+            counters["completed"] += 1
+            self._release(llm_class, weight)
+
+    def try_acquire(self, llm_class: str = "interactive", weight: int = 1) -> bool:
+        """Reserva slots sem esperar; False se a fila não está vazia ou não há capacidade"""
+        if any(not waiter.future.done() for waiter in self._queue) or not self._fits(llm_class, weight):
+            return False
+        self._grant(llm_class, weight)
+        return True
+
+    def release(self, llm_class: str = "interactive", weight: int = 1) -> None:
+        """Devolve slots obtidos com `try_acquire`"""
+        self._release(llm_class, weight)
+
+    def _release(self, llm_class: str, weight: int) -> None:
+        self._in_use -= weight
+        self._class_in_use[llm_class] -= weight
+        self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        classes = {}
+        for name in self.class_limits:
+            waits = np.asarray(self._waits[name]) * 1000
+            service_time = self._service_time[name]
+            classes[name] = {
+                "limit": self.class_limits[name],
+                "priority": self.priorities[name],
+                "queue_budget_s": self.queue_budgets[name],
+                "in_use": self._class_in_use[name],
+                "queue_depth": sum(1 for waiter in self._queue if waiter.llm_class == name and not waiter.future.done()),
+                **self._counters[name],
+                "service_time_ms": round(service_time * 1000, 1) if service_time is not None else None,
+                "wait_ms": {
+                    "samples": len(waits),
+                    "p50": round(float(np.percentile(waits, 50)), 2) if len(waits) else None,
+                    "p95": round(float(np.percentile(waits, 95)), 2) if len(waits) else None,
+                    "max": round(float(waits.max()), 2) if len(waits) else None
+                }
+            }
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_use": self._in_use,
+            "queue_depth": sum(1 for waiter in self._queue if not waiter.future.done()),
+            "classes": classes
+        }
+
+
+llm_scheduler = LLMScheduler(
+    max_concurrency=settings.llm_max_concurrency,
+    class_limits={
+        "interactive": settings.llm_interactive_concurrency,
+        "evaluation": settings.llm_evaluation_concurrency
+    },
+    priorities={"interactive": 0, "evaluation": 1},
+    queue_budgets={
+        "interactive": settings.llm_interactive_queue_budget,
+        "evaluation": settings.llm_evaluation_queue_budget
+    }
+)
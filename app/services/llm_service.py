@@ -1,8 +1,16 @@
+import logging
 import os
-from typing import List, Dict, Any
-from langchain_openai import ChatOpenAI
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from langchain.schema import HumanMessage, SystemMessage
 from app.core.config import settings
+from app.services.llm_provider import create_chat_model
+from app.services.context_packer import ContextPacker
+from app.services.llm_scheduler import llm_scheduler, LLMOverloadedError
+from app.services.llm_resilience import llm_caller, LLMUnavailableError
+from app.services.metrics import StageTimer, context_tokens_total
+
+logger = logging.getLogger(__name__)
 
 class LLMService:
     """
@@ -19,26 +27,39 @@ class LLMService:
     - Estruturação de mensagens
     - Tratamento de erros
     - Instrumentação automática (Phoenix monitora)
+    
+    As chamadas passam pelo LLMScheduler (classe "interactive"): a fila
+    cheia gera LLMOverloadedError, que vira 429/503 na rota. Dentro do slot,
+    o ResilientCaller aplica prazo, hedging e disjuntor: timeout e circuito
+    aberto geram LLMUnavailableError (504/503).
+    
+    O provedor vem de LLM_PROVIDER (openai, openai_compatible ou fake). Com
+    LLM_STREAMING=true a resposta é consumida em streaming e o tempo até o
+    primeiro token (TTFT) é medido.
     """
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model="gpt-3.5-turbo",
-            temperature=0.7,
-            api_key=settings.openai_api_key
+        self.llm = create_chat_model()
+        self.context_packer = ContextPacker(
+            model=self.llm.model_name,
+            max_tokens=settings.context_max_tokens,
+            score_gap=settings.context_score_gap,
+            min_documents=settings.context_min_documents
         )
     
     async def generate_answer(
         self, 
         question: str, 
-        context_documents: List[Dict[str, Any]]
+        context_documents: List[Dict[str, Any]],
+        timer: Optional[StageTimer] = None
     ) -> Dict[str, Any]:
         """
         FUNÇÃO PRINCIPAL: Gera resposta RAG usando LangChain + OpenAI
         
         PROCESSO DETALHADO:
         1. Pega documentos relevantes encontrados pelo vector search
-        2. Formata eles num contexto estruturado
+        2. Formata eles num contexto estruturado (ContextPacker: corte por score,
+           fusão de chunks vizinhos e orçamento de tokens)
         3. Cria prompt system (instruções para o AI)
         4. Cria prompt user (pergunta do usuário)
         5. Envia tudo para GPT via LangChain
@@ -47,20 +68,34 @@ class LLMService:
         Args:
             question: Pergunta do usuário
             context_documents: Lista de documentos relevantes encontrados pelo RAG
+            timer: StageTimer da execução (estágios prompt, llm_queue e llm)
             
         Returns:
-            Dict com resposta gerada, fontes citadas e metadados
+            Dict com resposta gerada, fontes citadas e metadados; `contexts` traz o
+            conteúdo exato de cada documento enviado no prompt (após o empacotamento)
         """
         
+        timer = timer or StageTimer()
+        prompt_start = time.perf_counter()
         context_text = ""
         sources = []
-        
+        packing_stats = None
+
+        if settings.context_packing_enabled:
+            context_documents, context_text, packing_stats = self.context_packer.pack(context_documents)
+            context_tokens_total.labels(kind="used").inc(packing_stats["context_tokens"])
+            context_tokens_total.labels(kind="saved").inc(packing_stats["tokens_saved"])
+            logger.debug(
+                "Contexto: %s/%s documentos, %s tokens (%s economizados)",
+                packing_stats["documents_used"], packing_stats["documents_retrieved"],
+                packing_stats["context_tokens"], packing_stats["tokens_saved"]
+            )
+        else:
+            for i, doc in enumerate(context_documents, 1):
+                context_text += ContextPacker.format_document(i, doc)
+
+        contexts = [doc.get('content', '') for doc in context_documents]
         for i, doc in enumerate(context_documents, 1):
-            context_text += f"[Documento {i}]\n"
-            context_text += f"Título: {doc.get('title', 'N/A')}\n"
-            context_text += f"Categoria: {doc.get('category', 'N/A')}\n"
-            context_text += f"Conteúdo: {doc.get('content', '')}\n\n"
-            
             sources.append({
                 "id": i,
                 "title": doc.get('title', 'N/A'),
@@ -88,23 +123,63 @@ class LLMService:
             SystemMessage(content=system_prompt.format(context=context_text)),
             HumanMessage(content=user_prompt)                                   
         ]
+        timer.record("prompt", time.perf_counter() - prompt_start)
         
         try:
-            response = await self.llm.ainvoke(messages)
-            answer = response.content
+            # Circuito aberto falha antes de ocupar lugar na fila
+            llm_caller.breaker.fail_fast()
+            queued_at = time.perf_counter()
+            async with llm_scheduler.slot("interactive"):
+                timer.record("llm_queue", time.perf_counter() - queued_at)
+                with timer.stage("llm"):
+                    answer, llm_metrics = await llm_caller.call(lambda: self._invoke(messages), llm_class="interactive")
             
             return {
                 "answer": answer,
                 "sources": sources,
                 "context_used": len(context_documents),
-                "question": question
+                "contexts": contexts,
+                "question": question,
+                "context_packing": packing_stats,
+                "llm_metrics": llm_metrics
             }
+
+        except (LLMOverloadedError, LLMUnavailableError):
+            # Fila cheia, timeout ou circuito aberto: não vira resposta de erro, a rota responde 429/503/504
+            raise
             
         except Exception as e:
             return {
                 "answer": f"Erro ao gerar resposta: {str(e)}",
                 "sources": sources,
                 "context_used": len(context_documents),
+                "contexts": contexts,
                 "question": question,
+                "context_packing": packing_stats,
                 "error": str(e)
             }
+
+    async def _invoke(self, messages: List[Any]) -> Tuple[str, Dict[str, Any]]:
+        """Uma chamada ao modelo; retorna (texto, métricas de tempo e tokens)"""
+        start = time.perf_counter()
+        first_token_at = None
+
+        if settings.llm_streaming:
+            response = None
+            async for chunk in self.llm.astream(messages):
+                if first_token_at is None and chunk.content:
+                    first_token_at = time.perf_counter()
+                response = chunk if response is None else response + chunk
+        else:
+            response = await self.llm.ainvoke(messages)
+
+        usage = getattr(response, "usage_metadata", None) or {}
+        return response.content if response is not None else "", {
+            "provider": settings.llm_provider,
+            "model": self.llm.model_name,
+            "streaming": settings.llm_streaming,
+            "ttft_ms": round((first_token_at - start) * 1000, 2) if first_token_at is not None else None,
+            "total_ms": round((time.perf_counter() - start) * 1000, 2),
+            "prompt_tokens": usage.get("input_tokens"),
+            "completion_tokens": usage.get("output_tokens")
+        }
@@ -0,0 +1,151 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Tuple
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from app.services.llm_scheduler import llm_scheduler
+from app.services.llm_resilience import llm_caller
+
+# Estágios do pipeline de /ask, na ordem em que acontecem
+STAGES = ("embedding", "search", "compression", "prompt", "llm_queue", "llm", "db_save")
+
+_LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+stage_duration = Histogram(
+    "rag_stage_duration_seconds",
+    "Duração de cada estágio do pipeline RAG",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS
+)
+request_duration = Histogram(
+    "rag_request_duration_seconds",
+    "Duração total das perguntas (/ask) por resultado",
+    ["outcome"],
+    buckets=_LATENCY_BUCKETS
+)
+requests_total = Counter("rag_requests_total", "Perguntas processadas por resultado", ["outcome"])
+errors_total = Counter("rag_errors_total", "Erros por estágio e tipo de exceção", ["stage", "error"])
+requests_in_progress = Gauge("rag_requests_in_progress", "Perguntas em processamento")
+context_tokens_total = Counter(
+    "rag_context_tokens_total",
+    "Tokens de contexto enviados ao LLM (used) e economizados pelo empacotador (saved)",
+    ["kind"]
+)
+
+# Filhos pré-criados: no caminho quente, só observe() (sem resolver labels a cada chamada)
+_stage_histograms = {stage: stage_duration.labels(stage=stage) for stage in STAGES}
+
+
+class StageTimer:
+    """
+    Mede os estágios de uma execução do pipeline
+
+    Cada estágio alimenta o histograma rag_stage_duration_seconds e fica em
+    `timings` (segundos) para a resposta e o registro da interação. Exceções
+    dentro de um estágio contam em rag_errors_total e são propagadas.
+    """
+
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+        histogram = _stage_histograms.get(stage)
+        if histogram is None:
+            histogram = _stage_histograms[stage] = stage_duration.labels(stage=stage)
+        histogram.observe(seconds)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            errors_total.labels(stage=name, error=type(e).__name__).inc()
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def timings_ms(self) -> Dict[str, float]:
+        return {stage: round(seconds * 1000, 2) for stage, seconds in self.timings.items()}
+
+
+class _RuntimeCollector:
+    """
+    Métricas lidas no momento da coleta (sem custo no caminho das requisições)
+
+    - Fila do LLM: profundidade, slots em uso, recusas e timeouts por classe
+    - Cliente do LLM: estado do disjuntor, timeouts, hedging
+    - Caches de embeddings e coalescência de perguntas dos serviços registrados
+    """
+
+    def __init__(self):
+        self._caches: List[Tuple[str, Any]] = []
+        self._rag_services: List[Any] = []
+
+    def register_cache(self, name: str, cache: Any) -> None:
+        self._caches.append((name, cache))
+
+    def register_rag_service(self, service: Any) -> None:
+        self._rag_services.append(service)
+
+    def collect(self):
+        scheduler = llm_scheduler.stats()
+        queue_depth = GaugeMetricFamily("rag_llm_queue_depth", "Pedidos esperando slot do LLM", labels=["llm_class"])
+        in_use = GaugeMetricFamily("rag_llm_slots_in_use", "Slots do LLM em uso", labels=["llm_class"])
+        rejected = CounterMetricFamily(
+            "rag_llm_queue_rejected", "Pedidos recusados pela fila do LLM", labels=["llm_class", "reason"]
+        )
+        for name, values in scheduler["classes"].items():
+            queue_depth.add_metric([name], values["queue_depth"])
+            in_use.add_metric([name], values["in_use"])
+            rejected.add_metric([name, "overloaded"], values["rejected"])
+            rejected.add_metric([name, "queue_timeout"], values["timed_out"])
+        yield queue_depth
+        yield in_use
+        yield rejected
+
+        client = llm_caller.stats()
+        breaker = client["circuit_breaker"]
+        state = GaugeMetricFamily("rag_llm_circuit_state", "Estado do disjuntor do LLM (1 = estado atual)", labels=["state"])
+        for name in ("closed", "open", "half_open"):
+            state.add_metric([name], 1.0 if breaker["state"] == name else 0.0)
+        yield state
+        calls = CounterMetricFamily("rag_llm_calls", "Chamadas ao LLM por resultado", labels=["result"])
+        for result in ("succeeded", "failed", "timeouts", "hedged", "hedge_wins"):
+            calls.add_metric([result], client[result])
+        calls.add_metric(["circuit_rejected"], breaker["rejected"])
+        yield calls
+
+        hits = CounterMetricFamily("rag_cache_hits", "Acertos dos caches de embeddings", labels=["cache"])
+        misses = CounterMetricFamily("rag_cache_misses", "Faltas dos caches de embeddings", labels=["cache"])
+        entries = GaugeMetricFamily("rag_cache_entries", "Vetores nos caches de embeddings", labels=["cache"])
+        totals: Dict[str, List[int]] = {}
+        for name, cache in self._caches:
+            total = totals.setdefault(name, [0, 0, 0])
+            total[0] += cache.hits
+            total[1] += cache.misses
+            total[2] += len(cache)
+        for name, (cache_hits, cache_misses, cache_entries) in totals.items():
+            hits.add_metric([name], cache_hits)
+            misses.add_metric([name], cache_misses)
+            entries.add_metric([name], cache_entries)
+        yield hits
+        yield misses
+        yield entries
+
+        if self._rag_services:
+            coalescing = CounterMetricFamily(
+                "rag_pipeline_runs", "Execuções do pipeline e perguntas atendidas por coalescência", labels=["kind"]
+            )
+            coalescing.add_metric(["executed"], sum(s.coalescing_stats["executions"] for s in self._rag_services))
+            coalescing.add_metric(["coalesced"], sum(s.coalescing_stats["coalesced"] for s in self._rag_services))
+            yield coalescing
+            yield GaugeMetricFamily(
+                "rag_pipelines_in_flight", "Execuções do pipeline em andamento",
+                value=sum(len(s._in_flight) for s in self._rag_services)
+            )
+
+
+runtime_collector = _RuntimeCollector()
+REGISTRY.register(runtime_collector)
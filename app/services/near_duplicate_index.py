@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+from typing import List, Dict, Any, Optional, Set, Tuple
+import numpy as np
+from app.services.lexical_index import tokenize
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# np.trapz foi removido no NumPy 2 (substituído por np.trapezoid, que não existe no 1.x)
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz
+
+
+def lsh_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Escolhe (bandas, linhas por banda) que minimizam falsos positivos + falsos negativos
+
+    Um par com similaridade de Jaccard s vira candidato com probabilidade
+    1 - (1 - s^r)^b; a curva em "S" deve subir perto do limiar.
+    """
+    similarities = np.linspace(0, 1, 201)
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        candidate = 1 - (1 - similarities ** rows) ** bands
+        below = similarities < threshold
+        error = _trapezoid(candidate[below], similarities[below]) + _trapezoid(1 - candidate[~below], similarities[~below])
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """
+    Detecção de chunks quase duplicados com MinHash + LSH
+
+    ASSINATURA (MinHash):
+    - Texto normalizado como no BM25 (minúsculas, sem acentos) e dividido em
+      shingles de `shingle_size` palavras
+    - `num_perm` funções de hash (a*x + b mod primo); para cada uma guarda o
+      menor valor entre os shingles. A fração de posições iguais entre duas
+      assinaturas estima a similaridade de Jaccard dos conjuntos de shingles
+
+    LSH:
+    - A assinatura é dividida em bandas; chunks com alguma banda idêntica caem
+      no mesmo balde e viram candidatos, sem comparar com o índice inteiro
+    - Candidatos são confirmados pela similaridade estimada >= `threshold`
+
+    Persistido em `signatures.npy` + `meta.json`. Mudar os parâmetros invalida
+    o índice, que é reconstruído a partir dos chunks existentes.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        threshold: float = 0.85,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        seed: int = 1
+    ):
+        self.directory = directory
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        self.bands, self.rows = lsh_bands(threshold, num_perm)
+        self.signatures_path = os.path.join(directory, "signatures.npy")
+        self.meta_path = os.path.join(directory, "meta.json")
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _params(self) -> Dict[str, Any]:
+        return {"threshold": self.threshold, "num_perm": self.num_perm, "shingle_size": self.shingle_size, "seed": self.seed}
+
+    def reload(self) -> None:
+        """Relê as assinaturas do disco (inclusive as gravadas por outro processo)"""
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(self.bands)]
+        if not os.path.exists(self.meta_path) or not os.path.exists(self.signatures_path):
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("params") != self._params():
+            print("Índice de duplicatas criado com outros parâmetros: será reconstruído")
+            return
+        signatures = np.load(self.signatures_path)
+        for doc_id, signature in zip(meta["ids"], signatures):
+            self._insert(doc_id, signature)
+
+    def save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        ids = list(self._signatures)
+        signatures = (
+            np.stack([self._signatures[doc_id] for doc_id in ids]) if ids
+            else np.empty((0, self.num_perm), dtype=np.uint32)
+        )
+        with open(f"{self.signatures_path}.tmp", "wb") as f:
+            np.save(f, signatures)
+        os.replace(f"{self.signatures_path}.tmp", self.signatures_path)
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"params": self._params(), "ids": ids}, f)
+        os.replace(tmp_path, self.meta_path)
+
+    def signature(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        size = self.shingle_size
+        shingles = {" ".join(tokens[i:i + size]) for i in range(max(len(tokens) - size + 1, 1))}
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little") for s in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+        # Multiplicação em uint64 com overflow proposital (mesma família de hash do datasketch)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def _insert(self, doc_id: str, signature: np.ndarray) -> None:
+        self._signatures[doc_id] = signature
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(doc_id)
+
+    def add(self, doc_id: str, text: str) -> None:
+        if doc_id in self._signatures:
+            self.remove([doc_id])
+        self._insert(doc_id, self.signature(text))
+
+    def remove(self, ids: List[str]) -> int:
+        removed = 0
+        for doc_id in ids:
+            signature = self._signatures.pop(doc_id, None)
+            if signature is None:
+                continue
+            for band, key in enumerate(self._band_keys(signature)):
+                bucket = self._buckets[band].get(key)
+                if bucket is not None:
+                    bucket.discard(doc_id)
+                    if not bucket:
+                        del self._buckets[band][key]
+            removed += 1
+        return removed
+
+    def find(self, text: str, exclude_id: Optional[str] = None) -> Optional[Tuple[str, float]]:
+        """Chunk indexado mais parecido com o texto, se a similaridade estimada passar do limiar"""
+        signature = self.signature(text)
+        candidates: Set[str] = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+        candidates.discard(exclude_id)
+
+        best = None
+        for doc_id in candidates:
+            similarity = float(np.mean(self._signatures[doc_id] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (doc_id, similarity)
+        return best
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunks": len(self),
+            "threshold": self.threshold,
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "rows_per_band": self.rows,
+            "buckets": sum(len(buckets) for buckets in self._buckets)
+        }
@@ -0,0 +1,270 @@
+import os
+from typing import List, Optional, Tuple, Dict, Any
+import numpy as np
+
+# Número de bits 1 para cada valor de byte (popcount usado na distância de Hamming)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class QuantizedIndex:
+    """
+    Índice vetorial com busca em duas etapas sobre embeddings quantizados
+
+    ARMAZENAMENTO:
+    - Em memória: apenas os códigos quantizados
+        * int8: 1 byte por dimensão (4x menor que float32)
+        * binary: 1 bit por dimensão (32x menor que float32)
+    - Em disco: vetores float32 completos (vectors.f32), lidos via memory-map
+
+    BUSCA:
+    1. Varre os códigos quantizados e seleciona os `candidates` melhores
+    2. Re-pontua apenas esses candidatos com os vetores float32 do disco
+    3. Retorna o top-k pela similaridade de cosseno exata
+
+    Os embeddings devem estar normalizados (componentes em [-1, 1]), o que
+    permite quantização int8 simétrica com escala fixa, sem calibração.
+
+    Cada id ocupa uma única linha: adicionar um id existente sobrescreve o
+    vetor no lugar. `reload()` relê os arquivos gravados por outra instância.
+    As categorias também ficam como códigos inteiros por linha, então o
+    filtro de categoria é uma comparação vetorizada, sem loop em Python.
+    """
+
+    MODES = ("int8", "binary")
+    BLOCK_SIZE = 65536
+
+    def __init__(self, directory: str, dim: int, mode: str = "int8"):
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de quantização inválido: {mode} (use {self.MODES})")
+
+        self.directory = directory
+        self.dim = dim
+        self.mode = mode
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.ids_path = os.path.join(directory, "ids.tsv")
+
+        os.makedirs(directory, exist_ok=True)
+        self.reload()
+
+    def _code_width(self) -> int:
+        return self.dim if self.mode == "int8" else (self.dim + 7) // 8
+
+    def _code_dtype(self):
+        return np.int8 if self.mode == "int8" else np.uint8
+
+    def _quantize(self, vectors: np.ndarray) -> np.ndarray:
+        if self.mode == "int8":
+            return np.clip(np.rint(vectors * 127), -127, 127).astype(np.int8)
+        return np.packbits(vectors > 0, axis=1)
+
+    def reload(self) -> None:
+        """Recarrega ids e reconstrói os códigos a partir dos vetores em disco"""
+        rows = []
+        if os.path.exists(self.ids_path) and os.path.exists(self.vectors_path):
+            with open(self.ids_path, "r", encoding="utf-8") as f:
+                rows = [line.rstrip("\n").split("\t", 1) for line in f if line.strip()]
+            # Escrita parcial (ex.: processo interrompido) é descartada
+            rows = rows[:os.path.getsize(self.vectors_path) // (self.dim * 4)]
+
+        ids = [row[0] for row in rows]
+        codes = np.empty((len(ids), self._code_width()), dtype=self._code_dtype())
+        if ids:
+            vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(ids), self.dim))
+            for start in range(0, len(ids), self.BLOCK_SIZE):
+                end = start + self.BLOCK_SIZE
+                codes[start:end] = self._quantize(np.asarray(vectors[start:end]))
+
+        categories = [row[1] if len(row) > 1 else "" for row in rows]
+        code_of: Dict[str, int] = {}
+        category_codes = np.fromiter(
+            (code_of.setdefault(category, len(code_of)) for category in categories),
+            dtype=np.int32, count=len(categories)
+        )
+
+        self._vectors = None
+        self.ids = ids
+        self.categories = categories
+        self._rows = {doc_id: row for row, doc_id in enumerate(ids)}
+        self._codes = codes
+        self._code_of = code_of
+        self._category_codes = category_codes
+        self._size = len(ids)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _full_vectors(self, size: int) -> np.memmap:
+        if self._vectors is None or self._vectors.shape[0] != size:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(size, self.dim))
+        return self._vectors
+
+    def _ensure_capacity(self, extra: int) -> None:
+        needed = self._size + extra
+        if needed <= len(self._codes):
+            return
+        capacity = max(needed, 2 * len(self._codes), 1024)
+        grown = np.empty((capacity, self._code_width()), dtype=self._code_dtype())
+        grown[:self._size] = self._codes[:self._size]
+        self._codes = grown
+        grown_categories = np.empty(capacity, dtype=np.int32)
+        grown_categories[:self._size] = self._category_codes[:self._size]
+        self._category_codes = grown_categories
+
+    def _category_code(self, category: str) -> int:
+        return self._code_of.setdefault(category, len(self._code_of))
+
+    def add(self, ids: List[str], embeddings: List[List[float]], categories: List[str]) -> None:
+        """Acrescenta vetores; ids já indexados têm o vetor sobrescrito (re-upsert não duplica linhas)"""
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dim)
+
+        # Último vetor de cada id do lote: existentes são sobrescritos, novos vão para o fim
+        latest = {doc_id: i for i, doc_id in enumerate(ids)}
+        existing = [(self._rows[doc_id], i) for doc_id, i in latest.items() if doc_id in self._rows]
+        new = [i for doc_id, i in latest.items() if doc_id not in self._rows]
+
+        if existing:
+            rewrite_ids = False
+            with open(self.vectors_path, "r+b") as f:
+                for row, i in existing:
+                    f.seek(row * self.dim * 4)
+                    f.write(vectors[i].tobytes())
+                    self._codes[row] = self._quantize(vectors[i:i + 1])[0]
+                    if self.categories[row] != categories[i]:
+                        self.categories[row] = categories[i]
+                        self._category_codes[row] = self._category_code(categories[i])
+                        rewrite_ids = True
+            if rewrite_ids:
+                self._write_ids()
+
+        if new:
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors[new].tobytes())
+            with open(self.ids_path, "a", encoding="utf-8") as f:
+                for i in new:
+                    f.write(f"{ids[i]}\t{categories[i]}\n")
+
+            self._ensure_capacity(len(new))
+            self._codes[self._size:self._size + len(new)] = self._quantize(vectors[new])
+            for i in new:
+                self._rows[ids[i]] = self._size
+                self._category_codes[self._size] = self._category_code(categories[i])
+                self._size += 1
+                self.ids.append(ids[i])
+                self.categories.append(categories[i])
+
+    def _write_ids(self) -> None:
+        tmp_ids = f"{self.ids_path}.tmp"
+        with open(tmp_ids, "w", encoding="utf-8") as f:
+            for doc_id, category in zip(self.ids, self.categories):
+                f.write(f"{doc_id}\t{category}\n")
+        os.replace(tmp_ids, self.ids_path)
+
+    def remove(self, ids: List[str]) -> int:
+        """Remove vetores do índice, compactando os arquivos em disco; retorna quantos foram removidos"""
+        to_remove = {doc_id for doc_id in ids if doc_id in self._rows}
+        if not to_remove:
+            return 0
+        keep = np.ones(self._size, dtype=bool)
+        keep[[self._rows[doc_id] for doc_id in to_remove]] = False
+        removed = len(to_remove)
+
+        kept_rows = np.flatnonzero(keep)
+        vectors = self._full_vectors(self._size)
+        tmp_vectors, tmp_ids = f"{self.vectors_path}.tmp", f"{self.ids_path}.tmp"
+        with open(tmp_vectors, "wb") as f:
+            for start in range(0, len(kept_rows), self.BLOCK_SIZE):
+                f.write(np.asarray(vectors[kept_rows[start:start + self.BLOCK_SIZE]]).tobytes())
+        with open(tmp_ids, "w", encoding="utf-8") as f:
+            for row in kept_rows:
+                f.write(f"{self.ids[row]}\t{self.categories[row]}\n")
+
+        self._vectors = None
+        os.replace(tmp_vectors, self.vectors_path)
+        os.replace(tmp_ids, self.ids_path)
+
+        self._codes = self._codes[kept_rows]
+        self._category_codes = self._category_codes[kept_rows]
+        self.ids = [self.ids[row] for row in kept_rows]
+        self.categories = [self.categories[row] for row in kept_rows]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self.ids)}
+        self._size = len(self.ids)
+        return removed
+
+    def search(
+        self,
+        query_embedding: List[float],
+        limit: int = 5,
+        candidates: int = 100,
+        category_filter: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """Retorna [(id, similaridade)] ordenado, re-pontuado com precisão total"""
+        if self._size == 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        candidates = max(candidates, limit)
+
+        mask = None
+        if category_filter:
+            code = self._code_of.get(category_filter)
+            if code is None:
+                return []
+            mask = self._category_codes[:self._size] == code
+            if not mask.any():
+                return []
+
+        candidate_rows = self._candidate_search(query, candidates, mask)
+
+        # Re-ranking com os vetores float32 (leitura ordenada favorece o page cache)
+        candidate_rows.sort()
+        full = np.asarray(self._full_vectors(self._size)[candidate_rows])
+        scores = full @ query
+        order = np.argsort(-scores)[:limit]
+
+        return [(self.ids[candidate_rows[i]], float(scores[i])) for i in order]
+
+    def _candidate_search(self, query: np.ndarray, candidates: int, mask: Optional[np.ndarray]) -> np.ndarray:
+        """Varre os códigos em blocos mantendo apenas os melhores candidatos"""
+        if self.mode == "int8":
+            query_code = query * 127
+        else:
+            query_code = self._quantize(query[None, :])[0]
+
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+
+        for start in range(0, self._size, self.BLOCK_SIZE):
+            end = min(start + self.BLOCK_SIZE, self._size)
+            block = self._codes[start:end]
+
+            if self.mode == "int8":
+                scores = block.astype(np.float32) @ query_code
+            else:
+                # Menor distância de Hamming = maior similaridade
+                scores = -_POPCOUNT[np.bitwise_xor(block, query_code)].sum(axis=1, dtype=np.int32).astype(np.float32)
+
+            rows = np.arange(start, end)
+            if mask is not None:
+                block_mask = mask[start:end]
+                rows, scores = rows[block_mask], scores[block_mask]
+
+            best_rows = np.concatenate([best_rows, rows])
+            best_scores = np.concatenate([best_scores, scores])
+            if len(best_rows) > candidates:
+                keep = np.argpartition(-best_scores, candidates - 1)[:candidates]
+                best_rows, best_scores = best_rows[keep], best_scores[keep]
+
+        return best_rows
+
+    def memory_report(self) -> Dict[str, Any]:
+        full_bytes = self._size * self.dim * 4
+        quantized_bytes = self._size * self._code_width()
+        return {
+            "mode": self.mode,
+            "vectors": self._size,
+            "dimensions": self.dim,
+            "full_precision_bytes": full_bytes,
+            "quantized_bytes": quantized_bytes,
+            "memory_saved_bytes": full_bytes - quantized_bytes,
+            "compression_ratio": round(full_bytes / quantized_bytes, 2) if quantized_bytes else None
+        }
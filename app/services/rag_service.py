@@ -1,12 +1,18 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import copy
 import time
 import uuid
-from app.services.vector_service import VectorService
+from app.core.config import settings
+from app.services.vector_service import get_vector_service
 from app.services.llm_service import LLMService
 from app.models.document import DocumentResponse
 from app.models.rag_interaction import RAGInteractionDB, RAGInteractionCreate
 from app.services.database_service import AsyncSessionLocal
 from app.services.phoenix_service import phoenix_service
+from app.services.metrics import (
+    StageTimer, errors_total, request_duration, requests_in_progress, requests_total, runtime_collector
+)
 import logging
 
 class RAGService:
@@ -20,16 +26,29 @@ class RAGService:
 
     1. VectorService: Busca documentos similares
 
-    2. LLMService: Gera resposta baseada nos documentos
+    2. ContextCompressor (opcional): mantém só as sentenças próximas da pergunta
 
-    3. DatabaseService: Salva interação completa
+    3. LLMService: Gera resposta baseada nos documentos
 
-    4. PhoenixService: Monitora para observabilidade
+    4. DatabaseService: Salva interação completa
 
-    5. RAGAS: Pode avaliar qualidade depois
+    5. PhoenixService: Monitora para observabilidade
+
+    6. RAGAS: Pode avaliar qualidade depois
 
     Resposta + Fontes para o Usuário
     
+    COALESCÊNCIA (single-flight):
+    Perguntas idênticas em andamento ao mesmo tempo (mesma pergunta normalizada,
+    max_documents, category_filter e search_mode) compartilham uma única execução
+    do pipeline: a primeira busca e chama o LLM, as demais aguardam o mesmo
+    resultado. Cada requisição ainda salva a sua própria interação.
+    
+    MÉTRICAS:
+    Cada estágio (embedding, search, compression, prompt, llm_queue, llm,
+    db_save) é medido por um StageTimer e exposto em /metrics (Prometheus);
+    a resposta traz as durações em stage_timings (ms).
+    
     INTEGRAÇÕES:
     - LangChain: Via LLMService para geração de resposta
     - Phoenix: Monitoramento automático de todo o pipeline
@@ -37,24 +56,127 @@ class RAGService:
     """
     
     def __init__(self):
-        self.vector_service = VectorService() 
+        self.vector_service = get_vector_service() 
         self.llm_service = LLMService()
+        self._in_flight: Dict[Tuple, asyncio.Task] = {}
+        self.coalescing_stats = {"executions": 0, "coalesced": 0}
+        runtime_collector.register_rag_service(self)
+    
+    @staticmethod
+    def _coalescing_key(
+        question: str,
+        max_documents: int,
+        category_filter: Optional[str],
+        search_mode: Optional[str]
+    ) -> Tuple:
+        return (" ".join(question.lower().split()), max_documents, category_filter, search_mode)
     
     async def ask_question(
         self, 
         question: str, 
         max_documents: int = 5,
         category_filter: Optional[str] = None,
+        search_mode: Optional[str] = None,
         save_interaction: bool = True
     ) -> Dict[str, Any]:
         start_time = time.time()
+        requests_in_progress.inc()
+        outcome = "cancelled"
+        try:
+            response = await self._answer(question, max_documents, category_filter, search_mode, save_interaction, start_time)
+            if response.get("error"):
+                outcome = "llm_error"
+            elif response.get("has_context"):
+                outcome = "answered"
+            else:
+                outcome = "no_context"
+            return response
+        except Exception as e:
+            outcome = "error"
+            errors_total.labels(stage="request", error=getattr(e, "error_code", type(e).__name__)).inc()
+            raise
+        finally:
+            requests_in_progress.dec()
+            elapsed = time.time() - start_time
+            requests_total.labels(outcome=outcome).inc()
+            request_duration.labels(outcome=outcome).observe(elapsed)
+
+    async def _answer(
+        self,
+        question: str,
+        max_documents: int,
+        category_filter: Optional[str],
+        search_mode: Optional[str],
+        save_interaction: bool,
+        start_time: float
+    ) -> Dict[str, Any]:
+        if settings.request_coalescing_enabled:
+            key = self._coalescing_key(question, max_documents, category_filter, search_mode)
+            task = self._in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(
+                    self._run_pipeline(question, max_documents, category_filter, search_mode)
+                )
+                self._in_flight[key] = task
+                task.add_done_callback(lambda done, key=key: self._finish_flight(key, done))
+                self.coalescing_stats["executions"] += 1
+            else:
+                self.coalescing_stats["coalesced"] += 1
+            # shield: se quem iniciou desconectar, a execução continua para os demais
+            shared_response, contexts_for_db = await asyncio.shield(task)
+            response = copy.deepcopy(shared_response)
+            response["question"] = question
+        else:
+            self.coalescing_stats["executions"] += 1
+            response, contexts_for_db = await self._run_pipeline(
+                question, max_documents, category_filter, search_mode
+            )
+
+        response_time = time.time() - start_time
+
+        if save_interaction:
+            timer = StageTimer()
+            with timer.stage("db_save"):
+                interaction_id = await self._save_interaction(
+                    question=question,
+                    answer=response["answer"],
+                    contexts=contexts_for_db,
+                    sources=response.get("sources", []),
+                    response_time=response_time,
+                    performance=self._performance_record(response, category_filter)
+                )
+            response["stage_timings"] = {**(response.get("stage_timings") or {}), **timer.timings_ms()}
+            if response.get("has_context"):
+                response["interaction_id"] = interaction_id
         
-        print(f"convertendo pergunta em embedding e buscando documentos similares")
-        relevant_docs = await self.vector_service.search_documents(
-            query=question,
-            limit=max_documents,
-            category_filter=category_filter
-        )
+        return response
+
+    def _finish_flight(self, key: Tuple, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Marca a exceção como lida mesmo se todos os chamadores já desistiram
+            task.exception()
+
+    async def _run_pipeline(
+        self,
+        question: str,
+        max_documents: int,
+        category_filter: Optional[str],
+        search_mode: Optional[str]
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """Busca + geração; retorna (resposta, contextos para o banco)"""
+        timer = StageTimer()
+        with timer.stage("embedding"):
+            query_embedding = self.vector_service.encode_query(question)
+        with timer.stage("search"):
+            relevant_docs = await self.vector_service.search_documents(
+                query=question,
+                limit=max_documents,
+                category_filter=category_filter,
+                search_mode=search_mode,
+                query_embedding=query_embedding
+            )
         
         if not relevant_docs:
             response = {
@@ -62,24 +184,23 @@ class RAGService:
                 "sources": [],
                 "context_used": 0,
                 "question": question,
-                "has_context": False
+                "has_context": False,
+                "stage_timings": timer.timings_ms()
             }
             
-            if save_interaction:
-                await self._save_interaction(
-                    question=question,
-                    answer=response["answer"],
-                    contexts=[],             
-                    sources=[],              
-                    response_time=time.time() - start_time
+            return response, []
+
+        compression_stats = None
+        prompt_docs = relevant_docs
+        if self.vector_service.context_compressor is not None:
+            with timer.stage("compression"):
+                prompt_docs, compression_stats = self.vector_service.context_compressor.compress(
+                    query_embedding, relevant_docs
                 )
-            
-            return response
 
         context_documents = []
-        contexts_for_db = []    #banco de dados
         
-        for doc in relevant_docs:
+        for doc in prompt_docs:
             context_documents.append({
                 "title": doc.title,
                 "category": doc.category,
@@ -88,13 +209,14 @@ class RAGService:
                 "metadata": doc.metadata
             })
 
-            contexts_for_db.append(doc.content)
-
-
         llm_response = await self.llm_service.generate_answer(
             question=question,
-            context_documents=context_documents
+            context_documents=context_documents,
+            timer=timer
         )
+        # Banco de dados: exatamente os contextos do prompt (após compressão e empacotamento),
+        # que são os que o RAGAS deve avaliar
+        contexts_for_db = llm_response.pop("contexts")
 
         search_results = [
             {
@@ -109,34 +231,52 @@ class RAGService:
         response = {
             **llm_response,
             "has_context": True,
-            "search_results": search_results
+            "search_results": search_results,
+            "context_compression": compression_stats,
+            "stage_timings": timer.timings_ms()
         }
         
-        response_time = time.time() - start_time
-
-        
-        if save_interaction:
-            interaction_id = await self._save_interaction(
-                question=question,
-                answer=response["answer"],
-                contexts=contexts_for_db,
-                sources=response.get("sources", []),
-                response_time=response_time
-            )
-            response["interaction_id"] = interaction_id
-            
-            if phoenix_service.is_enabled:
-                print(f"Phoenix ativo ")
-        
-        return response
+        return response, contexts_for_db
     
+    @staticmethod
+    def _performance_record(response: Dict[str, Any], category_filter: Optional[str]) -> Dict[str, Any]:
+        """Colunas de desempenho da interação: estágios (ms), tokens, TTFT, empacotamento do contexto e modelos usados"""
+        timings = response.get("stage_timings") or {}
+        llm_metrics = response.get("llm_metrics") or {}
+        packing = response.get("context_packing") or {}
+        search_results = response.get("search_results") or []
+        return {
+            "category": category_filter or (search_results[0]["category"] if search_results else None),
+            "stage_timings": timings,
+            "embedding_ms": timings.get("embedding"),
+            "search_ms": timings.get("search"),
+            "compression_ms": timings.get("compression"),
+            "prompt_ms": timings.get("prompt"),
+            "llm_queue_ms": timings.get("llm_queue"),
+            "llm_ms": timings.get("llm"),
+            "ttft_ms": llm_metrics.get("ttft_ms"),
+            "prompt_tokens": llm_metrics.get("prompt_tokens"),
+            "completion_tokens": llm_metrics.get("completion_tokens"),
+            "context_packing": response.get("context_packing"),
+            "context_tokens": packing.get("context_tokens"),
+            "context_tokens_saved": packing.get("tokens_saved"),
+            "context_documents_dropped": (
+                packing["dropped_by_score"] + packing["dropped_by_budget"] if packing else None
+            ),
+            # Sem llm_metrics quando a chamada falhou; sem contexto o LLM nem é chamado
+            "model_version": llm_metrics.get("model") or (settings.llm_model if response.get("has_context") else None),
+            "llm_provider": llm_metrics.get("provider") or (settings.llm_provider if response.get("has_context") else None),
+            "embedding_model": settings.embedding_model
+        }
+
     async def _save_interaction(
         self,
         question: str,
         answer: str,
         contexts: List[str],
         sources: List[Dict],
-        response_time: float
+        response_time: float,
+        performance: Optional[Dict[str, Any]] = None
     ) -> str:
         interaction_id = str(uuid.uuid4())
         
@@ -147,7 +287,8 @@ class RAGService:
                 answer=answer,
                 contexts=contexts,
                 sources=sources,
-                response_time=response_time
+                response_time=response_time,
+                **(performance or {})
             )
             
             session.add(interaction)
@@ -13,12 +13,15 @@ from typing import List, Dict, Any
 import pandas as pd
 from datasets import Dataset
 from ragas import evaluate
+from ragas.run_config import RunConfig
 from ragas.metrics import faithfulness, answer_relevancy, context_precision, context_recall
 from sqlalchemy import select
 from app.models.rag_interaction import RAGInteractionDB
 from app.services.database_service import AsyncSessionLocal
 from app.services.phoenix_service import phoenix_service
 from app.core.config import settings
+from app.services.llm_scheduler import llm_scheduler, LLMOverloadedError
+from app.services.llm_provider import create_chat_model, create_embeddings
 import openai
 from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
@@ -100,7 +103,7 @@ class RAGASService:
 
         try:
             print("RAGAS:LENDO E AVALIANDO INTERAÇÕES COM IA...")
-            result = evaluate(dataset, metrics=self.metrics)
+            result = await self._run_evaluate(dataset)
             
             if not result:
                 raise ValueError("RAGAS retornou resultado vazio")
@@ -202,6 +205,9 @@ class RAGASService:
             
             return evaluation_results
 
+        except LLMOverloadedError:
+            raise
+
         except Exception as e:
             print(f"RAGAS: Erro durante avaliação: {str(e)}")
             print(f"RAGAS: Tipo do erro: {type(e).__name__}")
@@ -218,6 +224,33 @@ class RAGASService:
                 }
             }
 
+    async def _run_evaluate(self, dataset: Dataset):
+        """
+        Executa o RAGAS ocupando os slots da classe "evaluation" do LLMScheduler
+
+        O RAGAS dispara até LLM_EVALUATION_CONCURRENCY chamadas em paralelo e
+        roda em uma thread com loop de eventos próprio, então as perguntas
+        interativas continuam sendo atendidas (com prioridade) durante a avaliação.
+        """
+        workers = settings.llm_evaluation_concurrency
+        async with llm_scheduler.slot("evaluation", weight=workers):
+            return await asyncio.to_thread(self._evaluate_blocking, dataset, workers)
+
+    def _evaluate_blocking(self, dataset: Dataset, workers: int):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        # Com outro provedor (ex.: servidor falso), o RAGAS usa o mesmo endpoint em vez da OpenAI
+        provider_models = {}
+        if settings.llm_provider != "openai":
+            provider_models = {"llm": create_chat_model(temperature=0), "embeddings": create_embeddings()}
+        try:
+            return evaluate(
+                dataset, metrics=self.metrics, run_config=RunConfig(max_workers=workers), **provider_models
+            )
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
     async def _save_ragas_scores(
         self, 
         interactions: List[RAGInteractionDB], 
@@ -0,0 +1,24 @@
+from typing import List, Dict, Optional, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None
+) -> List[Tuple[str, float]]:
+    """Combina várias listas ranqueadas com Reciprocal Rank Fusion (RRF)
+
+    score(d) = soma_i  peso_i / (k + posição_i(d))
+
+    Usa apenas as posições, então funciona com scores de escalas diferentes
+    (similaridade de cosseno, BM25, fontes distintas).
+
+    Returns:
+        Lista [(id, score)] ordenada do mais relevante para o menos relevante
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for position, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + position)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,284 @@
+import atexit
+import hashlib
+import json
+import os
+import queue
+import secrets
+import subprocess
+import sys
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from typing import List, Dict, Any, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _discard(conn) -> None:
+    if conn is None:
+        return
+    try:
+        conn.close()
+    except OSError:
+        pass
+
+
+def _shared_authkey(directory: str) -> str:
+    """
+    Chave secreta compartilhada pelos processos que usam o mesmo diretório
+
+    Gerada uma única vez em `directory/authkey` (permissão 0600); o arquivo é
+    criado com o conteúdo completo via link atômico, então workers iniciando
+    ao mesmo tempo leem sempre a mesma chave.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "authkey")
+    if not os.path.exists(path):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            pass  # Outro processo criou primeiro: vale a chave dele
+        finally:
+            os.remove(tmp)
+    with open(path, "r") as f:
+        return f.read().strip()
+
+
+class ShardCollection:
+    """
+    Proxy de uma coleção Chroma servida por um processo de shard
+
+    Expõe a mesma interface usada pelo VectorService (add, query, get,
+    delete, count, name, metadata), então o restante do código trata shards
+    como coleções comuns. Mantém um pequeno pool de conexões para permitir
+    chamadas concorrentes ao mesmo shard.
+
+    Na conexão, o shard informa o próprio id e a coleção que serve; um
+    processo diferente na mesma porta (outra coleção ou outro shard) é recusado.
+    """
+
+    def __init__(self, shard_id: int, address: tuple, authkey: bytes, collection_name: str, connections: int = 4):
+        self.shard_id = shard_id
+        self.name = f"shard_{shard_id}"
+        self._address = address
+        self._authkey = authkey
+        self._connections: "queue.Queue" = queue.Queue()
+        for _ in range(connections):
+            self._connections.put(Client(address, authkey=authkey))
+
+        served = self._call("handshake")
+        if (served["shard_id"], served["collection"]) != (shard_id, collection_name):
+            self.close()
+            raise RuntimeError(
+                f"127.0.0.1:{address[1]} serve o shard {served['shard_id']} da coleção '{served['collection']}', "
+                f"esperado shard {shard_id} de '{collection_name}' (ajuste VECTOR_SHARD_BASE_PORT)"
+            )
+        self.metadata = served["metadata"]
+
+    def close(self) -> None:
+        while not self._connections.empty():
+            _discard(self._connections.get_nowait())
+
+    def _call(self, op: str, **kwargs) -> Any:
+        # None no pool = vaga cuja conexão foi descartada; é refeita no próximo uso
+        conn = self._connections.get()
+        try:
+            if conn is None:
+                conn = Client(self._address, authkey=self._authkey)
+            try:
+                conn.send((op, kwargs))
+                status, result = conn.recv()
+            except (EOFError, OSError):
+                # Conexão perdida (ex.: shard reiniciado): reconecta e tenta uma vez
+                _discard(conn)
+                conn = None
+                conn = Client(self._address, authkey=self._authkey)
+                conn.send((op, kwargs))
+                status, result = conn.recv()
+        except (EOFError, OSError, AuthenticationError):
+            # Conexão em estado desconhecido (ou reconexão que falhou) não volta ao pool
+            _discard(conn)
+            conn = None
+            raise
+        finally:
+            self._connections.put(conn)
+
+        if status == "error":
+            raise RuntimeError(f"Shard {self.shard_id}: {result}")
+        return result
+
+    def add(self, **kwargs):
+        return self._call("add", **kwargs)
+
+    def upsert(self, **kwargs):
+        return self._call("upsert", **kwargs)
+
+    def query(self, **kwargs):
+        return self._call("query", **kwargs)
+
+    def get(self, **kwargs):
+        return self._call("get", **kwargs)
+
+    def delete(self, **kwargs):
+        return self._call("delete", **kwargs)
+
+    def count(self) -> int:
+        return self._call("count")
+
+
+class ShardPool:
+    """
+    Conjunto de N shards do índice vetorial, cada um em seu próprio processo
+
+    - Ingestão: cada chunk vai para o shard hash(id) % N (hash estável)
+    - Consulta: o VectorService envia a consulta a todos os shards em paralelo
+      e mescla os top-k de cada um
+
+    Os shards escutam em 127.0.0.1:(base_port + i). Se um shard já estiver
+    rodando (ex.: outra réplica da API na mesma máquina), o pool apenas se
+    conecta a ele; processos iniciados pelo pool são encerrados na saída.
+
+    AUTENTICAÇÃO:
+    As mensagens são serializadas com pickle, então só quem conhece a chave
+    pode se conectar. Sem `authkey` a chave é lida de `directory/authkey`
+    (gerada aleatoriamente na primeira vez), então workers do uvicorn na mesma
+    máquina compartilham os shards sem configuração; réplicas com diretórios
+    diferentes precisam da mesma chave explícita (VECTOR_SHARD_AUTHKEY).
+    A chave é repassada aos shards iniciados pelo ambiente (SHARD_AUTHKEY).
+
+    Dois processos iniciando juntos podem disputar a porta de um shard: quem
+    perde usa o shard do outro em vez de falhar.
+    """
+
+    def __init__(
+        self,
+        n_shards: int,
+        directory: str,
+        collection_name: str,
+        collection_metadata: Dict[str, Any],
+        base_port: int = 8100,
+        connections: int = 4,
+        authkey: str = "",
+        startup_timeout: float = 120.0
+    ):
+        self.n_shards = n_shards
+        self.directory = os.path.abspath(directory)
+        self._authkey = (authkey or _shared_authkey(self.directory)).encode()
+        self._processes: List[subprocess.Popen] = []
+        self.shards: List[ShardCollection] = []
+
+        try:
+            pending = []
+            for shard_id in range(n_shards):
+                address = ("127.0.0.1", base_port + shard_id)
+                process = None
+                if not self._is_running(address):
+                    process = self._start_shard(shard_id, address, collection_name, collection_metadata)
+                    self._processes.append(process)
+                pending.append((shard_id, address, process))
+
+            for shard_id, address, process in pending:
+                self._wait_until_ready(shard_id, address, process, startup_timeout)
+                self.shards.append(ShardCollection(shard_id, address, self._authkey, collection_name, connections))
+        except Exception:
+            self.close()
+            raise
+
+        atexit.register(self.close)
+
+    def _is_running(self, address: tuple) -> bool:
+        try:
+            Client(address, authkey=self._authkey).close()
+            return True
+        except AuthenticationError:
+            raise RuntimeError(
+                f"127.0.0.1:{address[1]} está em uso por um shard com outra chave; para compartilhar shards "
+                f"entre réplicas, configure o mesmo VECTOR_SHARD_AUTHKEY em todas"
+            )
+        except (ConnectionRefusedError, OSError):
+            return False
+
+    def _start_shard(
+        self,
+        shard_id: int,
+        address: tuple,
+        collection_name: str,
+        collection_metadata: Dict[str, Any]
+    ) -> subprocess.Popen:
+        path = os.path.join(self.directory, f"shard_{shard_id}")
+        os.makedirs(path, exist_ok=True)
+        return subprocess.Popen(
+            [
+                sys.executable, "-m", "app.services.shard_worker",
+                "--shard-id", str(shard_id),
+                "--path", path,
+                "--port", str(address[1]),
+                "--collection", collection_name,
+                "--metadata", json.dumps(collection_metadata)
+            ],
+            cwd=PROJECT_ROOT,
+            env={**os.environ, "SHARD_AUTHKEY": self._authkey.decode()}
+        )
+
+    def _wait_until_ready(
+        self,
+        shard_id: int,
+        address: tuple,
+        process: Optional[subprocess.Popen],
+        timeout: float
+    ) -> None:
+        deadline = time.monotonic() + timeout
+        while not self._is_running(address):
+            if process is not None and process.poll() is not None:
+                if self._is_running(address):
+                    # Outro processo subiu o shard primeiro (porta ocupada): usa o dele
+                    self._processes.remove(process)
+                    return
+                raise RuntimeError(f"Shard {shard_id} encerrou durante a inicialização (código {process.returncode})")
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Shard {shard_id} não respondeu em {timeout}s")
+            time.sleep(0.2)
+
+    def shard_for(self, doc_id: str) -> ShardCollection:
+        """Particionamento por hash estável do id (independente do processo)"""
+        digest = hashlib.md5(doc_id.encode("utf-8")).hexdigest()
+        return self.shards[int(digest[:8], 16) % self.n_shards]
+
+    def close(self) -> None:
+        for shard in self.shards:
+            shard.close()
+        for process in self._processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self._processes:
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self._processes = []
+
+
+_POOLS: Dict[tuple, ShardPool] = {}
+
+
+def get_shard_pool(
+    n_shards: int,
+    directory: str,
+    collection_name: str,
+    collection_metadata: Dict[str, Any],
+    base_port: int,
+    connections: int,
+    authkey: str
+) -> ShardPool:
+    """Um único pool por processo (AdminController e RAGService compartilham os shards)"""
+    key = (os.path.abspath(directory), collection_name, n_shards, base_port)
+    if key not in _POOLS:
+        _POOLS[key] = ShardPool(
+            n_shards, directory, collection_name, collection_metadata,
+            base_port=base_port, connections=connections, authkey=authkey
+        )
+    return _POOLS[key]
@@ -0,0 +1,86 @@
+"""
+Processo servidor de um shard do índice vetorial
+
+Cada shard é um processo independente com seu próprio PersistentClient do
+Chroma (diretório próprio) e atende chamadas do ShardPool via
+multiprocessing.connection (TCP em 127.0.0.1, autenticado por SHARD_AUTHKEY).
+Cada conexão é atendida por uma thread, permitindo consultas concorrentes.
+
+As mensagens são desserializadas com pickle: sem SHARD_AUTHKEY o shard não
+inicia, e conexões que falham na autenticação são descartadas.
+
+Normalmente é iniciado pelo ShardPool, mas pode ser executado à parte:
+    SHARD_AUTHKEY=... python -m app.services.shard_worker --shard-id 0 \\
+        --path ./chroma_data/shards/documents/shard_0 --port 8100 --collection documents
+"""
+
+import argparse
+import json
+import os
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+import chromadb
+
+# Métodos da coleção Chroma expostos aos clientes
+OPERATIONS = {"add", "upsert", "query", "get", "delete", "count"}
+
+
+def serve_connection(conn, collection, shard_id: int) -> None:
+    with conn:
+        while True:
+            try:
+                op, kwargs = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            if op == "handshake":
+                conn.send(("ok", {"shard_id": shard_id, "collection": collection.name, "metadata": collection.metadata}))
+                continue
+            if op == "shutdown":
+                conn.send(("ok", None))
+                os._exit(0)
+            if op not in OPERATIONS:
+                conn.send(("error", f"Operação desconhecida: {op}"))
+                continue
+
+            try:
+                conn.send(("ok", getattr(collection, op)(**kwargs)))
+            except Exception as e:
+                conn.send(("error", f"{type(e).__name__}: {e}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de shard do índice vetorial")
+    parser.add_argument("--shard-id", type=int, required=True)
+    parser.add_argument("--path", required=True)
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--collection", required=True)
+    parser.add_argument("--metadata", default="{}", help="Metadados de criação da coleção (JSON)")
+    args = parser.parse_args()
+
+    authkey = os.environ.get("SHARD_AUTHKEY", "")
+    if not authkey:
+        raise SystemExit("SHARD_AUTHKEY não definido: o shard não aceita conexões sem autenticação")
+
+    client = chromadb.PersistentClient(path=args.path)
+    collection = client.get_or_create_collection(
+        name=args.collection,
+        metadata=json.loads(args.metadata) or None
+    )
+
+    listener = Listener(("127.0.0.1", args.port), authkey=authkey.encode())
+    print(f"Shard {args.shard_id} pronto em 127.0.0.1:{args.port} ({collection.count()} chunks)")
+
+    while True:
+        try:
+            conn = listener.accept()
+        except (AuthenticationError, EOFError, OSError):
+            # Cliente sem a chave (ou que desconectou no desafio): não derruba o shard
+            continue
+        threading.Thread(target=serve_connection, args=(conn, collection, args.shard_id), daemon=True).start()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,474 @@
-import chromadb
-from typing import List, Dict, Any, Optional
+import os
+import re
+import json
+import random
+import shutil
+import hashlib
+import logging
+import unicodedata
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
 from sentence_transformers import SentenceTransformer
 from app.core.config import settings
 from app.models.document import Document, DocumentResponse
+from app.services.quantized_index import QuantizedIndex
+from app.services.category_router import CategoryRouter
+from app.services.lexical_index import BM25Index
+from app.services.document_index import DocumentIndex, document_key, document_title
+from app.services.embedding_cache import EmbeddingCache
+from app.services.context_compressor import ContextCompressor
+from app.services.collection_alias import CollectionAlias, ChromaCollectionAlias
+from app.services.near_duplicate_index import NearDuplicateIndex
+from app.services.chroma_client import create_chroma_client
+from app.services.rank_fusion import reciprocal_rank_fusion
+from app.services.shard_pool import get_shard_pool
+from app.services.metrics import runtime_collector
+
+logger = logging.getLogger(__name__)
+
+
+def build_hnsw_metadata(
+    space: str = "cosine",
+    m: int = 16,
+    construction_ef: int = 100,
+    search_ef: int = 64
+) -> Dict[str, Any]:
+    """Monta os metadados de criação de coleção com os parâmetros do índice HNSW
+
+    - space: métrica de distância (cosine, l2 ou ip)
+    - m: número de vizinhos por nó do grafo (mais = mais recall e mais memória)
+    - construction_ef: tamanho da lista de candidatos durante a construção
+    - search_ef: tamanho da lista de candidatos durante a busca (recall x latência)
+    """
+    return {
+        "hnsw:space": space,
+        "hnsw:M": m,
+        "hnsw:construction_ef": construction_ef,
+        "hnsw:search_ef": search_ef
+    }
+
+
+def distance_to_similarity(distance: float, space: str) -> float:
+    """Converte a distância retornada pelo Chroma em similaridade de cosseno
+
+    Os embeddings são normalizados, então:
+    - cosine / ip: distância = 1 - cos
+    - l2: o Chroma retorna a distância euclidiana ao quadrado = 2 - 2cos
+    """
+    if space == "l2":
+        return 1 - distance / 2
+    return 1 - distance
+
+
+def partition_collection_name(base_name: str, category: str) -> str:
+    """Nome da coleção-partição de uma categoria
+
+    O Chroma só aceita [a-zA-Z0-9._-] em nomes de coleção, então a categoria é
+    convertida para ASCII e recebe um sufixo de hash para evitar colisões.
+    """
+    ascii_name = unicodedata.normalize("NFKD", category).encode("ascii", "ignore").decode()
+    slug = re.sub(r"[^a-zA-Z0-9]+", "-", ascii_name).strip("-").lower()[:40] or "categoria"
+    digest = hashlib.sha1(category.encode("utf-8")).hexdigest()[:8]
+    return f"{base_name}__cat__{slug}-{digest}"
+
+
+def chunk_id(document: Document) -> str:
+    """Id determinístico do chunk: categoria + SHA-256 de (arquivo de origem, título, conteúdo)
+
+    Diferente de hash(), que muda a cada processo (PYTHONHASHSEED), o mesmo
+    chunk sempre recebe o mesmo id, então recargas não duplicam o índice. O
+    arquivo de origem entra no hash para que arquivos com trechos idênticos
+    não compartilhem chunks (remover um não afeta o outro).
+    """
+    source = (document.metadata or {}).get("source_file", "")
+    digest = hashlib.sha256(f"{source}\x00{document.title}\x00{document.content}".encode("utf-8")).hexdigest()
+    return f"{document.category}_{digest[:32]}"
+
 
 class VectorService:
-    def __init__(self):
-        self.client = chromadb.PersistentClient(path=settings.chroma_persist_directory)
+    def __init__(self, collection_name: Optional[str] = None, base: Optional["VectorService"] = None):
+        """
+        Args:
+            collection_name: Coleção fixa (usado na reconstrução blue/green). Sem ele,
+                abre a coleção apontada pelo alias CHROMA_COLLECTION_NAME e segue as trocas
+            base: Instância existente cujo cliente, modelo e cache de embeddings são reaproveitados
+        """
+        if base is not None:
+            self.client = base.client
+            self.embedding_model = base.embedding_model
+            self.embedding_cache = base.embedding_cache
+            self.context_compressor = base.context_compressor
+            self.alias = base.alias
+        else:
+            self.client = create_chroma_client()
+            self.embedding_model = SentenceTransformer(settings.embedding_model)
+
+            # Cache de embeddings por (modelo, hash do texto), compartilhado entre coleções
+            self.embedding_cache = None
+            if settings.embedding_cache_enabled:
+                self.embedding_cache = EmbeddingCache(
+                    directory=os.path.join(
+                        settings.chroma_persist_directory, "embedding_cache",
+                        re.sub(r"[^a-zA-Z0-9._-]+", "_", settings.embedding_model)
+                    ),
+                    dim=self.embedding_model.get_sentence_embedding_dimension(),
+                    shard_size=settings.embedding_cache_shard_size
+                )
+                runtime_collector.register_cache("embedding", self.embedding_cache)
+
+            # Embeddings de sentenças para a compressão do contexto (calculados na ingestão)
+            self.context_compressor = None
+            if settings.context_compression_enabled:
+                self.context_compressor = ContextCompressor(
+                    embedding_model=self.embedding_model,
+                    cache=EmbeddingCache(
+                        directory=os.path.join(
+                            settings.chroma_persist_directory, "sentence_embeddings",
+                            re.sub(r"[^a-zA-Z0-9._-]+", "_", settings.embedding_model)
+                        ),
+                        dim=self.embedding_model.get_sentence_embedding_dimension(),
+                        shard_size=settings.embedding_cache_shard_size
+                    ),
+                    max_sentences=settings.context_compression_max_sentences
+                )
+                runtime_collector.register_cache("sentence_embedding", self.context_compressor.cache)
+
+            # CHROMA_COLLECTION_NAME é um alias para a versão atual da coleção (no servidor, em modo http)
+            alias_path = os.path.join(settings.chroma_persist_directory, "collection_aliases.json")
+            if settings.chroma_client_mode == "http":
+                self.alias = ChromaCollectionAlias(self.client, legacy_path=alias_path)
+            else:
+                self.alias = CollectionAlias(alias_path)
+
+        self.follows_alias = collection_name is None
+        self._open_collection(collection_name or self.alias.resolve(settings.chroma_collection_name))
+
+    def _open_collection(self, collection_name: str) -> None:
+        """Abre a coleção e os índices auxiliares dela (na criação ou quando o alias muda)"""
+        self.collection_name = collection_name
         self.collection = self.client.get_or_create_collection(
-            name=settings.chroma_collection_name
+            name=collection_name,
+            metadata=self._collection_metadata()
         )
-        self.embedding_model = SentenceTransformer(settings.embedding_model)
-    
+        # Coleções existentes mantêm a métrica com que foram criadas
+        self.distance_space = self._distance_space(self.collection)
+        if self.distance_space != settings.chroma_distance_space:
+            logger.warning(
+                f"Coleção '{collection_name}' usa distância '{self.distance_space}' "
+                f"(configurado: '{settings.chroma_distance_space}'). Recrie a coleção para aplicar."
+            )
+
+        # Índices auxiliares ficam em uma pasta por coleção
+        self.index_directory = os.path.join(
+            settings.chroma_persist_directory, "indexes", collection_name
+        )
+
+        self.quantized_index = None
+        if settings.vector_index_mode in QuantizedIndex.MODES:
+            self.quantized_index = QuantizedIndex(
+                directory=os.path.join(self.index_directory, f"quantized_{settings.vector_index_mode}"),
+                dim=self.embedding_model.get_sentence_embedding_dimension(),
+                mode=settings.vector_index_mode
+            )
+
+        # Sharding: N processos, cada um com uma fatia (hash do id) da coleção
+        self.shard_pool = None
+        if settings.vector_shards > 1 and settings.chroma_client_mode == "http":
+            logger.warning("CHROMA_CLIENT_MODE=http: VECTOR_SHARDS ignorado (shards usam Chroma local em cada processo)")
+        elif settings.vector_shards > 1:
+            if settings.category_partitioning:
+                logger.warning("VECTOR_SHARDS > 1: particionamento por categoria desativado (shards têm precedência)")
+            self.shard_pool = get_shard_pool(
+                n_shards=settings.vector_shards,
+                directory=os.path.join(settings.chroma_persist_directory, "shards", collection_name),
+                collection_name=collection_name,
+                collection_metadata=self._collection_metadata(),
+                base_port=settings.vector_shard_base_port,
+                connections=settings.vector_shard_connections,
+                authkey=settings.vector_shard_authkey
+            )
+
+        # Particionamento por categoria: uma coleção Chroma (e um grafo HNSW) por categoria
+        self.partitions: Dict[str, Any] = {}
+        if settings.category_partitioning and self.shard_pool is None:
+            self._load_partitions()
+
+        # Centróides por categoria para rotear consultas sem category_filter
+        self.category_router = None
+        if settings.category_routing:
+            self.category_router = CategoryRouter(
+                path=os.path.join(self.index_directory, "category_centroids.json"),
+                min_similarity=settings.category_routing_min_similarity,
+                min_margin=settings.category_routing_min_margin
+            )
+
+        # Índice lexical BM25 para o modo de busca híbrido
+        self.lexical_index = None
+        if settings.lexical_index_enabled:
+            self.lexical_index = BM25Index(os.path.join(self.index_directory, "bm25"))
+
+        # Embeddings por documento (1º nível da busca hierárquica)
+        self.document_index = None
+        if settings.document_index_enabled:
+            self.document_index = DocumentIndex(
+                collection=self.client.get_or_create_collection(
+                    name=f"{collection_name}__docs",
+                    metadata=self._collection_metadata()
+                ),
+                encode=self._encode_documents,
+                title_weight=settings.hierarchical_title_weight,
+                category_weight=settings.hierarchical_category_weight
+            )
+
+        # Assinaturas MinHash para descartar chunks quase duplicados na ingestão
+        self.near_duplicates = None
+        if settings.dedup_enabled:
+            self.near_duplicates = NearDuplicateIndex(
+                directory=os.path.join(self.index_directory, "minhash"),
+                threshold=settings.dedup_threshold,
+                num_perm=settings.dedup_num_perm,
+                shingle_size=settings.dedup_shingle_size
+            )
+
+        # Marca da última gravação dos índices auxiliares (outras instâncias recarregam quando muda)
+        self._generation = self._generation_signature()
+
+        self._backfill_indexes(
+            # Modo quantizado ativado depois da ingestão: o índice não tem todos os chunks da coleção
+            quantized=self.quantized_index is not None and len(self.quantized_index) < sum(
+                collection.count() for collection in self._storage_collections()
+            ),
+            centroids=self.category_router is not None and self.category_router.is_empty,
+            lexical=self.lexical_index is not None and len(self.lexical_index) == 0,
+            documents=self.document_index is not None and len(self.document_index) == 0,
+            duplicates=self.near_duplicates is not None and len(self.near_duplicates) == 0
+        )
+
+    def refresh_alias(self) -> bool:
+        """Passa a usar a nova versão da coleção se o alias foi trocado (inclusive por outro processo)"""
+        if not self.follows_alias:
+            return False
+        self.alias.changed()
+        target = self.alias.resolve(settings.chroma_collection_name)
+        if target == self.collection_name:
+            return False
+        logger.info(f"Alias '{settings.chroma_collection_name}': '{self.collection_name}' -> '{target}'")
+        self._open_collection(target)
+        return True
+
+    def refresh(self) -> None:
+        """Segue o alias e recarrega os índices auxiliares gravados por outra instância ou processo"""
+        if not self.refresh_alias():
+            self.refresh_indexes()
+
+    def _generation_path(self) -> str:
+        return os.path.join(self.index_directory, "generation")
+
+    def _generation_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self._generation_path())
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns)
+
+    def _publish_generation(self) -> None:
+        """Sinaliza que os índices auxiliares mudaram (troca atômica, como o alias)"""
+        os.makedirs(self.index_directory, exist_ok=True)
+        tmp_path = f"{self._generation_path()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(datetime.now().isoformat())
+        os.replace(tmp_path, self._generation_path())
+        self._generation = self._generation_signature()
+
+    def refresh_indexes(self) -> bool:
+        """Recarrega o estado mantido em memória se outra instância gravou os índices (um `stat` por chamada)
+
+        Dentro de um processo a ingestão e as consultas usam a mesma instância
+        (get_vector_service); isto cobre outros processos (workers do uvicorn,
+        réplicas com o diretório de dados compartilhado).
+        """
+        signature = self._generation_signature()
+        if signature == self._generation:
+            return False
+        self._generation = signature
+        if settings.category_partitioning and self.shard_pool is None:
+            self._load_partitions()
+        if self.context_compressor is not None:
+            self.context_compressor.cache.reload()
+        if self.quantized_index is not None:
+            self.quantized_index.reload()
+        if self.category_router is not None:
+            self.category_router.reload()
+        if self.lexical_index is not None:
+            self.lexical_index.reload()
+        if self.near_duplicates is not None:
+            self.near_duplicates.reload()
+        if self.embedding_cache is not None:
+            self.embedding_cache.reload()
+        return True
+
+    def drop_collection_version(self, collection_name: str) -> None:
+        """Remove uma versão antiga: coleção, partições, índice de documentos e índices auxiliares"""
+        prefixes = (f"{collection_name}__cat__", f"{collection_name}__docs")
+        for name in self.collection_names():
+            if name == collection_name or name.startswith(prefixes):
+                self.client.delete_collection(name)
+        shutil.rmtree(os.path.join(settings.chroma_persist_directory, "indexes", collection_name), ignore_errors=True)
+
+    def _collection_metadata(self, **extra) -> Dict[str, Any]:
+        return {
+            **build_hnsw_metadata(
+                space=settings.chroma_distance_space,
+                m=settings.hnsw_m,
+                construction_ef=settings.hnsw_construction_ef,
+                search_ef=settings.hnsw_search_ef
+            ),
+            **extra
+        }
+
+    @staticmethod
+    def _distance_space(collection) -> str:
+        return (collection.metadata or {}).get("hnsw:space", "l2")
+
+    def _load_partitions(self) -> None:
+        """Descobre as partições existentes (criadas em ingestões anteriores ou por outra instância)"""
+        prefix = f"{self.collection_name}__cat__"
+        partitions = {}
+        for name in self.collection_names():
+            if name.startswith(prefix):
+                collection = self.client.get_collection(name)
+                category = (collection.metadata or {}).get("category")
+                if category:
+                    partitions[category] = collection
+        self.partitions = partitions
+
+    def collection_names(self) -> List[str]:
+        # Versões novas do Chroma retornam objetos Collection, versões antigas apenas nomes
+        return [entry if isinstance(entry, str) else entry.name for entry in self.client.list_collections()]
+
+    def _partition(self, category: str):
+        if category not in self.partitions:
+            self.partitions[category] = self.client.get_or_create_collection(
+                name=partition_collection_name(self.collection_name, category),
+                metadata=self._collection_metadata(category=category)
+            )
+        return self.partitions[category]
+
+    def _storage_collections(self) -> List[Any]:
+        """Coleções que guardam chunks no modo atual"""
+        if self.shard_pool is not None:
+            return list(self.shard_pool.shards)
+        if settings.category_partitioning:
+            return list(self.partitions.values())
+        return [self.collection]
+
+    def _storage_collection_for(self, doc_id: str, category: str):
+        """Coleção onde um chunk novo deve ser gravado"""
+        if self.shard_pool is not None:
+            return self.shard_pool.shard_for(doc_id)
+        if settings.category_partitioning:
+            return self._partition(category)
+        return self.collection
+
+    def _backfill_indexes(
+        self,
+        centroids: bool,
+        lexical: bool,
+        documents: bool = False,
+        duplicates: bool = False,
+        quantized: bool = False,
+        batch_size: int = 1000
+    ) -> None:
+        """Constrói índices auxiliares vazios a partir dos chunks já indexados (primeira execução)"""
+        if not centroids and not lexical and not documents and not duplicates and not quantized:
+            return
+
+        include = ["metadatas"]
+        if centroids or documents or quantized:
+            include.append("embeddings")
+        if lexical or duplicates:
+            include.append("documents")
+
+        for collection in self._storage_collections():
+            offset = 0
+            while True:
+                batch = collection.get(include=include, limit=batch_size, offset=offset)
+                if not len(batch['ids']):
+                    break
+                categories = [metadata['category'] for metadata in batch['metadatas']]
+                if quantized:
+                    # Ids já presentes são sobrescritos, então completar um índice parcial não duplica linhas
+                    self.quantized_index.add(batch['ids'], batch['embeddings'], categories)
+                if centroids:
+                    by_category: Dict[str, List] = {}
+                    for embedding, category in zip(batch['embeddings'], categories):
+                        by_category.setdefault(category, []).append(embedding)
+                    for category, embeddings in by_category.items():
+                        self.category_router.update(category, embeddings)
+                if lexical:
+                    self.lexical_index.add(batch['ids'], batch['documents'], categories)
+                if duplicates:
+                    for doc_id, content in zip(batch['ids'], batch['documents']):
+                        self.near_duplicates.add(doc_id, content)
+                if documents:
+                    for doc_id, embedding, metadata in zip(batch['ids'], batch['embeddings'], batch['metadatas']):
+                        self.document_index.add(
+                            document_key(metadata), document_title(metadata), metadata['category'], [doc_id], [embedding]
+                        )
+                    # Documentos divididos entre lotes são somados no flush: memória limitada ao lote
+                    self.document_index.flush()
+                offset += batch_size
+
+        self.flush_indexes()
+
+    def flush_indexes(self) -> None:
+        """Persiste os índices auxiliares mantidos em memória durante a ingestão"""
+        if self.category_router is not None and not self.category_router.is_empty:
+            self.category_router.save()
+        if self.lexical_index is not None and len(self.lexical_index):
+            self.lexical_index.save()
+        if self.document_index is not None:
+            self.document_index.flush()
+        if self.near_duplicates is not None:
+            self.near_duplicates.save()
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
+        if self.context_compressor is not None:
+            self.context_compressor.cache.flush()
+        self._publish_generation()
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_model.encode(texts, normalize_embeddings=True).tolist()
+
+    def encode_query(self, query: str) -> List[float]:
+        return self._encode([query])[0]
+
+    def _encode_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings de conteúdo indexado: consulta o cache e só envia ao encoder os textos novos"""
+        if self.embedding_cache is None:
+            return self._encode(texts)
+
+        keys = [EmbeddingCache.key(text) for text in texts]
+        cached = self.embedding_cache.get_many(keys)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        if missing:
+            encoded = self.embedding_model.encode([texts[i] for i in missing], normalize_embeddings=True)
+            self.embedding_cache.put_many([keys[i] for i in missing], encoded)
+            for i, vector in zip(missing, encoded):
+                cached[i] = vector
+        return [np.asarray(vector, dtype=np.float32).tolist() for vector in cached]
+
     async def add_document(self, document: Document) -> str:
-        embedding = self.embedding_model.encode([document.content])[0].tolist()
+        embedding = self._encode_documents([document.content])[0]
         
-        doc_id = f"{document.category}_{hash(document.title + document.content)}"
+        doc_id = chunk_id(document)
         
-        self.collection.add(
+        target = self._storage_collection_for(doc_id, document.category)
+        # Ids vêm do conteúdo: um chunk reenviado já está no centróide e não pode somar de novo
+        already_indexed = self.category_router is not None and bool(target.get(ids=[doc_id], include=[])['ids'])
+        target.upsert(
             documents=[document.content],
             embeddings=[embedding],
             metadatas=[{
@@ -27,27 +478,342 @@ class VectorService:
             }],
             ids=[doc_id]
         )
+
+        if self.quantized_index is not None:
+            self.quantized_index.add([doc_id], [embedding], [document.category])
+
+        if self.category_router is not None and not already_indexed:
+            self.category_router.update(document.category, [embedding])
+
+        if self.lexical_index is not None:
+            self.lexical_index.add([doc_id], [document.content], [document.category])
+
+        if self.document_index is not None:
+            metadata = {"title": document.title, **document.metadata}
+            self.document_index.add(
+                document_key(metadata), document_title(metadata), document.category, [doc_id], [embedding]
+            )
+
+        if self.near_duplicates is not None:
+            self.near_duplicates.add(doc_id, document.content)
+
+        if self.context_compressor is not None:
+            self.context_compressor.precompute([document.content])
         
         return doc_id
-    
+
+    def find_near_duplicate(self, document: Document) -> Optional[Tuple[str, float]]:
+        """Chunk já indexado quase idêntico ao documento: (id, similaridade estimada) ou None"""
+        if self.near_duplicates is None:
+            return None
+        return self.near_duplicates.find(document.content, exclude_id=chunk_id(document))
+
+    def merge_duplicate(self, canonical_id: str, document: Document) -> None:
+        """Registra o arquivo de origem da duplicata nos metadados do chunk mantido (citações)"""
+        found = self._fetch_documents([canonical_id], include_embeddings=True)
+        if canonical_id not in found:
+            return
+        content, metadata, embedding = found[canonical_id]
+        sources = [source for source in metadata.get("duplicate_sources", "").split(",") if source]
+        source_file = document.metadata.get("source_file", document.title)
+        if source_file == metadata.get("source_file") or source_file in sources:
+            return
+
+        self._storage_collection_for(canonical_id, metadata["category"]).upsert(
+            ids=[canonical_id],
+            documents=[content],
+            embeddings=[np.asarray(embedding, dtype=np.float32).tolist()],
+            metadatas=[{
+                **metadata,
+                "duplicate_sources": ",".join(sources + [source_file]),
+                "duplicate_count": len(sources) + 1
+            }]
+        )
+
+    async def delete_documents(self, ids: List[str]) -> int:
+        """Remove chunks do armazenamento e de todos os índices auxiliares; retorna quantos existiam"""
+        if not ids:
+            return 0
+
+        found = self._fetch_documents(ids, include_embeddings=self.category_router is not None)
+        if not found:
+            return 0
+        found_ids = list(found)
+
+        if self.shard_pool is not None:
+            by_shard: Dict[int, List[str]] = {}
+            for doc_id in found_ids:
+                by_shard.setdefault(self.shard_pool.shard_for(doc_id).shard_id, []).append(doc_id)
+            for shard_id, shard_ids in by_shard.items():
+                self.shard_pool.shards[shard_id].delete(ids=shard_ids)
+        else:
+            for collection in self._storage_collections():
+                collection.delete(ids=found_ids)
+
+        if self.quantized_index is not None:
+            self.quantized_index.remove(found_ids)
+
+        if self.lexical_index is not None:
+            self.lexical_index.remove(found_ids)
+
+        if self.category_router is not None:
+            by_category: Dict[str, List] = {}
+            for content, metadata, embedding in found.values():
+                by_category.setdefault(metadata['category'], []).append(embedding)
+            for category, embeddings in by_category.items():
+                self.category_router.remove(category, embeddings)
+
+        if self.document_index is not None:
+            self.document_index.remove(sorted({document_key(entry[1]) for entry in found.values()}))
+
+        if self.near_duplicates is not None:
+            self.near_duplicates.remove(found_ids)
+
+        return len(found_ids)
+
+    def get_chunk_ids_by_file(self, file_path: str) -> List[str]:
+        """Ids dos chunks gerados a partir de um arquivo (usado quando o manifesto não tem o arquivo)"""
+        target = os.path.abspath(file_path)
+        ids = []
+        for collection in self._storage_collections():
+            stored = collection.get(where={"source_file": os.path.basename(file_path)}, include=["metadatas"])
+            ids.extend(
+                doc_id for doc_id, metadata in zip(stored['ids'], stored['metadatas'])
+                if os.path.abspath(metadata.get("file_path", "")) == target
+            )
+        return ids
+
     async def search_documents(
         self, 
         query: str, 
         limit: int = 5,
-        category_filter: Optional[str] = None
+        category_filter: Optional[str] = None,
+        search_mode: Optional[str] = None,
+        query_embedding: Optional[List[float]] = None
     ) -> List[DocumentResponse]:
-        query_embedding = self.embedding_model.encode([query])[0].tolist()
-        
+        """
+        Busca os chunks mais relevantes para a consulta
+
+        `query_embedding` evita codificar a consulta de novo quando quem chama
+        já tem o vetor (ex.: RAGService, que o reutiliza na compressão do contexto).
+
+        Modos de busca (search_mode, padrão settings.default_search_mode):
+        - dense: similaridade de embeddings (HNSW, partições ou índice quantizado)
+        - hybrid: funde o ranking denso com o ranking lexical BM25 via RRF
+        - hierarchical: seleciona os documentos mais próximos e busca chunks só neles
+        """
+        self.refresh()
+        if query_embedding is None:
+            query_embedding = self.encode_query(query)
+
+        if category_filter == "string":
+            category_filter = None
+
+        mode = search_mode or settings.default_search_mode
+        if (mode == "hybrid" and self.lexical_index is None) or (mode == "hierarchical" and self.document_index is None):
+            mode = "dense"
+
+        routing = None
+        if not category_filter and self.category_router is not None:
+            routing = self.category_router.route(query_embedding)
+            category_filter = routing["category"]
+
+        documents = self._run_search(query, query_embedding, limit, category_filter, mode)
+
+        if routing is not None:
+            if routing["category"] and len(documents) < limit:
+                # A categoria escolhida não tem chunks suficientes: volta para a busca global
+                documents = self._run_search(query, query_embedding, limit, None, mode)
+                routing["fallback"] = "insufficient_results"
+            elif routing["category"] and random.random() < settings.category_routing_audit_rate:
+                global_documents = self._run_search(query, query_embedding, limit, None, mode)
+                routing["audit"] = self._audit_routing(routing["category"], documents, global_documents)
+            self._log_routing(query, routing, documents)
+
+        return documents
+
+    def _run_search(
+        self,
+        query: str,
+        query_embedding: List[float],
+        limit: int,
+        category_filter: Optional[str],
+        mode: str
+    ) -> List[DocumentResponse]:
+        if mode == "hybrid":
+            return self._search_hybrid(query, query_embedding, limit, category_filter)
+        if mode == "hierarchical":
+            return self._search_hierarchical(query_embedding, limit, category_filter)
+        return self._search(query_embedding, limit, category_filter)
+
+    def _search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        category_filter: Optional[str]
+    ) -> List[DocumentResponse]:
+        if self.quantized_index is not None:
+            return self._search_quantized(query_embedding, limit, category_filter)
+
+        if self.shard_pool is not None:
+            where_filter = {"category": category_filter} if category_filter else None
+            return self._fan_out(self.shard_pool.shards, query_embedding, limit, where_filter)
+
+        if settings.category_partitioning:
+            return self._search_partitions(query_embedding, limit, category_filter)
+
         where_filter = None
-        if category_filter and category_filter != "string":
+        if category_filter:
             where_filter = {"category": category_filter}
-        
-        results = self.collection.query(
+
+        return self._query_collection(self.collection, query_embedding, limit, where_filter)
+
+    def _search_hybrid(
+        self,
+        query: str,
+        query_embedding: List[float],
+        limit: int,
+        category_filter: Optional[str]
+    ) -> List[DocumentResponse]:
+        """Funde os rankings denso e BM25 com Reciprocal Rank Fusion
+
+        Cada ranking contribui com `limit * hybrid_candidate_multiplier` candidatos.
+        O similarity_score continua sendo a similaridade de cosseno (também para
+        chunks encontrados só pelo BM25), e o score RRF vai em metadata.
+        """
+        candidates = limit * settings.hybrid_candidate_multiplier
+        dense = self._search(query_embedding, candidates, category_filter)
+        lexical = self.lexical_index.search(query, candidates, category_filter)
+
+        fused = reciprocal_rank_fusion(
+            [[doc.id for doc in dense], [doc_id for doc_id, _ in lexical]],
+            k=settings.hybrid_rrf_k,
+            weights=[1.0, settings.hybrid_lexical_weight]
+        )[:limit]
+
+        dense_by_id = {doc.id: doc for doc in dense}
+        missing = [doc_id for doc_id, _ in fused if doc_id not in dense_by_id]
+        lexical_only = self._fetch_documents(missing, include_embeddings=True) if missing else {}
+
+        documents = []
+        for doc_id, rrf_score in fused:
+            if doc_id in dense_by_id:
+                doc = dense_by_id[doc_id]
+            elif doc_id in lexical_only:
+                content, metadata, embedding = lexical_only[doc_id]
+                doc = DocumentResponse(
+                    id=doc_id,
+                    title=metadata['title'],
+                    category=metadata['category'],
+                    content=content,
+                    metadata=metadata,
+                    similarity_score=float(sum(a * b for a, b in zip(embedding, query_embedding)))
+                )
+            else:
+                continue
+            doc.metadata = {**doc.metadata, "rrf_score": round(rrf_score, 6)}
+            documents.append(doc)
+
+        return documents
+
+    def _search_hierarchical(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        category_filter: Optional[str]
+    ) -> List[DocumentResponse]:
+        """Busca em dois níveis: top documentos e, depois, chunks restritos a eles
+
+        Os chunks dos documentos selecionados são carregados por id e
+        re-pontuados de forma exata. No máximo `hierarchical_chunks_per_document`
+        chunks por documento entram no resultado, evitando vários chunks
+        vizinhos do mesmo arquivo.
+        """
+        selected = self.document_index.search(
+            query_embedding, settings.hierarchical_top_documents, category_filter
+        )
+        if not selected:
+            return []
+
+        chunk_ids = [doc_id for _, ids in selected for doc_id in ids]
+        found = self._fetch_documents(chunk_ids, include_embeddings=True)
+        if not found:
+            return []
+
+        ids = list(found)
+        scores = np.asarray([found[doc_id][2] for doc_id in ids], dtype=np.float32) @ np.asarray(
+            query_embedding, dtype=np.float32
+        )
+
+        documents, taken = [], {}
+        for position in np.argsort(-scores):
+            content, metadata, _ = found[ids[position]]
+            key = document_key(metadata)
+            if taken.get(key, 0) >= settings.hierarchical_chunks_per_document:
+                continue
+            taken[key] = taken.get(key, 0) + 1
+            documents.append(DocumentResponse(
+                id=ids[position],
+                title=metadata['title'],
+                category=metadata['category'],
+                content=content,
+                metadata=metadata,
+                similarity_score=float(scores[position])
+            ))
+            if len(documents) == limit:
+                break
+
+        return documents
+
+    @staticmethod
+    def _audit_routing(
+        category: str,
+        routed: List[DocumentResponse],
+        global_documents: List[DocumentResponse]
+    ) -> Dict[str, Any]:
+        """Compara a busca roteada com a global (amostragem para medir acurácia)"""
+        global_ids = {doc.id for doc in global_documents}
+        return {
+            "global_top_category": global_documents[0].category if global_documents else None,
+            "top1_match": bool(global_documents) and global_documents[0].category == category,
+            "overlap_at_k": round(
+                len(global_ids & {doc.id for doc in routed}) / len(global_ids), 3
+            ) if global_ids else None
+        }
+
+    def _log_routing(self, query: str, routing: Dict[str, Any], documents: List[DocumentResponse]) -> None:
+        """Registra a decisão de roteamento em routing_log.jsonl para análise de acurácia"""
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "query": query,
+            **routing,
+            "result_categories": [doc.category for doc in documents]
+        }
+        logger.info(
+            f"Roteamento: categoria={routing['category']} motivo={routing['reason']} "
+            f"margem={routing.get('margin')}"
+        )
+        try:
+            os.makedirs(self.index_directory, exist_ok=True)
+            with open(os.path.join(self.index_directory, "routing_log.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning(f"Não foi possível registrar roteamento: {e}")
+
+    def _query_collection(
+        self,
+        collection,
+        query_embedding: List[float],
+        limit: int,
+        where_filter: Optional[Dict[str, Any]] = None
+    ) -> List[DocumentResponse]:
+        results = collection.query(
             query_embeddings=[query_embedding],
             n_results=limit,
             where=where_filter
         )
-        
+        space = self._distance_space(collection)
+
         documents = []
         if results['ids'] and results['ids'][0]:
             for i, doc_id in enumerate(results['ids'][0]):
@@ -57,21 +823,174 @@ class VectorService:
                     category=results['metadatas'][0][i]['category'],
                     content=results['documents'][0][i],
                     metadata=results['metadatas'][0][i],
-                    similarity_score=1 - results['distances'][0][i] if 'distances' in results else None
+                    similarity_score=distance_to_similarity(
+                        results['distances'][0][i], space
+                    ) if results.get('distances') else None
                 ))
-        
+
+        return documents
+
+    def _search_partitions(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        category_filter: Optional[str]
+    ) -> List[DocumentResponse]:
+        """Consulta filtrada vai direto à partição; sem filtro, consulta todas e mescla
+
+        Partição desconhecida (ou nenhuma) pode ter sido criada por outra
+        instância depois da última descoberta: redescobre antes de desistir.
+        """
+        if category_filter:
+            if category_filter not in self.partitions:
+                self._load_partitions()
+            partition = self.partitions.get(category_filter)
+            if partition is None:
+                return []
+            return self._query_collection(partition, query_embedding, limit)
+
+        if not self.partitions:
+            self._load_partitions()
+        return self._fan_out(list(self.partitions.values()), query_embedding, limit)
+
+    def _fan_out(
+        self,
+        collections: List[Any],
+        query_embedding: List[float],
+        limit: int,
+        where_filter: Optional[Dict[str, Any]] = None
+    ) -> List[DocumentResponse]:
+        """Consulta várias coleções (partições ou shards) em paralelo e mescla os top-k"""
+        if not collections:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(len(collections), 8)) as executor:
+            per_collection = executor.map(
+                lambda collection: self._query_collection(collection, query_embedding, limit, where_filter),
+                collections
+            )
+            merged = [doc for docs in per_collection for doc in docs]
+
+        merged.sort(key=lambda doc: doc.similarity_score or 0, reverse=True)
+        return merged[:limit]
+
+    def _fetch_documents(self, ids: List[str], include_embeddings: bool = False) -> Dict[str, tuple]:
+        """Carrega (conteúdo, metadados[, embedding]) por id em todas as coleções de armazenamento"""
+        include = ["documents", "metadatas"] + (["embeddings"] if include_embeddings else [])
+
+        if self.shard_pool is not None:
+            # O shard de cada id é conhecido: uma chamada por shard envolvido
+            by_shard: Dict[int, List[str]] = {}
+            for doc_id in ids:
+                by_shard.setdefault(self.shard_pool.shard_for(doc_id).shard_id, []).append(doc_id)
+            lookups = [(self.shard_pool.shards[shard_id], shard_ids) for shard_id, shard_ids in by_shard.items()]
+        else:
+            lookups = [(collection, ids) for collection in self._storage_collections()]
+
+        found = {}
+        for collection, candidate_ids in lookups:
+            missing = [doc_id for doc_id in candidate_ids if doc_id not in found]
+            if not missing:
+                continue
+            stored = collection.get(ids=missing, include=include)
+            for i, doc_id in enumerate(stored['ids']):
+                entry = (stored['documents'][i], stored['metadatas'][i])
+                if include_embeddings:
+                    entry += (stored['embeddings'][i],)
+                found[doc_id] = entry
+        return found
+
+    def _search_quantized(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        category_filter: Optional[str]
+    ) -> List[DocumentResponse]:
+        """Busca no índice quantizado e carrega conteúdo/metadados do Chroma"""
+        hits = self.quantized_index.search(
+            query_embedding,
+            limit=limit,
+            candidates=settings.quantized_rerank_candidates,
+            category_filter=category_filter
+        )
+        if not hits:
+            return []
+
+        by_id = self._fetch_documents([doc_id for doc_id, _ in hits])
+
+        documents = []
+        for doc_id, score in hits:
+            if doc_id not in by_id:
+                continue
+            content, metadata = by_id[doc_id]
+            documents.append(DocumentResponse(
+                id=doc_id,
+                title=metadata['title'],
+                category=metadata['category'],
+                content=content,
+                metadata=metadata,
+                similarity_score=score
+            ))
+
         return documents
-    
+
+    def get_index_stats(self) -> Dict[str, Any]:
+        """Estatísticas do índice vetorial (tamanho, métrica, memória do modo quantizado)"""
+        self.refresh()
+        stats = {
+            "client_mode": settings.chroma_client_mode,
+            "alias": settings.chroma_collection_name,
+            "collection": self.collection_name,
+            "index_mode": settings.vector_index_mode,
+            "distance_space": self.distance_space,
+            "total_chunks": sum(collection.count() for collection in self._storage_collections())
+        }
+        if self.shard_pool is not None:
+            stats["shards"] = {shard.name: shard.count() for shard in self.shard_pool.shards}
+        elif settings.category_partitioning:
+            stats["partitions"] = {
+                category: collection.count() for category, collection in self.partitions.items()
+            }
+        if self.quantized_index is not None:
+            stats["quantized"] = self.quantized_index.memory_report()
+        if self.category_router is not None:
+            stats["routing_centroids"] = self.category_router.summary()
+        if self.lexical_index is not None:
+            stats["lexical"] = self.lexical_index.stats()
+        if self.document_index is not None:
+            stats["documents"] = len(self.document_index)
+        if self.near_duplicates is not None:
+            stats["near_duplicates"] = self.near_duplicates.stats()
+        if self.embedding_cache is not None:
+            stats["embedding_cache"] = self.embedding_cache.stats()
+        if self.context_compressor is not None:
+            stats["sentence_embeddings"] = self.context_compressor.cache.stats()
+        return stats
+
     async def get_document_by_id(self, doc_id: str) -> Optional[DocumentResponse]:
-        results = self.collection.get(ids=[doc_id])
+        self.refresh()
+        found = self._fetch_documents([doc_id])
         
-        if not results['ids']:
+        if doc_id not in found:
             return None
         
+        content, metadata = found[doc_id]
         return DocumentResponse(
-            id=results['ids'][0],
-            title=results['metadatas'][0]['title'],
-            category=results['metadatas'][0]['category'],
-            content=results['documents'][0],
-            metadata=results['metadatas'][0]
-        )
\ No newline at end of file
+            id=doc_id,
+            title=metadata['title'],
+            category=metadata['category'],
+            content=content,
+            metadata=metadata
+        )
+
+
+_SHARED: Optional[VectorService] = None
+
+
+def get_vector_service() -> VectorService:
+    """Uma única instância por processo: a ingestão (AdminController) e as consultas
+    (RAGService) enxergam as mesmas partições, índices auxiliares e caches"""
+    global _SHARED
+    if _SHARED is None:
+        _SHARED = VectorService()
+    return _SHARED
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Benchmark: latência do índice lexical BM25
+
+Gera um corpus a partir das frases de `conteudo_ficticio` (com códigos
+sintéticos do tipo "POL-00042" para simular os termos exatos das políticas)
+e mede, para cada tamanho de corpus:
+
+- tempo de construção do índice (tokenização + matriz esparsa)
+- latência p50/p99 da busca vetorizada (scipy.sparse)
+- latência p50/p99 de uma implementação ingênua em Python puro (referência)
+- custo da fusão RRF com um ranking denso simulado
+
+Uso:
+    python -m benchmarks.bm25_latency --sizes 1000 10000 100000
+"""
+
+import argparse
+import math
+import os
+import random
+import re
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+from app.services.lexical_index import BM25Index, tokenize
+from app.services.rank_fusion import reciprocal_rank_fusion
+from benchmarks.common import Timer, latency_summary, print_table, save_results
+
+
+def load_sentences(directory: str):
+    sentences = []
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".txt"):
+            with open(os.path.join(directory, filename), "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not re.match(r"^(Título|Categoria):", line):
+                        sentences.append(line)
+    return sentences
+
+
+def build_corpus(sentences, size: int, rng: random.Random):
+    texts = []
+    for i in range(size):
+        body = " ".join(rng.choice(sentences) for _ in range(rng.randint(3, 8)))
+        texts.append(f"{body} Referência POL-{i:05d}.")
+    return texts
+
+
+class NaiveBM25:
+    """BM25 com dicionários e loops em Python (linha de base)"""
+
+    def __init__(self, texts, k1=1.5, b=0.75):
+        self.k1, self.b = k1, b
+        self.postings = defaultdict(list)
+        self.lengths = []
+        for doc, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((doc, tf))
+        self.avg_length = sum(self.lengths) / len(self.lengths)
+
+    def search(self, query, limit):
+        n_docs = len(self.lengths)
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term, [])
+            idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[doc] / self.avg_length)
+                scores[doc] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return sorted(scores.items(), key=lambda item: -item[1])[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência do índice BM25")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--corpus-dir", default="conteudo_ficticio")
+    parser.add_argument("--skip-naive", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    sentences = load_sentences(args.corpus_dir)
+    rows = []
+
+    for size in args.sizes:
+        rng = random.Random(args.seed)
+        texts = build_corpus(sentences, size, rng)
+        ids = [str(i) for i in range(size)]
+        queries = [
+            f"{' '.join(rng.choice(sentences).split()[:4])} POL-{rng.randrange(size):05d}"
+            for _ in range(args.queries)
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            index = BM25Index(directory)
+            with Timer() as build:
+                index.add(ids, texts, [""] * size)
+                index.search("aquecimento", 1)
+
+            latencies, results = [], []
+            for query in queries:
+                start = time.perf_counter()
+                results.append([doc_id for doc_id, _ in index.search(query, args.k)])
+                latencies.append(time.perf_counter() - start)
+            rows.append({"docs": size, "engine": "bm25_sparse", "build_s": round(build.elapsed, 2),
+                         **latency_summary(latencies)})
+
+            # Fusão RRF com um ranking denso simulado do mesmo tamanho
+            fusion_latencies = []
+            for ranking in results:
+                dense = rng.sample(ids, args.k)
+                start = time.perf_counter()
+                reciprocal_rank_fusion([dense, ranking])
+                fusion_latencies.append(time.perf_counter() - start)
+            rows.append({"docs": size, "engine": "rrf_fusion", "build_s": "-",
+                         **latency_summary(fusion_latencies)})
+
+        if not args.skip_naive:
+            with Timer() as build:
+                naive = NaiveBM25(texts)
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                naive.search(query, args.k)
+                latencies.append(time.perf_counter() - start)
+            rows.append({"docs": size, "engine": "bm25_python", "build_s": round(build.elapsed, 2),
+                         **latency_summary(latencies)})
+
+        for row in rows[-3:]:
+            print(f"docs={size} {row['engine']}: p50={row['p50_ms']}ms p99={row['p99_ms']}ms")
+
+    print()
+    print_table(rows, ["docs", "engine", "build_s", "p50_ms", "p95_ms", "p99_ms"])
+
+    path = save_results("bm25_latency", {"k": args.k, "queries": args.queries, "results": rows})
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
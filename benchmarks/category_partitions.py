@@ -0,0 +1,155 @@
+"""
+Benchmark: coleção global com filtro `where` x partições por categoria
+
+Para cada número de categorias constrói:
+- uma coleção global com metadado `category` (comportamento original)
+- uma coleção por categoria (CATEGORY_PARTITIONING=true)
+
+e mede a latência de consultas filtradas (where na global x partição direta)
+e não filtradas (global x fan-out em todas as partições + merge).
+
+Uso:
+    python -m benchmarks.category_partitions --n-docs 20000 --categories 2 5 10 20 50
+"""
+
+import argparse
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import chromadb
+import numpy as np
+
+from app.services.vector_service import build_hnsw_metadata
+from benchmarks.common import (
+    exact_top_k, latency_summary, print_table, recall_at_k,
+    save_results, synthetic_embeddings, synthetic_queries
+)
+
+
+def create_collection(client, vectors, ids, metadatas, batch_size=5000):
+    collection = client.create_collection(
+        name=f"partition-bench-{uuid.uuid4().hex[:8]}",
+        metadata=build_hnsw_metadata("cosine"),
+        embedding_function=None
+    )
+    for start in range(0, len(ids), batch_size):
+        end = start + batch_size
+        collection.add(
+            ids=ids[start:end],
+            embeddings=vectors[start:end].tolist(),
+            metadatas=metadatas[start:end] if metadatas else None
+        )
+    return collection
+
+
+def timed_queries(run, queries):
+    results, latencies = [], []
+    for i, query in enumerate(queries):
+        start = time.perf_counter()
+        results.append(run(i, query))
+        latencies.append(time.perf_counter() - start)
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência de consultas filtradas por categoria")
+    parser.add_argument("--n-docs", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--categories", type=int, nargs="+", default=[2, 5, 10, 20, 50])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = synthetic_embeddings(args.n_docs, dim=args.dim, seed=args.seed)
+    queries = synthetic_queries(corpus, args.queries, seed=args.seed + 1)
+    ids = [str(i) for i in range(len(corpus))]
+    rng = np.random.default_rng(args.seed)
+    client = chromadb.EphemeralClient()
+
+    rows = []
+    for n_categories in args.categories:
+        labels = rng.integers(0, n_categories, size=len(corpus))
+        query_labels = rng.integers(0, n_categories, size=len(queries))
+
+        global_collection = create_collection(
+            client, corpus, ids, [{"category": f"cat{label}"} for label in labels]
+        )
+        partitions = {}
+        partition_ids = {}
+        for label in range(n_categories):
+            rows_in_category = np.flatnonzero(labels == label)
+            partition_ids[label] = rows_in_category
+            partitions[label] = create_collection(
+                client, corpus[rows_in_category], [ids[i] for i in rows_in_category], None
+            )
+
+        # Referência exata da consulta filtrada
+        exact_filtered = []
+        for query, label in zip(queries, query_labels):
+            members = partition_ids[label]
+            top = exact_top_k(corpus[members], query[None, :], min(args.k, len(members)))[0]
+            exact_filtered.append([ids[members[i]] for i in top])
+
+        def global_filtered(i, query):
+            result = global_collection.query(
+                query_embeddings=[query.tolist()], n_results=args.k,
+                where={"category": f"cat{query_labels[i]}"}, include=[]
+            )
+            return result["ids"][0]
+
+        def partition_filtered(i, query):
+            result = partitions[query_labels[i]].query(
+                query_embeddings=[query.tolist()], n_results=args.k, include=[]
+            )
+            return result["ids"][0]
+
+        def global_unfiltered(i, query):
+            return global_collection.query(query_embeddings=[query.tolist()], n_results=args.k, include=[])["ids"][0]
+
+        executor = ThreadPoolExecutor(max_workers=min(n_categories, 8))
+
+        def fan_out(i, query):
+            merged = []
+            for result in executor.map(
+                lambda p: p.query(query_embeddings=[query.tolist()], n_results=args.k, include=["distances"]),
+                partitions.values()
+            ):
+                merged.extend(zip(result["distances"][0], result["ids"][0]))
+            return [doc_id for _, doc_id in sorted(merged)[:args.k]]
+
+        for strategy, run, reference in [
+            ("global_where", global_filtered, exact_filtered),
+            ("partition", partition_filtered, exact_filtered),
+            ("global_unfiltered", global_unfiltered, None),
+            ("partition_fan_out", fan_out, None),
+        ]:
+            results, latencies = timed_queries(run, queries)
+            rows.append({
+                "categories": n_categories,
+                "strategy": strategy,
+                f"recall@{args.k}": round(recall_at_k(results, reference, args.k), 4) if reference else "-",
+                **latency_summary(latencies)
+            })
+            print(f"categorias={n_categories} {strategy}: p50={rows[-1]['p50_ms']}ms p99={rows[-1]['p99_ms']}ms")
+
+        executor.shutdown()
+        client.delete_collection(global_collection.name)
+        for partition in partitions.values():
+            client.delete_collection(partition.name)
+
+    print()
+    print_table(rows, ["categories", "strategy", f"recall@{args.k}", "p50_ms", "p95_ms", "p99_ms"])
+
+    path = save_results("category_partitions", {
+        "corpus_size": len(corpus),
+        "dim": args.dim,
+        "k": args.k,
+        "results": rows
+    })
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
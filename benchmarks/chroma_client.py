@@ -0,0 +1,151 @@
+"""
+Benchmark: Chroma local (PersistentClient) vs. servidor Chroma via HTTP
+
+Sobe um servidor `chroma run` local (ou usa --host/--port de um já em
+execução), carrega o mesmo corpus sintético nos dois modos e compara:
+
+- local: PersistentClient no mesmo processo (modo padrão da API)
+- http-default: chromadb.HttpClient sem ajustes (sem timeout nem retry)
+- http-no-keepalive: HttpClient abrindo uma conexão TCP por requisição
+- http-pooled: cliente da API (create_http_client: keep-alive, timeouts, retry)
+
+Métricas reportadas:
+- latência p50/p95/p99 de query (uma thread)
+- vazão de queries com várias threads concorrentes (réplicas/requisições simultâneas)
+- tempo de carga (upsert em lotes)
+
+Uso:
+    python -m benchmarks.chroma_client --n 20000 --threads 1 8
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import chromadb
+import httpx
+from chromadb.config import Settings as ChromaSettings
+
+from app.services.chroma_client import create_http_client
+from app.services.vector_service import build_hnsw_metadata
+from benchmarks.common import (
+    Timer, latency_summary, print_table, save_results, synthetic_embeddings, synthetic_queries
+)
+
+
+def start_server(port: int, directory: str) -> subprocess.Popen:
+    process = subprocess.Popen(
+        ["chroma", "run", "--path", directory, "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://localhost:{port}/api/v2/heartbeat", timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.5)
+    process.terminate()
+    raise RuntimeError(f"Servidor Chroma não respondeu na porta {port}")
+
+
+def build_clients(host: str, port: int, local_directory: str):
+    return {
+        "local": chromadb.PersistentClient(path=local_directory),
+        "http-default": chromadb.HttpClient(host=host, port=port, settings=ChromaSettings(anonymized_telemetry=False)),
+        "http-no-keepalive": chromadb.HttpClient(
+            host=host, port=port,
+            settings=ChromaSettings(anonymized_telemetry=False, chroma_http_max_keepalive_connections=0)
+        ),
+        "http-pooled": create_http_client(host, port)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chroma local vs. servidor HTTP")
+    parser.add_argument("--n", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=None, help="Servidor já em execução (senão sobe um local)")
+    args = parser.parse_args()
+
+    corpus = synthetic_embeddings(args.n, dim=args.dim)
+    queries = synthetic_queries(corpus, args.queries)
+    ids = [f"doc-{i}" for i in range(args.n)]
+    metadatas = [{"category": f"cat-{i % 10}"} for i in range(args.n)]
+
+    work_directory = tempfile.mkdtemp()
+    server = None
+    port = args.port
+    if port is None:
+        port = 8799
+        server = start_server(port, os.path.join(work_directory, "server"))
+
+    rows = []
+    try:
+        clients = build_clients(args.host, port, os.path.join(work_directory, "local"))
+        for name, client in clients.items():
+            # Um corpus por cliente HTTP: nenhum modo se beneficia do cache do anterior
+            collection_name = f"bench-{name}"
+            try:
+                client.delete_collection(collection_name)
+            except Exception:
+                pass
+            collection = client.create_collection(collection_name, metadata=build_hnsw_metadata("cosine"))
+
+            with Timer() as ingestion:
+                for start in range(0, args.n, args.batch_size):
+                    end = min(start + args.batch_size, args.n)
+                    collection.upsert(
+                        ids=ids[start:end], embeddings=corpus[start:end].tolist(), metadatas=metadatas[start:end]
+                    )
+
+            def query(vector):
+                begin = time.perf_counter()
+                collection.query(query_embeddings=[vector.tolist()], n_results=args.k)
+                return time.perf_counter() - begin
+
+            for vector in queries[:20]:
+                query(vector)
+
+            for threads in args.threads:
+                with Timer() as elapsed:
+                    with ThreadPoolExecutor(max_workers=threads) as executor:
+                        latencies = list(executor.map(query, queries))
+                rows.append({
+                    "client": name,
+                    "threads": threads,
+                    "qps": round(len(queries) / elapsed.elapsed, 1),
+                    "ingest_s": round(ingestion.elapsed, 2),
+                    **latency_summary(latencies)
+                })
+                print(f"{name} threads={threads}: p50={rows[-1]['p50_ms']}ms qps={rows[-1]['qps']}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+        shutil.rmtree(work_directory, ignore_errors=True)
+
+    print()
+    print_table(rows, ["client", "threads", "qps", "p50_ms", "p95_ms", "p99_ms", "ingest_s"])
+
+    path = save_results("chroma_client", {
+        "n": args.n,
+        "dim": args.dim,
+        "k": args.k,
+        "queries": args.queries,
+        "results": rows
+    })
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Utilitários compartilhados pelos benchmarks
+
+- Geração de embeddings sintéticos (clusters normalizados, como os do MiniLM)
+- Busca exata (força bruta) para servir de referência de recall
+- Estatísticas de latência (p50/p95/p99)
+- Persistência dos resultados em JSON
+- Processos auxiliares (servidor LLM falso, API) com espera pela prontidão
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+
+
+def synthetic_embeddings(
+    n: int,
+    dim: int = 384,
+    n_clusters: int = 20,
+    spread: float = 0.35,
+    seed: int = 42
+) -> np.ndarray:
+    """Gera n vetores normalizados agrupados em clusters (aproxima a distribuição real de chunks)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, n_clusters, size=n)
+    vectors = centers[labels] + spread * rng.standard_normal((n, dim)).astype(np.float32)
+    return normalize(vectors)
+
+
+def synthetic_queries(corpus: np.ndarray, n_queries: int, noise: float = 0.3, seed: int = 7) -> np.ndarray:
+    """Gera consultas perturbando vetores do corpus (cada consulta tem vizinhos reais)"""
+    rng = np.random.default_rng(seed)
+    base = corpus[rng.integers(0, len(corpus), size=n_queries)]
+    queries = base + noise * rng.standard_normal(base.shape).astype(np.float32) / np.sqrt(corpus.shape[1])
+    return normalize(queries)
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Top-k exato por similaridade de cosseno (vetores já normalizados)"""
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, kth=min(k, scores.shape[1] - 1), axis=1)[:, :k]
+    order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(top, order, axis=1)
+
+
+def recall_at_k(approx: Sequence[Sequence[Any]], exact: Sequence[Sequence[Any]], k: int) -> float:
+    """Média de |aproximado ∩ exato| / k sobre todas as consultas"""
+    if not exact:
+        return 0.0
+    hits = [len(set(list(a)[:k]) & set(list(e)[:k])) / k for a, e in zip(approx, exact)]
+    return float(np.mean(hits))
+
+
+def latency_summary(latencies_s: List[float]) -> Dict[str, float]:
+    """Resumo de latências em milissegundos"""
+    if not latencies_s:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    values = np.asarray(latencies_s) * 1000
+    return {
+        "count": int(len(values)),
+        "mean_ms": round(float(values.mean()), 3),
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3)
+    }
+
+
+class Timer:
+    """Cronômetro simples: `with Timer() as t: ...` e depois `t.elapsed`"""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]) -> None:
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+def save_results(name: str, payload: Dict[str, Any], output_dir: str = "benchmarks/results") -> str:
+    """Salva os resultados como JSON com timestamp e retorna o caminho do arquivo"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def start_service(
+    command: List[str],
+    ready_url: str,
+    env: Optional[Dict[str, str]] = None,
+    timeout: float = 30.0,
+    log_path: Optional[str] = None
+) -> subprocess.Popen:
+    """Inicia um processo e espera `ready_url` responder (qualquer status HTTP)"""
+    log = open(log_path, "w") if log_path else subprocess.DEVNULL
+    process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, env=env)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            httpx.get(ready_url, timeout=1.0)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    detail = f" (log em {log_path})" if log_path else ""
+    raise RuntimeError(f"{' '.join(command)} não respondeu em {ready_url}{detail}")
+
+
+def start_fake_llm(port: int, *extra_args: str) -> subprocess.Popen:
+    """Sobe benchmarks.fake_openai_server na porta indicada"""
+    return start_service(
+        [sys.executable, "-m", "benchmarks.fake_openai_server", "--port", str(port), *extra_args],
+        f"http://127.0.0.1:{port}/stats"
+    )
@@ -0,0 +1,234 @@
+"""
+Servidor local compatível com a API da OpenAI, para testes sem cota
+
+Responde POST /v1/chat/completions no formato da OpenAI (o ChatOpenAI do
+LangChain aponta para ele via base_url ou LLM_PROVIDER=fake) e injeta
+latência e erros:
+
+- --latency-dist: distribuição do tempo até o primeiro token
+  (constant, normal, lognormal ou exponential) com média --latency-ms;
+  --jitter-ms é o desvio da normal e --sigma o da lognormal
+- --tokens-per-second / --completion-tokens: ritmo de geração e tamanho da
+  resposta (0 tokens/s = resposta inteira junto com o primeiro token)
+- --slow-rate / --slow-ms: fração das respostas que demora muito mais (cauda)
+- --error-rate: fração das respostas que volta HTTP 500
+
+Com "stream": true a resposta sai em Server-Sent Events (chat.completion.chunk),
+um token por evento, no ritmo configurado; com stream_options.include_usage o
+último evento traz o uso de tokens, como na API real.
+
+Também responde POST /v1/embeddings (vetores determinísticos por texto, usados
+pelo RAGAS) e GET /v1/models.
+
+Os parâmetros podem ser trocados com o servidor rodando (cenários de falha):
+
+    curl -X POST localhost:8900/control -H "Content-Type: application/json" -d '{"error_rate": 1.0}'
+
+GET /stats retorna quantas requisições chegaram (para medir o custo do hedging).
+
+Uso:
+    python -m benchmarks.fake_openai_server --port 8900 --latency-ms 200 --slow-rate 0.02 --slow-ms 3000
+    python -m benchmarks.fake_openai_server --latency-dist lognormal --sigma 0.6 --tokens-per-second 50 --completion-tokens 120
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import uuid
+from typing import Any, Dict, List
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+LATENCY_DISTRIBUTIONS = ("constant", "normal", "lognormal", "exponential")
+
+
+def sample_latency_ms(config: Dict[str, Any]) -> float:
+    """Tempo até o primeiro token, sorteado da distribuição configurada"""
+    mean = config["latency_ms"]
+    distribution = config["latency_dist"]
+    if mean <= 0 or distribution == "constant":
+        return max(mean, 0.0)
+    if distribution == "normal":
+        return max(random.gauss(mean, config["jitter_ms"]), 0.0)
+    if distribution == "lognormal":
+        # mu ajustado para que a média da lognormal seja latency_ms
+        sigma = config["sigma"]
+        return random.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+    return random.expovariate(1.0 / mean)
+
+
+def completion_words(question: str, completion_tokens: int) -> List[str]:
+    """Resposta simulada, completada com palavras até `completion_tokens` (1 palavra = 1 token)"""
+    words = f"Resposta simulada para: {question[:80]}".split()
+    while len(words) < completion_tokens:
+        words.append(f"token{len(words)}")
+    return words
+
+
+def fake_embedding(text: str, dimensions: int) -> List[float]:
+    """Vetor unitário determinístico: o mesmo texto sempre gera o mesmo embedding"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).round(6).tolist()
+
+
+def create_app(config: Dict[str, Any]) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI")
+    counters = {"requests": 0, "errors": 0, "slow": 0, "streamed": 0, "embeddings": 0}
+
+    def error_response() -> JSONResponse:
+        counters["errors"] += 1
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "falha injetada", "type": "server_error", "code": None}}
+        )
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(body: Dict[str, Any]):
+        counters["requests"] += 1
+        delay = sample_latency_ms(config)
+        if random.random() < config["slow_rate"]:
+            counters["slow"] += 1
+            delay = config["slow_ms"]
+        await asyncio.sleep(delay / 1000)
+
+        if random.random() < config["error_rate"]:
+            return error_response()
+
+        messages = body.get("messages", [])
+        question = messages[-1]["content"] if messages else ""
+        words = completion_words(str(question), int(config["completion_tokens"]))
+        prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(words),
+            "total_tokens": prompt_tokens + len(words)
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "fake")
+        token_interval = 1.0 / config["tokens_per_second"] if config["tokens_per_second"] > 0 else 0.0
+
+        if body.get("stream"):
+            counters["streamed"] += 1
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                stream_chunks(completion_id, model, words, usage, token_interval, include_usage),
+                media_type="text/event-stream"
+            )
+
+        await asyncio.sleep(token_interval * len(words))
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": " ".join(words)},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    async def stream_chunks(completion_id: str, model: str, words: List[str], usage: Dict[str, int],
+                            token_interval: float, include_usage: bool):
+        def event(delta: Dict[str, Any], finish_reason=None, chunk_usage=None) -> str:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}] if delta is not None else [],
+                "usage": chunk_usage
+            }
+            return f"data: {json.dumps(chunk)}\n\n"
+
+        yield event({"role": "assistant", "content": ""})
+        for position, word in enumerate(words):
+            if position and token_interval:
+                await asyncio.sleep(token_interval)
+            yield event({"content": word if position == 0 else f" {word}"})
+        yield event({}, finish_reason="stop")
+        if include_usage:
+            yield event(None, chunk_usage=usage)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/embeddings")
+    async def embeddings(body: Dict[str, Any]):
+        counters["embeddings"] += 1
+        texts = body.get("input", [])
+        if isinstance(texts, str):
+            texts = [texts]
+        dimensions = int(body.get("dimensions") or config["embedding_dim"])
+        data = [
+            {"object": "embedding", "index": index, "embedding": fake_embedding(str(text), dimensions)}
+            for index, text in enumerate(texts)
+        ]
+        tokens = sum(len(str(text)) for text in texts) // 4
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+        }
+
+    @app.get("/v1/models")
+    async def models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "benchmarks"}]}
+
+    @app.post("/control")
+    async def control(changes: Dict[str, Any]):
+        for key, value in changes.items():
+            if key == "latency_dist" and value not in LATENCY_DISTRIBUTIONS:
+                return JSONResponse(status_code=400, content={"error": f"latency_dist inválida: {value}"})
+            if key in config:
+                config[key] = type(config[key])(value)
+        return config
+
+    @app.get("/stats")
+    async def stats():
+        return {**counters, "config": config}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor OpenAI falso com latência, streaming e erros injetados")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="normal")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=20.0)
+    parser.add_argument("--sigma", type=float, default=0.5)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--completion-tokens", type=int, default=0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=3000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--embedding-dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    config = {
+        "latency_dist": args.latency_dist,
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "sigma": args.sigma,
+        "tokens_per_second": args.tokens_per_second,
+        "completion_tokens": args.completion_tokens,
+        "slow_rate": args.slow_rate,
+        "slow_ms": args.slow_ms,
+        "error_rate": args.error_rate,
+        "embedding_dim": args.embedding_dim
+    }
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
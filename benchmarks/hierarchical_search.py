@@ -0,0 +1,177 @@
+"""
+Benchmark: busca hierárquica documento → chunk vs. busca plana
+
+Gera um corpus sintético de documentos com vários chunks cada (chunks de um
+mesmo documento são vizinhos entre si, como no corpus real) e compara:
+
+- flat: top-k chunks sobre a coleção inteira
+- hierarchical: top documentos no índice de documentos (título + categoria +
+  resumo) e busca de chunks restrita a eles, com no máximo
+  `--chunks-per-result-doc` chunks por documento
+
+Métricas reportadas:
+- latência p50/p95/p99 por consulta
+- recall@k contra a busca exata de chunks
+- documentos distintos no top-k (redundância de chunks vizinhos)
+- taxa em que o documento de origem da consulta está no resultado
+
+Uso:
+    python -m benchmarks.hierarchical_search --docs 1000 5000 --chunks-per-doc 8
+"""
+
+import argparse
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+from app.services.document_index import DocumentIndex
+from app.services.vector_service import build_hnsw_metadata
+from benchmarks.common import (
+    Timer, exact_top_k, latency_summary, normalize, print_table, recall_at_k, save_results
+)
+
+
+def build_corpus(n_docs: int, chunks_per_doc: int, dim: int, n_categories: int, seed: int):
+    """Centro por categoria → centro por documento → chunks do documento"""
+    rng = np.random.default_rng(seed)
+
+    def noise(n, scale):
+        return scale * rng.standard_normal((n, dim)).astype(np.float32) / np.sqrt(dim)
+
+    category_centers = normalize(rng.standard_normal((n_categories, dim)).astype(np.float32))
+    doc_categories = rng.integers(0, n_categories, size=n_docs)
+    doc_centers = normalize(category_centers[doc_categories] + noise(n_docs, 1.2))
+    titles = normalize(doc_centers + noise(n_docs, 0.6))
+
+    chunk_docs = np.repeat(np.arange(n_docs), chunks_per_doc)
+    chunks = normalize(doc_centers[chunk_docs] + noise(len(chunk_docs), 0.7))
+    return chunks, chunk_docs, doc_categories, titles, category_centers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca hierárquica vs. busca plana")
+    parser.add_argument("--docs", type=int, nargs="+", default=[1000, 5000])
+    parser.add_argument("--chunks-per-doc", type=int, default=8)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--top-documents", type=int, default=10)
+    parser.add_argument("--chunks-per-result-doc", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = []
+    for n_docs in args.docs:
+        chunks, chunk_docs, doc_categories, titles, category_vectors = build_corpus(
+            n_docs, args.chunks_per_doc, args.dim, args.categories, args.seed
+        )
+        rng = np.random.default_rng(args.seed + 1)
+        picked = rng.integers(0, len(chunks), size=args.queries)
+        queries = normalize(
+            chunks[picked] + 0.4 * rng.standard_normal((args.queries, args.dim)).astype(np.float32) / np.sqrt(args.dim)
+        )
+        exact = exact_top_k(chunks, queries, args.k).tolist()
+
+        # Vetores de título/categoria "codificados" a partir dos textos sintéticos
+        lookup = {f"doc-{i}": titles[i] for i in range(n_docs)}
+        lookup.update({f"cat-{i}": category_vectors[i] for i in range(args.categories)})
+
+        with tempfile.TemporaryDirectory() as directory:
+            client = chromadb.PersistentClient(path=directory)
+            metadata = build_hnsw_metadata("cosine")
+            collection = client.get_or_create_collection("chunks", metadata=metadata)
+            index = DocumentIndex(
+                client.get_or_create_collection("chunks__docs", metadata=metadata),
+                encode=lambda texts: [lookup[text].tolist() for text in texts]
+            )
+
+            with Timer() as ingestion:
+                for start in range(0, len(chunks), args.batch_size):
+                    end = min(start + args.batch_size, len(chunks))
+                    collection.add(
+                        ids=[str(i) for i in range(start, end)],
+                        embeddings=chunks[start:end].tolist(),
+                        metadatas=[
+                            {"source_file": f"doc-{chunk_docs[i]}", "category": f"cat-{doc_categories[chunk_docs[i]]}"}
+                            for i in range(start, end)
+                        ]
+                    )
+                for doc in range(n_docs):
+                    rows_of_doc = range(doc * args.chunks_per_doc, (doc + 1) * args.chunks_per_doc)
+                    index.add(
+                        f"doc-{doc}", f"doc-{doc}", f"cat-{doc_categories[doc]}",
+                        [str(i) for i in rows_of_doc], chunks[rows_of_doc.start:rows_of_doc.stop].tolist()
+                    )
+                index.flush()
+
+            def flat(query):
+                result = collection.query(query_embeddings=[query.tolist()], n_results=args.k, include=["metadatas"])
+                return result["ids"][0], [m["source_file"] for m in result["metadatas"][0]]
+
+            def hierarchical(query):
+                # Mesmo caminho do VectorService: top documentos → chunks por id → re-pontuação exata
+                selected = index.search(query.tolist(), args.top_documents)
+                stored = collection.get(
+                    ids=[chunk_id for _, ids in selected for chunk_id in ids],
+                    include=["embeddings", "metadatas"]
+                )
+                scores = np.asarray(stored["embeddings"], dtype=np.float32) @ query
+                ids, sources, taken = [], [], {}
+                for position in np.argsort(-scores):
+                    source = stored["metadatas"][position]["source_file"]
+                    if taken.get(source, 0) >= args.chunks_per_result_doc:
+                        continue
+                    taken[source] = taken.get(source, 0) + 1
+                    ids.append(stored["ids"][position])
+                    sources.append(source)
+                    if len(ids) == args.k:
+                        break
+                return ids, sources
+
+            for name, search in (("flat", flat), ("hierarchical", hierarchical)):
+                for query in queries[:20]:
+                    search(query)
+
+                latencies, results, distinct, source_hits = [], [], [], []
+                for query, chunk in zip(queries, picked):
+                    start = time.perf_counter()
+                    ids, sources = search(query)
+                    latencies.append(time.perf_counter() - start)
+                    results.append([int(doc_id) for doc_id in ids])
+                    distinct.append(len(set(sources)))
+                    source_hits.append(f"doc-{chunk_docs[chunk]}" in sources)
+
+                rows.append({
+                    "docs": n_docs,
+                    "chunks": len(chunks),
+                    "mode": name,
+                    f"recall@{args.k}": round(recall_at_k(results, exact, args.k), 4),
+                    "distinct_docs": round(float(np.mean(distinct)), 2),
+                    "source_doc_hit": round(float(np.mean(source_hits)), 4),
+                    "ingest_s": round(ingestion.elapsed, 2),
+                    **latency_summary(latencies)
+                })
+                print(f"docs={n_docs} {name}: p50={rows[-1]['p50_ms']}ms "
+                      f"recall@{args.k}={rows[-1][f'recall@{args.k}']} distintos={rows[-1]['distinct_docs']}")
+
+    print()
+    print_table(rows, ["docs", "chunks", "mode", f"recall@{args.k}", "distinct_docs",
+                       "source_doc_hit", "p50_ms", "p95_ms", "p99_ms"])
+
+    path = save_results("hierarchical_search", {
+        "dim": args.dim,
+        "k": args.k,
+        "chunks_per_doc": args.chunks_per_doc,
+        "top_documents": args.top_documents,
+        "chunks_per_result_doc": args.chunks_per_result_doc,
+        "results": rows
+    })
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
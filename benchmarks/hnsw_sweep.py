@@ -0,0 +1,127 @@
+"""
+Benchmark: varredura dos parâmetros HNSW da coleção Chroma
+
+Para cada combinação (M, construction_ef, search_ef) constrói uma coleção
+efêmera com distância de cosseno, executa as consultas e compara o resultado
+com a busca exata (força bruta em numpy).
+
+Métricas reportadas:
+- recall@k contra a busca exata
+- latência p50/p99 por consulta
+- tempo de construção do índice
+
+Uso:
+    python -m benchmarks.hnsw_sweep --n-docs 20000 --queries 200 --k 5
+    python -m benchmarks.hnsw_sweep --from-collection   # usa os embeddings reais do chroma_data
+"""
+
+import argparse
+import itertools
+import time
+import uuid
+
+import chromadb
+import numpy as np
+
+from app.core.config import settings
+from app.services.vector_service import build_hnsw_metadata
+from benchmarks.common import (
+    Timer, exact_top_k, latency_summary, normalize, print_table, recall_at_k,
+    save_results, synthetic_embeddings, synthetic_queries
+)
+
+
+def load_collection_embeddings() -> np.ndarray:
+    client = chromadb.PersistentClient(path=settings.chroma_persist_directory)
+    collection = client.get_collection(settings.chroma_collection_name)
+    data = collection.get(include=["embeddings"])
+    return normalize(np.asarray(data["embeddings"], dtype=np.float32))
+
+
+def build_collection(client, corpus: np.ndarray, m: int, construction_ef: int, search_ef: int, batch_size: int):
+    collection = client.create_collection(
+        name=f"hnsw-sweep-{uuid.uuid4().hex[:8]}",
+        metadata=build_hnsw_metadata("cosine", m, construction_ef, search_ef),
+        embedding_function=None
+    )
+    for start in range(0, len(corpus), batch_size):
+        batch = corpus[start:start + batch_size]
+        collection.add(
+            ids=[str(i) for i in range(start, start + len(batch))],
+            embeddings=batch.tolist()
+        )
+    return collection
+
+
+def run_config(client, corpus, queries, exact, k, m, construction_ef, search_ef, batch_size):
+    with Timer() as build:
+        collection = build_collection(client, corpus, m, construction_ef, search_ef, batch_size)
+
+    approx = []
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append(time.perf_counter() - start)
+        approx.append([int(i) for i in result["ids"][0]])
+
+    client.delete_collection(collection.name)
+
+    return {
+        "M": m,
+        "construction_ef": construction_ef,
+        "search_ef": search_ef,
+        f"recall@{k}": round(recall_at_k(approx, exact.tolist(), k), 4),
+        "build_s": round(build.elapsed, 2),
+        **latency_summary(latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Varredura de parâmetros HNSW (recall@k x latência)")
+    parser.add_argument("--n-docs", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--m", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--construction-ef", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--search-ef", type=int, nargs="+", default=[16, 64, 128])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--from-collection", action="store_true",
+                        help="Usa os embeddings da coleção configurada em vez de dados sintéticos")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if args.from_collection:
+        corpus = load_collection_embeddings()
+    else:
+        corpus = synthetic_embeddings(args.n_docs, dim=args.dim, seed=args.seed)
+    queries = synthetic_queries(corpus, args.queries, seed=args.seed + 1)
+    k = min(args.k, len(corpus))
+    exact = exact_top_k(corpus, queries, k)
+
+    print(f"Corpus: {len(corpus)} vetores x {corpus.shape[1]} dims | {len(queries)} consultas | k={k}")
+
+    client = chromadb.EphemeralClient()
+    rows = []
+    for m, construction_ef, search_ef in itertools.product(args.m, args.construction_ef, args.search_ef):
+        row = run_config(client, corpus, queries, exact, k, m, construction_ef, search_ef, args.batch_size)
+        rows.append(row)
+        print(f"M={m} construction_ef={construction_ef} search_ef={search_ef} -> "
+              f"recall@{k}={row[f'recall@{k}']} p50={row['p50_ms']}ms p99={row['p99_ms']}ms")
+
+    print()
+    print_table(rows, ["M", "construction_ef", "search_ef", f"recall@{k}", "p50_ms", "p99_ms", "build_s"])
+
+    path = save_results("hnsw_sweep", {
+        "corpus_size": len(corpus),
+        "dim": int(corpus.shape[1]),
+        "queries": len(queries),
+        "k": k,
+        "results": rows
+    })
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Benchmark: prazo, hedging e disjuntor do cliente do LLM
+
+Sobe o servidor OpenAI falso (benchmarks.fake_openai_server) e chama-o com
+o ChatOpenAI do LangChain através do ResilientCaller da API, em três cenários:
+
+- tail: respostas com cauda lenta (slow-rate); compara sem hedging vs. hedging
+  no percentil configurado (p99 e chamadas extras ao provedor)
+- deadline: cauda muito lenta; o prazo por chamada limita o p99
+- outage: provedor devolvendo 500 em todas as chamadas; compara a latência
+  das falhas e as requisições enviadas com e sem disjuntor
+
+Uso:
+    python -m benchmarks.llm_resilience --calls 300 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from app.services.llm_resilience import CircuitBreaker, ResilientCaller
+from benchmarks.common import latency_summary, print_table, save_results, start_fake_llm
+
+
+def control(port: int, **changes) -> None:
+    httpx.post(f"http://127.0.0.1:{port}/control", json=changes, timeout=5.0)
+
+
+def upstream_requests(port: int) -> int:
+    return httpx.get(f"http://127.0.0.1:{port}/stats", timeout=5.0).json()["requests"]
+
+
+async def run_calls(llm: ChatOpenAI, caller: ResilientCaller, calls: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, failures = [], {}
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await caller.call(lambda: llm.ainvoke(f"Pergunta {i}"))
+            except Exception as e:
+                code = getattr(e, "error_code", type(e).__name__)
+                failures[code] = failures.get(code, 0) + 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    return latencies, failures
+
+
+async def measure(name: str, port: int, llm: ChatOpenAI, caller: ResilientCaller, calls: int, concurrency: int) -> dict:
+    before = upstream_requests(port)
+    latencies, failures = await run_calls(llm, caller, calls, concurrency)
+    sent = upstream_requests(port) - before
+    stats = caller.stats()
+    row = {
+        "scenario": name,
+        "calls": calls,
+        "upstream_requests": sent,
+        "extra_pct": round(100 * (sent - calls) / calls, 1),
+        "hedged": stats["hedged"],
+        "hedge_wins": stats["hedge_wins"],
+        "failures": sum(failures.values()),
+        "failure_codes": failures,
+        "breaker_opened": stats["circuit_breaker"]["times_opened"],
+        **latency_summary(latencies)
+    }
+    print(f"{name}: p50={row['p50_ms']}ms p99={row['p99_ms']}ms upstream={sent} falhas={failures}")
+    return row
+
+
+async def run_scenarios(args) -> list:
+    # Sem retries do cliente: cada falha é uma requisição, o efeito medido é só do ResilientCaller.
+    # Um único loop de eventos: o cliente httpx assíncrono do ChatOpenAI fica preso ao loop em que foi criado
+    llm = ChatOpenAI(
+        model="gpt-3.5-turbo", api_key="fake", base_url=f"http://127.0.0.1:{args.port}/v1",
+        max_retries=0, timeout=30
+    )
+    port, calls, concurrency = args.port, args.calls, args.concurrency
+    rows = []
+    await run_calls(llm, ResilientCaller(), 20, concurrency)  # aquecimento
+
+    control(port, slow_rate=args.slow_rate, slow_ms=args.slow_ms, error_rate=0.0)
+    rows.append(await measure("tail/sem-hedging", port, llm, ResilientCaller(deadline=30), calls, concurrency))
+    rows.append(await measure(
+        f"tail/hedge-p{args.hedge_percentile:g}", port, llm,
+        ResilientCaller(deadline=30, hedge_percentile=args.hedge_percentile),
+        calls, concurrency
+    ))
+
+    control(port, slow_ms=args.slow_ms * 4)
+    rows.append(await measure("deadline/sem-prazo", port, llm, ResilientCaller(deadline=30), calls, concurrency))
+    rows.append(await measure(
+        f"deadline/{args.deadline:g}s", port, llm,
+        ResilientCaller(deadline=args.deadline, breaker=CircuitBreaker(failure_threshold=10 ** 6)),
+        calls, concurrency
+    ))
+
+    control(port, slow_rate=0.0, error_rate=1.0)
+    rows.append(await measure(
+        "outage/sem-disjuntor", port, llm,
+        ResilientCaller(deadline=30, breaker=CircuitBreaker(failure_threshold=10 ** 6)),
+        calls, concurrency
+    ))
+    rows.append(await measure(
+        "outage/disjuntor", port, llm,
+        ResilientCaller(deadline=30, breaker=CircuitBreaker(failure_threshold=5, reset_timeout=30)),
+        calls, concurrency
+    ))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prazo, hedging e disjuntor contra um LLM falso")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-ms", type=float, default=1500.0)
+    parser.add_argument("--hedge-percentile", type=float, default=90.0)
+    parser.add_argument("--deadline", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = start_fake_llm(args.port, "--latency-ms", str(args.latency_ms))
+    try:
+        rows = asyncio.run(run_scenarios(args))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    print()
+    print_table(rows, ["scenario", "p50_ms", "p95_ms", "p99_ms", "upstream_requests", "extra_pct", "hedged", "failures"])
+
+    path = save_results("llm_resilience", {
+        "calls": args.calls,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "slow_rate": args.slow_rate,
+        "slow_ms": args.slow_ms,
+        "results": rows
+    })
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+"""
+Teste de carga ponta a ponta da API contra um LLM falso
+
+Sobe o servidor OpenAI falso (benchmarks.fake_openai_server) e a API
+(uvicorn main:app com LLM_PROVIDER=fake e dados em um diretório temporário)
+e exercita, nesta ordem:
+
+- load-documents: POST /api/v1/admin/load-documents (carga completa e
+  recargas incrementais)
+- ask: POST /api/v1/ask em cada nível de concorrência (clientes em laço
+  fechado), com perguntas sorteadas de conteudo_ficticio
+- evaluation: GET /evaluation/interactions, GET /evaluation/metrics/advanced
+  e POST /evaluation/ragas/evaluate
+
+Para /ask, além da latência HTTP, a latência é quebrada pelos estágios medidos
+pela própria API (stage_timings: embedding, search, compression, prompt,
+llm_queue, llm e db_save), mais llm_ttft (com LLM_STREAMING) e overhead (HTTP,
+serialização e o que não está em nenhum estágio). Contra uma API sem
+stage_timings, a quebra é llm (llm_metrics.total_ms), compression e
+retrieval_other (o restante).
+
+MISTURA DE PERGUNTAS (--mix, pesos):
+- sentence: uma frase de um documento virada pergunta
+- category: pergunta sobre a categoria, com category_filter
+- title: pedido de resumo de um documento pelo título
+- repeated: uma de poucas perguntas "quentes" (exercita caches e coalescência)
+
+Com --queries (consultas de um corpus de benchmarks.synthetic_corpus) as
+perguntas vêm do arquivo, e cada nível também mede hit_rate: a fração das
+respostas com algum documento relevante conhecido em search_results.
+
+Os resultados vão para benchmarks/results/load_test_<timestamp>.json com o
+commit atual; --baseline compara o p95 de cada estágio com outra execução.
+
+Uso:
+    python -m benchmarks.load_test --concurrency 1,4,16 --requests 200
+    python -m benchmarks.load_test --api-url http://localhost:8000 --skip-evaluation   # API já rodando
+    python -m benchmarks.load_test --documents-dir benchmarks/corpora/10k/documents --queries benchmarks/corpora/10k/queries.jsonl
+    python -m benchmarks.load_test --baseline benchmarks/results/load_test_20250101_120000.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import latency_summary, print_table, save_results, start_fake_llm, start_service
+from benchmarks.synthetic_corpus import load_queries
+
+DEFAULT_MIX = "sentence=0.5,category=0.2,title=0.1,repeated=0.2"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        kind, weight = part.split("=")
+        weights[kind.strip()] = float(weight)
+    unknown = set(weights) - {"sentence", "category", "title", "repeated"}
+    if unknown:
+        raise ValueError(f"Tipos de pergunta desconhecidos em --mix: {', '.join(sorted(unknown))}")
+    return weights
+
+
+def read_documents(directory: str) -> List[Dict[str, Any]]:
+    """Título, categoria e frases (sem as de ruído) de cada .txt do diretório"""
+    documents = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".txt"):
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            text = f.read()
+        title = re.search(r"^Título:\s*(.+)$", text, re.MULTILINE)
+        category = re.search(r"^Categoria:\s*(.+)$", text, re.MULTILINE)
+        body = re.sub(r"^(Título|Categoria):.*$", "", text, flags=re.MULTILINE)
+        sentences = [
+            sentence.strip() for sentence in re.split(r"(?<=[.!?])\s+|\n+", body)
+            if len(sentence.strip()) > 20 and "ruído" not in sentence.lower()
+        ]
+        documents.append({
+            "file": filename,
+            "title": title.group(1).strip() if title else filename,
+            "category": category.group(1).strip() if category else None,
+            "sentences": sentences
+        })
+    return documents
+
+
+def build_questions(documents: List[Dict[str, Any]], mix: Dict[str, float], count: int, seed: int) -> List[Dict[str, Any]]:
+    """Sorteia `count` perguntas (payloads de /ask) conforme a mistura; determinístico pela semente"""
+    rng = random.Random(seed)
+    categories = sorted({doc["category"] for doc in documents if doc["category"]})
+    with_sentences = [doc for doc in documents if doc["sentences"]]
+    hot = [
+        f"O que diz a documentação sobre {rng.choice(doc['sentences']).rstrip('.!?').lower()}?"
+        for doc in rng.sample(with_sentences, min(3, len(with_sentences)))
+    ]
+    kinds, weights = zip(*[(kind, weight) for kind, weight in mix.items() if weight > 0])
+
+    questions = []
+    for kind in rng.choices(kinds, weights=weights, k=count):
+        if kind == "sentence":
+            doc = rng.choice(with_sentences)
+            questions.append({"kind": kind, "question": rng.choice(doc["sentences"]).rstrip(".!?") + "?"})
+        elif kind == "category":
+            category = rng.choice(categories)
+            questions.append({
+                "kind": kind,
+                "question": f"Quais são as principais regras de {category}?",
+                "category_filter": category
+            })
+        elif kind == "title":
+            doc = rng.choice(documents)
+            questions.append({"kind": kind, "question": f"Resuma o conteúdo de {doc['title']}."})
+        else:
+            questions.append({"kind": kind, "question": rng.choice(hot)})
+    return questions
+
+
+def questions_from_file(path: str, count: int, seed: int) -> List[Dict[str, Any]]:
+    """Sorteia `count` perguntas de um queries.jsonl (com repetição se faltar), mantendo os relevantes"""
+    rng = random.Random(seed)
+    queries = load_queries(path)
+    questions = []
+    while len(questions) < count:
+        batch = list(queries)
+        rng.shuffle(batch)
+        questions.extend(
+            {
+                "kind": query["kind"],
+                "question": query["question"],
+                **({"category_filter": query["category_filter"]} if query.get("category_filter") else {}),
+                "relevant_titles": query["relevant_titles"]
+            }
+            for query in batch[:count - len(questions)]
+        )
+    return questions
+
+
+def ask_stage_times(elapsed: float, body: Dict[str, Any]) -> Dict[str, Optional[float]]:
+    """Latência de cada estágio de /ask (em segundos) a partir das métricas da resposta"""
+    llm_metrics = body.get("llm_metrics") or {}
+    ttft = llm_metrics.get("ttft_ms")
+    timings = body.get("stage_timings")
+    if timings:
+        return {
+            "http": elapsed,
+            **{stage: ms / 1000 for stage, ms in timings.items()},
+            "llm_ttft": ttft / 1000 if ttft is not None else None,
+            "overhead": max(elapsed - sum(timings.values()) / 1000, 0.0)
+        }
+
+    compression = body.get("context_compression") or {}
+    llm = llm_metrics.get("total_ms")
+    compression_ms = compression.get("elapsed_ms")
+    other = elapsed - ((llm or 0.0) + (compression_ms or 0.0)) / 1000
+    return {
+        "http": elapsed,
+        "llm": llm / 1000 if llm is not None else None,
+        "llm_ttft": ttft / 1000 if ttft is not None else None,
+        "compression": compression_ms / 1000 if compression_ms is not None else None,
+        "retrieval_other": max(other, 0.0)
+    }
+
+
+async def run_ask_level(
+    client: httpx.AsyncClient,
+    questions: List[Dict[str, Any]],
+    concurrency: int,
+    max_documents: int
+) -> Dict[str, Any]:
+    """Clientes em laço fechado: cada um envia a próxima pergunta assim que recebe a resposta"""
+    pending = iter(questions)
+    stages: Dict[str, List[float]] = {"http": []}
+    status_codes: Dict[str, int] = {}
+    by_kind: Dict[str, List[float]] = {}
+    hits: List[bool] = []
+
+    async def worker():
+        for item in pending:
+            payload = {key: item[key] for key in ("question", "category_filter") if key in item}
+            payload["max_documents"] = max_documents
+            start = time.perf_counter()
+            try:
+                response = await client.post("/api/v1/ask", json=payload)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                response, status = None, type(e).__name__
+            elapsed = time.perf_counter() - start
+            status_codes[status] = status_codes.get(status, 0) + 1
+            if response is None or response.status_code != 200:
+                continue
+            body = response.json()
+            for stage, value in ask_stage_times(elapsed, body).items():
+                if value is not None:
+                    stages.setdefault(stage, []).append(value)
+            by_kind.setdefault(item["kind"], []).append(elapsed)
+            if "relevant_titles" in item:
+                found = {result["title"] for result in body.get("search_results") or []}
+                hits.append(bool(found & set(item["relevant_titles"])))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    succeeded = len(stages["http"])
+    return {
+        "concurrency": concurrency,
+        "requests": len(questions),
+        "succeeded": succeeded,
+        "status_codes": status_codes,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(succeeded / wall, 2) if wall > 0 else 0.0,
+        "hit_rate": round(sum(hits) / len(hits), 4) if hits else None,
+        "stages": {stage: latency_summary(values) for stage, values in stages.items()},
+        "by_kind": {kind: latency_summary(values) for kind, values in sorted(by_kind.items())}
+    }
+
+
+async def timed_request(client: httpx.AsyncClient, method: str, path: str, **kwargs) -> Tuple[float, str, Any]:
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, path, **kwargs)
+        status = str(response.status_code)
+        body = response.json() if response.headers.get("content-type", "").startswith("application/json") else None
+    except httpx.HTTPError as e:
+        status, body = type(e).__name__, None
+    return time.perf_counter() - start, status, body
+
+
+async def run_repeated(client: httpx.AsyncClient, name: str, runs: int, method: str, path: str, **kwargs) -> Dict[str, Any]:
+    latencies, status_codes = [], {}
+    for _ in range(runs):
+        elapsed, status, _ = await timed_request(client, method, path, **kwargs)
+        status_codes[status] = status_codes.get(status, 0) + 1
+        latencies.append(elapsed)
+    return {"stage": name, "status_codes": status_codes, **latency_summary(latencies)}
+
+
+async def run_suite(args, questions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    timeout = httpx.Timeout(args.request_timeout)
+    limits = httpx.Limits(max_connections=max(args.concurrency) + 4)
+    results: Dict[str, Any] = {"load_documents": [], "ask": [], "evaluation": []}
+
+    async with httpx.AsyncClient(base_url=args.api_url, timeout=timeout, limits=limits) as client:
+        if not args.skip_load:
+            params = {"directory_path": args.documents_dir}
+            results["load_documents"].append(await run_repeated(
+                client, "load-documents/full", 1, "POST", "/api/v1/admin/load-documents",
+                params={**params, "force_reindex": "true"}
+            ))
+            if args.load_runs > 0:
+                results["load_documents"].append(await run_repeated(
+                    client, "load-documents/incremental", args.load_runs, "POST", "/api/v1/admin/load-documents",
+                    params=params
+                ))
+
+        await run_ask_level(client, questions[:args.warmup], min(4, max(args.concurrency)), args.max_documents)
+        for level, concurrency in enumerate(args.concurrency):
+            offset = args.warmup + level * args.requests
+            row = await run_ask_level(
+                client, questions[offset:offset + args.requests], concurrency, args.max_documents
+            )
+            http = row["stages"]["http"]
+            print(
+                f"ask c={concurrency}: {row['throughput_rps']} req/s, p50={http['p50_ms']}ms "
+                f"p95={http['p95_ms']}ms p99={http['p99_ms']}ms status={row['status_codes']}"
+                + (f" hit_rate={row['hit_rate']}" if row["hit_rate"] is not None else "")
+            )
+            results["ask"].append(row)
+
+        if not args.skip_evaluation:
+            results["evaluation"].append(await run_repeated(
+                client, "evaluation/interactions", args.eval_runs, "GET", "/api/v1/evaluation/interactions",
+                params={"limit": 50}
+            ))
+            results["evaluation"].append(await run_repeated(
+                client, "evaluation/metrics-advanced", args.eval_runs, "GET", "/api/v1/evaluation/metrics/advanced",
+                params={"limit": 50}
+            ))
+            if args.ragas_runs > 0:
+                results["evaluation"].append(await run_repeated(
+                    client, "evaluation/ragas", args.ragas_runs, "POST", "/api/v1/evaluation/ragas/evaluate"
+                ))
+
+        for path, key in (("/api/v1/admin/llm-scheduler", "llm_scheduler"), ("/api/v1/admin/llm-client", "llm_client")):
+            _, status, body = await timed_request(client, "GET", path)
+            results[key] = body if status == "200" else None
+    return results
+
+
+def table_rows(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    rows = [
+        {**row, "throughput_rps": "", "status": row["status_codes"]}
+        for row in results["load_documents"] + results["evaluation"]
+    ]
+    for level in results["ask"]:
+        for stage, summary in level["stages"].items():
+            if summary["count"]:
+                rows.append({
+                    "stage": f"ask/c{level['concurrency']}/{stage}",
+                    "throughput_rps": level["throughput_rps"] if stage == "http" else "",
+                    "status": level["status_codes"] if stage == "http" else "",
+                    **summary
+                })
+    return rows
+
+
+def compare(rows: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {row["stage"]: row for row in table_rows(json.load(f)["results"])}
+    print(f"\nComparação com {baseline_path} (p95):")
+    comparison = []
+    for row in rows:
+        before = baseline.get(row["stage"])
+        if not before or not before.get("p95_ms"):
+            continue
+        comparison.append({
+            "stage": row["stage"],
+            "p95_before_ms": before["p95_ms"],
+            "p95_now_ms": row["p95_ms"],
+            "delta_pct": round(100 * (row["p95_ms"] - before["p95_ms"]) / before["p95_ms"], 1)
+        })
+    print_table(comparison, ["stage", "p95_before_ms", "p95_now_ms", "delta_pct"])
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_stack(args, data_dir: str) -> List[subprocess.Popen]:
+    """Servidor LLM falso + API com dados isolados em `data_dir`"""
+    processes = [start_fake_llm(
+        args.llm_port,
+        "--latency-dist", args.llm_latency_dist,
+        "--latency-ms", str(args.llm_latency_ms),
+        "--tokens-per-second", str(args.llm_tokens_per_second),
+        "--completion-tokens", str(args.llm_completion_tokens)
+    )]
+    env = {
+        **os.environ,
+        "LLM_PROVIDER": "fake",
+        "LLM_BASE_URL": f"http://127.0.0.1:{args.llm_port}/v1",
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "fake",
+        "CHROMA_CLIENT_MODE": "persistent",
+        "CHROMA_PERSIST_DIRECTORY": data_dir,
+        "DOCUMENT_WATCHER_ENABLED": "false"
+    }
+    try:
+        processes.append(start_service(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.api_port), "--loop", "asyncio"],
+            f"{args.api_url}/docs",
+            env=env,
+            timeout=args.startup_timeout,
+            log_path=os.path.join(data_dir, "api.log")
+        ))
+    except RuntimeError:
+        stop_stack(processes)
+        raise
+    return processes
+
+
+def stop_stack(processes: List[subprocess.Popen]) -> None:
+    for process in reversed(processes):
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da API (ask, load-documents, evaluation) com LLM falso")
+    parser.add_argument("--api-url", default=None, help="API já em execução (não sobe API nem LLM falso)")
+    parser.add_argument("--api-port", type=int, default=8010)
+    parser.add_argument("--llm-port", type=int, default=8902)
+    parser.add_argument("--llm-latency-dist", default="lognormal")
+    parser.add_argument("--llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--llm-completion-tokens", type=int, default=0)
+    parser.add_argument("--documents-dir", default="conteudo_ficticio")
+    parser.add_argument("--concurrency", default="1,4,16", help="Níveis de concorrência separados por vírgula")
+    parser.add_argument("--requests", type=int, default=200, help="Perguntas por nível de concorrência")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--queries", default=None, help="queries.jsonl de benchmarks.synthetic_corpus (substitui --mix)")
+    parser.add_argument("--max-documents", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--load-runs", type=int, default=3, help="Recargas incrementais após a carga completa")
+    parser.add_argument("--eval-runs", type=int, default=5)
+    parser.add_argument("--ragas-runs", type=int, default=1)
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--skip-evaluation", action="store_true")
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--startup-timeout", type=float, default=180.0)
+    parser.add_argument("--baseline", default=None, help="JSON de uma execução anterior para comparar o p95")
+    args = parser.parse_args()
+    args.concurrency = [int(value) for value in args.concurrency.split(",")]
+
+    total = args.warmup + args.requests * len(args.concurrency)
+    if args.queries:
+        mix = None
+        questions = questions_from_file(args.queries, total, args.seed)
+        print(f"{len(questions)} perguntas de {args.queries}")
+    else:
+        mix = parse_mix(args.mix)
+        documents = read_documents(args.documents_dir)
+        questions = build_questions(documents, mix, total, args.seed)
+        print(f"{len(documents)} documentos, {len(questions)} perguntas ({args.mix})")
+
+    processes, data_dir = [], None
+    if args.api_url is None:
+        data_dir = tempfile.mkdtemp(prefix="load_test_")
+        args.api_url = f"http://127.0.0.1:{args.api_port}"
+        processes = start_stack(args, data_dir)
+        print(f"API em {args.api_url} (dados e log em {data_dir}), LLM falso na porta {args.llm_port}")
+    try:
+        results = asyncio.run(run_suite(args, questions))
+    finally:
+        stop_stack(processes)
+
+    rows = table_rows(results)
+    print()
+    print_table(rows, ["stage", "count", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "status"])
+    if args.baseline:
+        compare(rows, args.baseline)
+
+    path = save_results("load_test", {
+        "commit": git_commit(),
+        "api_url": args.api_url,
+        "concurrency": args.concurrency,
+        "requests_per_level": args.requests,
+        "mix": mix,
+        "queries": args.queries,
+        "seed": args.seed,
+        "fake_llm": None if data_dir is None else {
+            "latency_dist": args.llm_latency_dist,
+            "latency_ms": args.llm_latency_ms,
+            "tokens_per_second": args.llm_tokens_per_second,
+            "completion_tokens": args.llm_completion_tokens
+        },
+        "results": results
+    })
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: índice quantizado (int8 / binary) com re-ranking float32
+
+Compara o modo quantizado com o caminho atual de `search_documents`
+(HNSW do Chroma com distância de cosseno) e com a busca exata.
+
+Métricas reportadas por (modo, candidatos):
+- recall@k retido em relação aos resultados do HNSW
+- recall@k em relação à busca exata
+- latência p50/p99
+- memória dos códigos em RAM x vetores float32
+
+Uso:
+    python -m benchmarks.quantized_recall --n-docs 50000 --candidates 50 100 200
+"""
+
+import argparse
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+from app.core.config import settings
+from app.services.quantized_index import QuantizedIndex
+from app.services.vector_service import build_hnsw_metadata
+from benchmarks.common import (
+    exact_top_k, latency_summary, print_table, recall_at_k,
+    save_results, synthetic_embeddings, synthetic_queries
+)
+
+
+def hnsw_results(corpus: np.ndarray, queries: np.ndarray, k: int, batch_size: int = 5000):
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection(
+        name="quantized-bench-reference",
+        metadata=build_hnsw_metadata(
+            "cosine", settings.hnsw_m, settings.hnsw_construction_ef, settings.hnsw_search_ef
+        ),
+        embedding_function=None
+    )
+    for start in range(0, len(corpus), batch_size):
+        batch = corpus[start:start + batch_size]
+        collection.add(ids=[str(i) for i in range(start, start + len(batch))], embeddings=batch.tolist())
+
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])
+        latencies.append(time.perf_counter() - start)
+        results.append(result["ids"][0])
+    return results, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall e memória do índice quantizado")
+    parser.add_argument("--n-docs", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=list(QuantizedIndex.MODES))
+    parser.add_argument("--candidates", type=int, nargs="+", default=[20, 50, 100, 200])
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    corpus = synthetic_embeddings(args.n_docs, dim=args.dim, seed=args.seed)
+    queries = synthetic_queries(corpus, args.queries, seed=args.seed + 1)
+    ids = [str(i) for i in range(len(corpus))]
+    exact = [[str(i) for i in row] for row in exact_top_k(corpus, queries, args.k)]
+
+    print(f"Corpus: {len(corpus)} vetores x {args.dim} dims | {len(queries)} consultas | k={args.k}")
+
+    reference, reference_latencies = hnsw_results(corpus, queries, args.k)
+    rows = [{
+        "mode": "hnsw",
+        "candidates": "-",
+        "recall_vs_hnsw": 1.0,
+        "recall_vs_exact": round(recall_at_k(reference, exact, args.k), 4),
+        "ram_mb": round(corpus.nbytes / 2**20, 2),
+        **latency_summary(reference_latencies)
+    }]
+
+    memory = {}
+    for mode in args.modes:
+        with tempfile.TemporaryDirectory() as directory:
+            index = QuantizedIndex(directory, dim=args.dim, mode=mode)
+            index.add(ids, corpus, [""] * len(ids))
+            memory[mode] = index.memory_report()
+
+            for candidates in args.candidates:
+                results, latencies = [], []
+                for query in queries:
+                    start = time.perf_counter()
+                    hits = index.search(query, limit=args.k, candidates=candidates)
+                    latencies.append(time.perf_counter() - start)
+                    results.append([doc_id for doc_id, _ in hits])
+
+                rows.append({
+                    "mode": mode,
+                    "candidates": candidates,
+                    "recall_vs_hnsw": round(recall_at_k(results, reference, args.k), 4),
+                    "recall_vs_exact": round(recall_at_k(results, exact, args.k), 4),
+                    "ram_mb": round(memory[mode]["quantized_bytes"] / 2**20, 2),
+                    **latency_summary(latencies)
+                })
+            del index
+
+    print()
+    print_table(rows, ["mode", "candidates", "recall_vs_hnsw", "recall_vs_exact", "ram_mb", "p50_ms", "p99_ms"])
+    for mode, report in memory.items():
+        print(f"{mode}: {report['memory_saved_bytes'] / 2**20:.1f} MB economizados "
+              f"({report['compression_ratio']}x menor que float32)")
+
+    path = save_results("quantized_recall", {
+        "corpus_size": len(corpus),
+        "dim": args.dim,
+        "k": args.k,
+        "memory": memory,
+        "results": rows
+    })
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: escalabilidade da busca vetorial com shards em processos separados
+
+Para cada combinação (tamanho do corpus, número de shards) inicia um
+ShardPool em diretório temporário, distribui os vetores por hash do id e
+executa consultas concorrentes com fan-out para todos os shards + merge.
+
+Métricas reportadas:
+- throughput (consultas/s) com `--concurrency` consultas simultâneas
+- latência p50/p99 por consulta
+- recall@k contra a busca exata
+- tempo de ingestão
+
+Uso:
+    python -m benchmarks.shard_scaling --sizes 20000 100000 --shards 1 2 4 --concurrency 8
+"""
+
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from app.services.shard_pool import ShardPool
+from app.services.vector_service import build_hnsw_metadata
+from benchmarks.common import (
+    Timer, exact_top_k, latency_summary, print_table, recall_at_k,
+    save_results, synthetic_embeddings, synthetic_queries
+)
+
+
+def ingest(pool: ShardPool, corpus: np.ndarray, batch_size: int) -> None:
+    ids = [str(i) for i in range(len(corpus))]
+    for start in range(0, len(ids), batch_size):
+        by_shard = {}
+        for i in range(start, min(start + batch_size, len(ids))):
+            by_shard.setdefault(pool.shard_for(ids[i]).shard_id, []).append(i)
+        with ThreadPoolExecutor(max_workers=pool.n_shards) as executor:
+            list(executor.map(
+                lambda item: pool.shards[item[0]].add(
+                    ids=[ids[i] for i in item[1]],
+                    embeddings=corpus[item[1]].tolist()
+                ),
+                by_shard.items()
+            ))
+
+
+def fan_out_query(pool: ShardPool, executor: ThreadPoolExecutor, query: np.ndarray, k: int):
+    merged = []
+    for result in executor.map(
+        lambda shard: shard.query(query_embeddings=[query.tolist()], n_results=k, include=["distances"]),
+        pool.shards
+    ):
+        merged.extend(zip(result["distances"][0], result["ids"][0]))
+    return [int(doc_id) for _, doc_id in sorted(merged)[:k]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput e latência por número de shards")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20000, 100000])
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--base-port", type=int, default=8600)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        corpus = synthetic_embeddings(size, dim=args.dim, seed=args.seed)
+        queries = synthetic_queries(corpus, args.queries, seed=args.seed + 1)
+        exact = exact_top_k(corpus, queries, args.k).tolist()
+
+        for n_shards in args.shards:
+            with tempfile.TemporaryDirectory() as directory:
+                pool = ShardPool(
+                    n_shards, directory, "shard-bench", build_hnsw_metadata("cosine"),
+                    base_port=args.base_port, connections=args.concurrency
+                )
+                try:
+                    with Timer() as ingestion:
+                        ingest(pool, corpus, args.batch_size)
+
+                    shard_executor = ThreadPoolExecutor(max_workers=n_shards * args.concurrency)
+
+                    def timed(query):
+                        start = time.perf_counter()
+                        result = fan_out_query(pool, shard_executor, query, args.k)
+                        return result, time.perf_counter() - start
+
+                    # Aquecimento (carrega os índices HNSW em cada shard)
+                    for query in queries[:n_shards * 2]:
+                        timed(query)
+
+                    with ThreadPoolExecutor(max_workers=args.concurrency) as clients:
+                        with Timer() as wall:
+                            outcomes = list(clients.map(timed, queries))
+                    shard_executor.shutdown()
+                finally:
+                    pool.close()
+
+            results = [result for result, _ in outcomes]
+            rows.append({
+                "docs": size,
+                "shards": n_shards,
+                "qps": round(len(queries) / wall.elapsed, 1),
+                f"recall@{args.k}": round(recall_at_k(results, exact, args.k), 4),
+                "ingest_s": round(ingestion.elapsed, 2),
+                **latency_summary([latency for _, latency in outcomes])
+            })
+            print(f"docs={size} shards={n_shards}: {rows[-1]['qps']} consultas/s, "
+                  f"p50={rows[-1]['p50_ms']}ms p99={rows[-1]['p99_ms']}ms")
+
+    print()
+    print_table(rows, ["docs", "shards", "qps", f"recall@{args.k}", "p50_ms", "p99_ms", "ingest_s"])
+
+    path = save_results("shard_scaling", {
+        "dim": args.dim,
+        "k": args.k,
+        "concurrency": args.concurrency,
+        "results": rows
+    })
+    print(f"\nResultados salvos em {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+"""
+Gerador determinístico de corpus sintético no formato de conteudo_ficticio
+
+Expande os documentos de conteudo_ficticio (cabeçalhos "Título:"/"Categoria:",
+frases da categoria e frases de ruído) para corpora de 10 mil a 1 milhão de
+documentos, para benchmarks de ingestão e busca em escala realista:
+
+- Frases da categoria: as frases de cada categoria de conteudo_ficticio, com
+  os números trocados a cada uso (ex.: "após 5 tentativas" vira "após 7 tentativas")
+- Frase-chave: uma frase única por documento, com um código próprio
+  (ex.: "O contrato PC-004217 tem prazo máximo de 18 dias."), que ancora as consultas
+- Ruído (--noise-rate): probabilidade de cada frase ser trocada por uma frase
+  de ruído (as que aparecem em várias categorias de conteudo_ficticio)
+- Duplicação (--duplicate-rate): fração de documentos que repetem um documento
+  anterior; metade cópias exatas e metade quase-duplicatas (frases
+  embaralhadas e uma frase trocada)
+
+Junto com o corpus é gerado um conjunto de consultas com os documentos
+relevantes conhecidos:
+
+- lookup: pergunta pelo código da frase-chave; relevantes são o documento
+  de origem e todas as suas duplicatas
+- fact: a frase-chave sem o código, com category_filter; relevantes são todos
+  os documentos da categoria com a mesma frase-chave (sujeito, predicado e valor)
+
+Saída:
+    <saída>/documents/*.txt   arquivos no formato de conteudo_ficticio (carregáveis em /admin/load-documents)
+    <saída>/queries.jsonl     {"query_id", "kind", "question", "category_filter", "relevant_titles", "relevant_files"}
+    <saída>/manifest.json     parâmetros, semente e contagens
+
+A mesma semente e os mesmos parâmetros geram exatamente os mesmos arquivos.
+
+Uso:
+    python -m benchmarks.synthetic_corpus --documents 10000 --output benchmarks/corpora/10k
+    python -m benchmarks.synthetic_corpus --documents 1000000 --duplicate-rate 0.05 --noise-rate 0.2 --output /data/corpus_1m
+    python -m benchmarks.load_test --documents-dir benchmarks/corpora/10k/documents --queries benchmarks/corpora/10k/queries.jsonl
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import unicodedata
+from array import array
+from collections import deque
+from typing import Any, Dict, List
+
+from benchmarks.common import Timer
+
+SUBJECTS = ["O contrato", "O processo", "O produto", "O procedimento", "O cadastro", "O plano", "O serviço", "O programa"]
+PREDICATES = [
+    ("tem prazo máximo de", "dias"),
+    ("exige revisão a cada", "meses"),
+    ("permite parcelamento em até", "parcelas"),
+    ("bloqueia o acesso após", "tentativas"),
+    ("deve ser renovado a cada", "meses"),
+    ("exige aprovação em até", "horas"),
+    ("admite no máximo", "participantes"),
+    ("tem carência de", "dias")
+]
+NOISE_TEMPLATES = [
+    "Informação irrelevante: {word} {color} {verb}.",
+    "Frase genérica sem valor semântico: {number}.",
+    "Texto aleatório número {number} inserido como ruído."
+]
+NOISE_WORDS = {
+    "word": ["Banana", "Nuvem", "Cadeira", "Girafa", "Lâmpada", "Montanha"],
+    "color": ["azul", "verde", "roxa", "amarela", "cinza"],
+    "verb": ["voadora", "dançante", "silenciosa", "invisível", "giratória"]
+}
+
+
+def read_seed(directory: str) -> Dict[str, Any]:
+    """Frases por categoria e frases de ruído (as que aparecem em mais de uma categoria)"""
+    by_category: Dict[str, List[str]] = {}
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".txt"):
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            text = f.read()
+        category = re.search(r"^Categoria:\s*(.+)$", text, re.MULTILINE)
+        if not category:
+            continue
+        body = re.sub(r"^(Título|Categoria):.*$", "", text, flags=re.MULTILINE)
+        sentences = by_category.setdefault(category.group(1).strip(), [])
+        for sentence in (line.strip() for line in body.splitlines()):
+            if sentence and sentence not in sentences:
+                sentences.append(sentence)
+
+    categories_of: Dict[str, int] = {}
+    for sentences in by_category.values():
+        for sentence in sentences:
+            categories_of[sentence] = categories_of.get(sentence, 0) + 1
+    noise = sorted(sentence for sentence, count in categories_of.items() if count > 1)
+    facts = {
+        category: [sentence for sentence in sentences if categories_of[sentence] == 1]
+        for category, sentences in sorted(by_category.items())
+    }
+    return {"facts": facts, "noise": noise}
+
+
+def slugify(text: str) -> str:
+    return re.sub(r"[^\w]+", "_", text).strip("_")
+
+
+def category_prefix(category: str) -> str:
+    ascii_name = unicodedata.normalize("NFKD", category).encode("ascii", "ignore").decode()
+    words = [word for word in re.findall(r"[A-Za-z]+", ascii_name) if len(word) > 2]
+    return "".join(word[0] for word in words).upper()[:3] or "DOC"
+
+
+def document_title(index: int, category: str) -> str:
+    return f"{category} - Documento {index + 1}"
+
+
+def document_filename(index: int, category: str) -> str:
+    return f"{index + 1:07d}_{slugify(category)}__Documento_{index + 1}.txt"
+
+
+class CorpusGenerator:
+    """
+    Gera os documentos um a um, em memória constante (dois inteiros por documento)
+
+    O documento original e as suas duplicatas formam um grupo (relevantes das
+    consultas lookup); `fact_keys` identifica a frase-chave sem o código
+    (relevantes das consultas fact).
+    """
+
+    def __init__(
+        self,
+        seed_corpus: Dict[str, Any],
+        seed: int = 42,
+        facts_per_document: int = 4,
+        noise_rate: float = 0.15,
+        duplicate_rate: float = 0.02,
+        duplicate_window: int = 1000
+    ):
+        self.facts = seed_corpus["facts"]
+        self.noise = seed_corpus["noise"]
+        self.categories = sorted(self.facts)
+        self.prefixes = {category: category_prefix(category) for category in self.categories}
+        self.rng = random.Random(seed)
+        self.facts_per_document = facts_per_document
+        self.noise_rate = noise_rate
+        self.duplicate_rate = duplicate_rate
+        # Duplicatas copiam um dos últimos documentos originais gerados
+        self._recent: deque = deque(maxlen=duplicate_window)
+        self.groups = array("q")
+        self.fact_keys = array("q")
+        self.duplicates = 0
+        self.noise_sentences = 0
+
+    def _vary_numbers(self, sentence: str) -> str:
+        """Troca cada número por outro da mesma ordem de grandeza (a frase continua plausível)"""
+        def replace(match: re.Match) -> str:
+            value = int(match.group(0))
+            if value == 0:
+                return match.group(0)
+            return str(self.rng.randint(max(1, value // 2), max(value * 2, value + 3)))
+        return re.sub(r"\d+", replace, sentence)
+
+    def _noise_sentence(self) -> str:
+        self.noise_sentences += 1
+        if self.noise and self.rng.random() < 0.5:
+            return self.rng.choice(self.noise)
+        template = self.rng.choice(NOISE_TEMPLATES)
+        values = {key: self.rng.choice(words) for key, words in NOISE_WORDS.items()}
+        return template.format(number=self.rng.randint(10 ** 5, 10 ** 9), **values)
+
+    def _key_fact(self, index: int, category: str) -> Dict[str, Any]:
+        subject = self.rng.randrange(len(SUBJECTS))
+        predicate = self.rng.randrange(len(PREDICATES))
+        value = self.rng.randint(2, 60)
+        code = f"{self.prefixes[category]}-{index + 1:07d}"
+        subject_text = SUBJECTS[subject]
+        predicate_text, unit = PREDICATES[predicate]
+        noun = subject_text.split(" ", 1)[1]
+        return {
+            "code": code,
+            # Frase-chave sem o código (categoria, sujeito, predicado, valor) como um inteiro
+            "fact_key": ((self.categories.index(category) * len(SUBJECTS) + subject) * len(PREDICATES) + predicate) * 100 + value,
+            "sentence": f"{subject_text} {code} {predicate_text} {value} {unit}.",
+            "lookup": f"O que se aplica ao {noun} {code}?",
+            "fact": f"Qual {noun} {predicate_text} {value} {unit}?"
+        }
+
+    def _new_document(self, index: int) -> Dict[str, Any]:
+        category = self.rng.choice(self.categories)
+        key_fact = self._key_fact(index, category)
+        pool = self.facts[category]
+        sentences = [
+            self._noise_sentence() if self.rng.random() < self.noise_rate else self._vary_numbers(sentence)
+            for sentence in self.rng.sample(pool, min(self.facts_per_document, len(pool)))
+        ]
+        sentences.insert(self.rng.randint(0, len(sentences)), key_fact["sentence"])
+        return {"index": index, "category": category, "sentences": sentences, "key_fact": key_fact}
+
+    def _duplicate(self, original: Dict[str, Any]) -> Dict[str, Any]:
+        self.duplicates += 1
+        sentences = list(original["sentences"])
+        if self.rng.random() < 0.5:
+            # Quase-duplicata: outra ordem e uma frase (nunca a frase-chave) trocada por ruído
+            self.rng.shuffle(sentences)
+            replaceable = [i for i, sentence in enumerate(sentences) if sentence != original["key_fact"]["sentence"]]
+            if replaceable:
+                sentences[self.rng.choice(replaceable)] = self._noise_sentence()
+        return {**original, "sentences": sentences}
+
+    def document(self, index: int) -> Dict[str, Any]:
+        """Documento `index`; chamar em ordem, pois duplicatas copiam documentos anteriores"""
+        if self._recent and self.rng.random() < self.duplicate_rate:
+            doc = self._duplicate(self.rng.choice(self._recent))
+        else:
+            doc = self._new_document(index)
+            self._recent.append(doc)
+        self.groups.append(doc["index"])
+        self.fact_keys.append(doc["key_fact"]["fact_key"])
+        return {
+            "title": document_title(index, doc["category"]),
+            "filename": document_filename(index, doc["category"]),
+            "category": doc["category"],
+            "key_fact": doc["key_fact"],
+            "text": f"Título: {document_title(index, doc['category'])}\nCategoria: {doc['category']}\n\n"
+                    + "\n\n".join(doc["sentences"])
+        }
+
+
+def generate_corpus(
+    output: str,
+    documents: int,
+    queries: int = 500,
+    seed: int = 42,
+    seed_directory: str = "conteudo_ficticio",
+    facts_per_document: int = 4,
+    noise_rate: float = 0.15,
+    duplicate_rate: float = 0.02,
+    fact_query_rate: float = 0.5
+) -> Dict[str, Any]:
+    """Gera documentos, consultas e manifesto em `output`; retorna o manifesto"""
+    generator = CorpusGenerator(
+        read_seed(seed_directory), seed=seed, facts_per_document=facts_per_document,
+        noise_rate=noise_rate, duplicate_rate=duplicate_rate
+    )
+    documents_dir = os.path.join(output, "documents")
+    os.makedirs(documents_dir, exist_ok=True)
+
+    # Alvos das consultas sorteados com outra semente: o corpus não depende do número de consultas
+    query_rng = random.Random(seed + 1)
+    targets = set(query_rng.sample(range(documents), min(queries, documents)))
+    target_docs: Dict[int, Dict[str, Any]] = {}
+    categories: Dict[int, str] = {}
+
+    with Timer() as timer:
+        for index in range(documents):
+            doc = generator.document(index)
+            with open(os.path.join(documents_dir, doc["filename"]), "w", encoding="utf-8") as f:
+                f.write(doc["text"])
+            if index in targets:
+                target_docs[index] = doc
+            if (index + 1) % 100000 == 0:
+                print(f"{index + 1} documentos gerados")
+    elapsed = timer.elapsed
+
+    # Relevantes: uma passada pelos grupos/frases-chave de todos os documentos
+    query_specs = []
+    for index in sorted(target_docs):
+        doc = target_docs[index]
+        kind = "fact" if query_rng.random() < fact_query_rate else "lookup"
+        query_specs.append((index, kind, generator.groups[index] if kind == "lookup" else doc["key_fact"]["fact_key"]))
+    wanted = {(kind, key): [] for _, kind, key in query_specs}
+    for index in range(documents):
+        for kind, key in (("lookup", generator.groups[index]), ("fact", generator.fact_keys[index])):
+            if (kind, key) in wanted:
+                wanted[(kind, key)].append(index)
+
+    queries_path = os.path.join(output, "queries.jsonl")
+    with open(queries_path, "w", encoding="utf-8") as f:
+        for query_id, (index, kind, key) in enumerate(query_specs):
+            doc = target_docs[index]
+            relevant = wanted[(kind, key)]
+            f.write(json.dumps({
+                "query_id": query_id,
+                "kind": kind,
+                "question": doc["key_fact"][kind],
+                "category_filter": doc["category"] if kind == "fact" else None,
+                "relevant_titles": [document_title(i, doc["category"]) for i in relevant],
+                "relevant_files": [document_filename(i, doc["category"]) for i in relevant]
+            }, ensure_ascii=False) + "\n")
+
+    manifest = {
+        "documents": documents,
+        "queries": len(query_specs),
+        "seed": seed,
+        "seed_directory": seed_directory,
+        "facts_per_document": facts_per_document,
+        "noise_rate": noise_rate,
+        "duplicate_rate": duplicate_rate,
+        "fact_query_rate": fact_query_rate,
+        "categories": generator.categories,
+        "duplicates_generated": generator.duplicates,
+        "noise_sentences_generated": generator.noise_sentences,
+        "generation_s": round(elapsed, 2)
+    }
+    with open(os.path.join(output, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+def load_queries(path: str) -> List[Dict[str, Any]]:
+    """Consultas de um corpus gerado (queries.jsonl)"""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um corpus sintético no formato de conteudo_ficticio, com consultas")
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seed-directory", default="conteudo_ficticio")
+    parser.add_argument("--facts-per-document", type=int, default=4)
+    parser.add_argument("--noise-rate", type=float, default=0.15)
+    parser.add_argument("--duplicate-rate", type=float, default=0.02)
+    parser.add_argument("--fact-query-rate", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if os.path.isdir(os.path.join(args.output, "documents")) and os.listdir(os.path.join(args.output, "documents")):
+        parser.error(f"{args.output}/documents já tem arquivos; use outro --output")
+
+    manifest = generate_corpus(
+        args.output, args.documents, queries=args.queries, seed=args.seed, seed_directory=args.seed_directory,
+        facts_per_document=args.facts_per_document, noise_rate=args.noise_rate,
+        duplicate_rate=args.duplicate_rate, fact_query_rate=args.fact_query_rate
+    )
+    print(
+        f"{manifest['documents']} documentos ({manifest['duplicates_generated']} duplicatas, "
+        f"{manifest['noise_sentences_generated']} frases de ruído) e {manifest['queries']} consultas "
+        f"em {args.output} ({manifest['generation_s']}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@ from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from contextlib import asynccontextmanager
-from app.routes import admin, chat, evaluation
+from app.routes import admin, chat, evaluation, metrics
 from app.core.config import settings
 from app.services.database_service import database_service
 from app.services.phoenix_service import phoenix_service
@@ -23,6 +23,10 @@ async def lifespan(app: FastAPI):
         else:
             print("Phoenix não foi inicializado - continuando sem observabilidade")
         
+        if settings.document_watcher_enabled:
+            admin.admin_controller.start_document_watcher(settings.document_watcher_directory)
+            print(f"Watcher de documentos ativo em: {settings.document_watcher_directory}")
+        
         print("Aplicação RAG inicializada com sucesso!")
         
     except Exception as e:
@@ -33,6 +37,8 @@ async def lifespan(app: FastAPI):
     
     print("Finalizando aplicação...")
     try:
+        await admin.admin_controller.stop_document_watcher()
+        
         if phoenix_service.is_enabled:
             phoenix_service.shutdown()
             print("Phoenix finalizado")
@@ -51,6 +57,7 @@ app = FastAPI(
 app.include_router(admin.router, prefix="/api/v1", tags=["admin"])
 app.include_router(chat.router, prefix="/api/v1", tags=["chat"])
 app.include_router(evaluation.router, prefix="/api/v1", tags=["evaluation"])
+app.include_router(metrics.router, tags=["metrics"])
 
 @app.get("/")
 async def root():
@@ -0,0 +1,74 @@
+import hashlib
+import re
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.models.document import Document
+import app.services.vector_service as vector_service_module
+
+
+class HashingEncoder:
+    """Encoder determinístico (bag of words com hashing) no lugar do SentenceTransformer: sem download de modelo"""
+
+    dim = 64
+
+    def __init__(self, name: str = "fake"):
+        self.name = name
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(texts, str)
+        vectors = np.zeros((1 if single else len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate([texts] if single else texts):
+            for word in re.findall(r"\w+", text.lower()):
+                vectors[row, int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16) % self.dim] += 1.0
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture
+def vector_settings(tmp_path, monkeypatch):
+    """Dados em um diretório temporário, encoder falso e instância compartilhada zerada
+
+    Retorna uma função para ajustar outros campos de Settings no teste.
+    """
+    monkeypatch.setattr(vector_service_module, "SentenceTransformer", HashingEncoder)
+    monkeypatch.setattr(vector_service_module, "_SHARED", None)
+    monkeypatch.setattr(settings, "chroma_persist_directory", str(tmp_path / "chroma_data"))
+    monkeypatch.setattr(settings, "chroma_client_mode", "persistent")
+    monkeypatch.setattr(settings, "vector_shards", 1)
+
+    def configure(**fields):
+        for name, value in fields.items():
+            monkeypatch.setattr(settings, name, value)
+
+    return configure
+
+
+def make_document(title: str, category: str, content: str, source_file: str = None) -> Document:
+    source_file = source_file or f"{title}.txt"
+    return Document(
+        title=title,
+        category=category,
+        content=content,
+        metadata={"source_file": source_file, "file_path": f"/docs/{source_file}"}
+    )
+
+
+@pytest.fixture
+def offline_document_processor(monkeypatch):
+    """DocumentProcessor sem spaCy e sem o GPT-2 da limpeza por perplexidade (conteúdo usado como está)"""
+    pytest.importorskip("spacy")
+    pytest.importorskip("langchain.schema")
+    import app.services.document_processor as document_processor_module
+
+    def unavailable(*args, **kwargs):
+        raise OSError("modelo indisponível nos testes")
+
+    monkeypatch.setattr(document_processor_module.spacy, "load", unavailable)
+    monkeypatch.setattr(document_processor_module.AutoTokenizer, "from_pretrained", unavailable)
+    return document_processor_module.DocumentProcessor
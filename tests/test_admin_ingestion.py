@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+FINANCE = "Política de reembolso: despesas de viagem são reembolsadas em até 30 dias após a aprovação."
+SECURITY = "Senhas devem ser trocadas a cada 90 dias e bloqueiam o acesso após 5 tentativas."
+VACATION = "Férias devem ser solicitadas com 30 dias de antecedência pelo portal do colaborador."
+
+
+def write(path, title: str, category: str, content: str) -> None:
+    path.write_text(f"Título: {title}\nCategoria: {category}\n{content}\n", encoding="utf-8")
+
+
+@pytest.fixture
+def make_admin(vector_settings, offline_document_processor):
+    def make(**fields):
+        vector_settings(federated_sources=[], **fields)
+        from app.controllers.admin_controller import AdminController
+        return AdminController()
+
+    return make
+
+
+@pytest.fixture
+def admin(make_admin):
+    return make_admin()
+
+
+@pytest.fixture
+def docs(tmp_path):
+    directory = tmp_path / "docs"
+    directory.mkdir()
+    write(directory / "reembolso.txt", "Reembolso", "Financeiro", FINANCE)
+    write(directory / "senhas.txt", "Senhas", "Segurança", SECURITY)
+    return directory
+
+
+def load(admin, directory, **kwargs):
+    result = asyncio.run(admin.load_documents_from_directory(str(directory), **kwargs))
+    assert result["success"], result
+    return result
+
+
+def indexed_ids(admin, path):
+    return sorted(admin.vector_service.get_chunk_ids_by_file(str(path)))
+
+
+def test_unchanged_files_are_skipped(admin, docs):
+    first = load(admin, docs)
+    assert (first["files_new"], first["files_unchanged"]) == (2, 0)
+    ids = indexed_ids(admin, docs / "reembolso.txt")
+
+    second = load(admin, docs)
+    assert (second["files_new"], second["files_changed"], second["files_unchanged"]) == (0, 0, 2)
+    assert second["chunks_updated"] == 0
+    assert second["chunks_skipped"] == first["chunks_updated"]
+    assert indexed_ids(admin, docs / "reembolso.txt") == ids
+
+
+def test_changed_and_removed_files_replace_their_chunks(admin, docs):
+    load(admin, docs)
+    old_ids = indexed_ids(admin, docs / "reembolso.txt")
+
+    write(docs / "reembolso.txt", "Reembolso", "Financeiro", VACATION)
+    (docs / "senhas.txt").unlink()
+    result = load(admin, docs)
+
+    assert (result["files_changed"], result["files_removed"], result["files_unchanged"]) == (1, 1, 0)
+    new_ids = indexed_ids(admin, docs / "reembolso.txt")
+    assert new_ids and set(new_ids).isdisjoint(old_ids)
+    assert indexed_ids(admin, docs / "senhas.txt") == []
+    assert admin.manifest.get(str(docs / "senhas.txt")) is None
+    assert admin.manifest.get(str(docs / "reembolso.txt"))["chunk_ids"] == new_ids
+
+
+def test_file_renamed_between_loads_moves_its_chunks(admin, docs):
+    load(admin, docs)
+    (docs / "senhas.txt").rename(docs / "politica_senhas.txt")
+    result = load(admin, docs)
+
+    assert (result["files_new"], result["files_removed"]) == (1, 1)
+    assert indexed_ids(admin, docs / "senhas.txt") == []
+    assert indexed_ids(admin, docs / "politica_senhas.txt")
+
+
+def test_force_reindex_reprocesses_without_duplicating_chunks(admin, docs):
+    load(admin, docs)
+    ids = indexed_ids(admin, docs / "reembolso.txt")
+    total = admin.vector_service.collection.count()
+
+    result = load(admin, docs, force_reindex=True)
+    assert (result["files_changed"], result["files_unchanged"]) == (2, 0)
+    assert indexed_ids(admin, docs / "reembolso.txt") == ids
+    assert admin.vector_service.collection.count() == total
+
+
+def test_file_whose_chunks_were_duplicates_is_requeued_when_the_original_goes_away(make_admin, docs):
+    admin = make_admin(dedup_enabled=True, dedup_action="drop")
+
+    write(docs / "copia.txt", "Reembolso", "Financeiro", FINANCE)
+    first = load(admin, docs)
+    assert first["deduplication"]["chunks_duplicate"] == 1
+    original, copy = sorted(
+        [docs / "reembolso.txt", docs / "copia.txt"], key=lambda path: len(indexed_ids(admin, path)) == 0
+    )
+    assert indexed_ids(admin, copy) == []
+
+    original.unlink()
+    result = load(admin, docs)
+    assert result["files_removed"] == 1
+    assert result["files_changed"] == 1
+    assert indexed_ids(admin, copy)
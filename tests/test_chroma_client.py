@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.services.chroma_client import RetryTransport, _configure_session
+
+
+def fake_client(session):
+    server = SimpleNamespace(
+        _session=session,
+        _settings=SimpleNamespace(chroma_server_ssl_verify=None),
+        http_limits=httpx.Limits(max_connections=4)
+    )
+    return SimpleNamespace(_server=server)
+
+
+def test_session_is_replaced_keeping_the_headers():
+    original = httpx.Client(headers={"X-Chroma-Token": "segredo"})
+    client = fake_client(original)
+
+    _configure_session(client)
+    session = client._server._session
+    assert session is not original and original.is_closed
+    assert session.headers["X-Chroma-Token"] == "segredo"
+    assert session.timeout.read is not None
+    assert isinstance(session._transport, RetryTransport)
+    session.close()
+
+
+def test_missing_internal_session_fails_loudly():
+    with pytest.raises(RuntimeError, match="_server._session"):
+        _configure_session(fake_client(None))
+    with pytest.raises(RuntimeError, match="requirements.txt"):
+        _configure_session(SimpleNamespace())
@@ -0,0 +1,25 @@
+import chromadb
+
+from app.services.collection_alias import CollectionAlias, ChromaCollectionAlias
+
+
+def test_chroma_alias_swap_is_seen_by_other_replicas(tmp_path):
+    """Cada réplica tem o próprio cliente; o alias só é compartilhado pelo servidor"""
+    admin = ChromaCollectionAlias(chromadb.PersistentClient(path=str(tmp_path)), check_interval=0)
+    serving = ChromaCollectionAlias(chromadb.PersistentClient(path=str(tmp_path)), check_interval=0)
+    assert serving.resolve("documents") == "documents"
+
+    admin.swap("documents", "documents_v20250101120000")
+
+    assert serving.changed()
+    assert serving.resolve("documents") == "documents_v20250101120000"
+    assert serving.previous("documents") == "documents"
+    assert not serving.changed()
+
+
+def test_chroma_alias_imports_the_local_alias_file(tmp_path):
+    legacy_path = str(tmp_path / "collection_aliases.json")
+    CollectionAlias(legacy_path).swap("documents", "documents_v20250101120000")
+
+    alias = ChromaCollectionAlias(chromadb.PersistentClient(path=str(tmp_path / "server")), legacy_path=legacy_path)
+    assert alias.resolve("documents") == "documents_v20250101120000"
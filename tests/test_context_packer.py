@@ -0,0 +1,63 @@
+from app.services.context_packer import ContextPacker
+
+
+def make_packer(**kwargs) -> ContextPacker:
+    """Sem tokenizer: 4 caracteres por token, independente de download do tiktoken"""
+    packer = ContextPacker(model="gpt-3.5-turbo", **kwargs)
+    packer._encoding_loaded = True
+    return packer
+
+
+def doc(content: str, score: float, source_file: str = None, chunk_index: int = None) -> dict:
+    metadata = {}
+    if source_file is not None:
+        metadata = {"source_file": source_file, "chunk_index": chunk_index}
+    return {"title": "Doc", "category": "Geral", "content": content, "similarity_score": score, "metadata": metadata}
+
+
+def test_context_stops_at_the_first_score_gap():
+    packer = make_packer(score_gap=0.15)
+    documents = [doc("b", 0.85), doc("a", 0.9), doc("c", 0.6), doc("d", 0.55)]
+
+    packed, _, stats = packer.pack(documents)
+
+    assert [d["content"] for d in packed] == ["a", "b"]
+    assert stats["dropped_by_score"] == 2
+
+
+def test_score_gap_keeps_min_documents():
+    packer = make_packer(score_gap=0.15, min_documents=2)
+    packed, _, stats = packer.pack([doc("a", 0.9), doc("b", 0.5), doc("c", 0.45)])
+
+    assert [d["content"] for d in packed] == ["a", "b", "c"]
+    assert stats["dropped_by_score"] == 0
+
+
+def test_adjacent_chunks_are_merged_without_repeating_the_overlap():
+    packer = make_packer()
+    documents = [
+        doc("primeiro trecho do texto compartilhado", 0.8, "a.txt", 0),
+        doc("texto compartilhado e continuação", 0.9, "a.txt", 1),
+        doc("chunk distante", 0.7, "a.txt", 3),
+        doc("outro arquivo", 0.6, "b.txt", 2)
+    ]
+
+    packed, _, stats = packer.pack(documents)
+
+    assert packed[0]["content"] == "primeiro trecho do texto compartilhado e continuação"
+    assert packed[0]["similarity_score"] == 0.9
+    assert packed[0]["metadata"]["merged_chunks"] == 2
+    assert [d["content"] for d in packed[1:]] == ["chunk distante", "outro arquivo"]
+    assert stats["chunks_merged"] == 1
+
+
+def test_budget_truncates_the_first_block_and_drops_the_rest():
+    packer = make_packer(max_tokens=30)
+    packed, context_text, stats = packer.pack([doc("x" * 400, 0.9), doc("y" * 400, 0.88)])
+
+    assert len(packed) == 1 and packed[0]["content"].startswith("x")
+    assert len(packed[0]["content"]) < 400
+    assert stats["dropped_by_budget"] == 1
+    assert stats["context_tokens"] <= 30
+    assert stats["tokens_saved"] == stats["baseline_tokens"] - stats["context_tokens"]
+    assert "y" not in context_text
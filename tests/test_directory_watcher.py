@@ -0,0 +1,137 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import app.services.directory_watcher as directory_watcher_module
+from app.services.directory_watcher import DirectoryWatcher
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(directory_watcher_module, "time", SimpleNamespace(monotonic=clock.monotonic, time=time.time))
+    return clock
+
+
+@pytest.fixture
+def make_watcher(tmp_path):
+    def make(debounce: float = 2.0, fail: bool = False):
+        batches = []
+
+        async def on_change(paths):
+            if fail and not batches:
+                batches.append(None)
+                raise RuntimeError("índice indisponível")
+            batches.append(paths)
+            return {"success": True}
+
+        watcher = DirectoryWatcher(str(tmp_path), on_change, interval=0.01, debounce=debounce)
+        watcher._known = watcher._scan()
+        return watcher, batches
+
+    return make
+
+
+def poll(watcher):
+    return asyncio.run(watcher.poll())
+
+
+def test_changes_are_dispatched_only_after_the_debounce(tmp_path, clock, make_watcher):
+    watcher, batches = make_watcher(debounce=2.0)
+    path = tmp_path / "ferias.txt"
+    path.write_text("v1", encoding="utf-8")
+    poll(watcher)
+
+    clock.now += 1.5
+    path.write_text("versão 2", encoding="utf-8")
+    poll(watcher)
+    clock.now += 1.5
+    poll(watcher)
+    assert batches == []  # a segunda escrita reiniciou o debounce
+
+    clock.now += 0.5
+    poll(watcher)
+    assert batches == [[str(path)]]
+    poll(watcher)
+    assert len(batches) == 1
+    assert watcher.stats()["files_indexed"] == 1
+
+
+def test_deleted_file_is_dispatched_as_a_removal(tmp_path, clock, make_watcher):
+    path = tmp_path / "senhas.txt"
+    path.write_text("senhas", encoding="utf-8")
+    watcher, batches = make_watcher(debounce=0.0)
+
+    path.unlink()
+    poll(watcher)
+    assert batches == [[str(path)]]
+    stats = watcher.stats()
+    assert (stats["files_removed"], stats["files_indexed"], stats["tracked_files"]) == (1, 0, 0)
+
+
+def test_file_renamed_mid_scan_is_picked_up_under_its_new_name(tmp_path, clock, make_watcher, monkeypatch):
+    old = tmp_path / "rascunho.txt"
+    old.write_text("conteúdo", encoding="utf-8")
+    watcher, batches = make_watcher(debounce=0.0)
+    new = tmp_path / "final.txt"
+    scandir = os.scandir
+
+    class RenamingScandir:
+        """Renomeia o arquivo entre a listagem do diretório e o stat da entrada"""
+
+        def __init__(self, path):
+            self.entries = list(scandir(path))
+            old.rename(new)
+
+        def __iter__(self):
+            return iter(self.entries)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(directory_watcher_module.os, "scandir", RenamingScandir)
+    poll(watcher)
+    monkeypatch.setattr(directory_watcher_module.os, "scandir", scandir)
+    assert batches == [[str(old)]]
+
+    poll(watcher)
+    assert batches == [[str(old)], [str(new)]]
+    assert watcher.stats()["files_removed"] == 1
+
+
+def test_failed_batch_is_retried_without_a_new_debounce(tmp_path, clock, make_watcher):
+    watcher, batches = make_watcher(debounce=2.0, fail=True)
+    path = tmp_path / "reembolso.txt"
+    path.write_text("reembolso", encoding="utf-8")
+    poll(watcher)
+    clock.now += 2.0
+    poll(watcher)
+    assert batches == [None]
+    assert watcher.stats()["errors"] == 1
+
+    poll(watcher)
+    assert batches == [None, [str(path)]]
+
+
+def test_missing_directory_is_not_treated_as_deleting_every_file(tmp_path, clock, make_watcher):
+    (tmp_path / "ferias.txt").write_text("férias", encoding="utf-8")
+    watcher, batches = make_watcher(debounce=0.0)
+    watcher.directory = str(tmp_path / "desmontado")
+
+    assert poll(watcher) is None
+    assert batches == []
+    assert watcher.stats()["tracked_files"] == 1
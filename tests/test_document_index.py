@@ -0,0 +1,46 @@
+import json
+
+import chromadb
+import numpy as np
+
+from app.services.document_index import DocumentIndex, document_key
+
+
+def make_index(tmp_path) -> DocumentIndex:
+    client = chromadb.PersistentClient(path=str(tmp_path))
+    return DocumentIndex(
+        client.get_or_create_collection("documents__docs", metadata={"hnsw:space": "cosine"}),
+        encode=lambda texts: [[1.0, 0.0, 0.0] for _ in texts]
+    )
+
+
+def stored(index: DocumentIndex, key: str):
+    entry = index.collection.get(ids=[key], include=["metadatas", "embeddings"])
+    return json.loads(entry["metadatas"][0]["chunk_ids"]), np.asarray(entry["embeddings"][0])
+
+
+def test_same_file_name_in_different_directories_are_different_documents():
+    first = {"title": "Política", "source_file": "politica.txt", "file_path": "/docs/rh/politica.txt"}
+    second = {"title": "Política", "source_file": "politica.txt", "file_path": "/docs/ti/politica.txt"}
+    assert document_key(first) != document_key(second)
+    assert document_key({"title": "Política - Chunk 2", "source_file": "politica.txt"}) == "politica.txt"
+
+
+def test_chunks_from_later_batches_are_added_to_the_document(tmp_path):
+    single = make_index(tmp_path / "single")
+    single.add("doc", "Doc", "Geral", ["a", "b"], [[0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+    single.flush()
+
+    batched = make_index(tmp_path / "batched")
+    batched.add("doc", "Doc", "Geral", ["a"], [[0.0, 1.0, 0.0]])
+    batched.flush()
+    batched.add("doc", "Doc", "Geral", ["b"], [[0.0, 0.0, 1.0]])
+    batched.flush()
+    # Chunk repetido (re-upsert) não conta duas vezes
+    batched.add("doc", "Doc", "Geral", ["a"], [[0.0, 1.0, 0.0]])
+    batched.flush()
+
+    chunk_ids, embedding = stored(batched, "doc")
+    assert chunk_ids == ["a", "b"]
+    assert np.allclose(embedding, stored(single, "doc")[1], atol=1e-6)
+    assert len(batched) == 1
@@ -0,0 +1,80 @@
+import re
+
+import pytest
+
+from conftest import make_document
+
+
+class WordTokenizer:
+    """Tokenizer de palavras com a interface do HuggingFace usada pelo DocumentProcessor ([CLS] ... [SEP])"""
+
+    def __call__(self, text, add_special_tokens: bool = True, return_offsets_mapping: bool = False):
+        if isinstance(text, list):
+            return {"input_ids": [self(item, add_special_tokens)["input_ids"] for item in text]}
+        offsets = [match.span() for match in re.finditer(r"\S+", text)]
+        ids = list(range(1000, 1000 + len(offsets)))
+        encoding = {"input_ids": [101] + ids + [102] if add_special_tokens else ids}
+        if return_offsets_mapping:
+            encoding["offset_mapping"] = offsets
+        return encoding
+
+
+def words(count: int, start: int = 0) -> str:
+    return " ".join(f"palavra{i}" for i in range(start, start + count))
+
+
+@pytest.fixture
+def token_processor(vector_settings, offline_document_processor):
+    def make(max_seq_length: int = 32, **fields):
+        vector_settings(chunking_mode="tokens", **fields)
+        return offline_document_processor(embedding_tokenizer=WordTokenizer(), max_seq_length=max_seq_length)
+
+    return make
+
+
+def test_chunk_size_leaves_room_for_special_tokens(token_processor):
+    processor = token_processor(max_seq_length=32, chunk_max_tokens=0, chunk_overlap_tokens=8)
+    assert (processor.chunking_mode, processor.chunk_size, processor.chunk_overlap) == ("tokens", 30, 8)
+    assert processor.pipeline_fingerprint() == "chunks=tokens:30/8"
+
+    capped = token_processor(max_seq_length=32, chunk_max_tokens=20, chunk_overlap_tokens=50)
+    assert (capped.chunk_size, capped.chunk_overlap) == (20, 10)
+
+
+def test_every_chunk_fits_the_encoder_window(token_processor):
+    processor = token_processor(max_seq_length=32, chunk_max_tokens=0, chunk_overlap_tokens=4)
+    document = make_document("Manual", "RH", words(200))
+
+    chunks = processor.chunk_document(document)
+    assert len(chunks) > 1
+    assert all(processor.count_tokens(chunk.content) <= processor.chunk_size for chunk in chunks)
+    assert [chunk.metadata["chunk_index"] for chunk in chunks] == list(range(len(chunks)))
+
+    stats = processor.token_stats([chunk.content for chunk in chunks])
+    assert stats["chunks_truncated"] == 0
+    assert stats["tokens_max"] <= 32
+
+
+def test_over_budget_chunk_is_cut_at_token_boundaries(token_processor):
+    processor = token_processor(max_seq_length=12, chunk_max_tokens=0, chunk_overlap_tokens=0)
+    chunk = words(25)
+
+    pieces = processor._enforce_token_budget([chunk, words(3)])
+    assert [processor.count_tokens(piece) for piece in pieces] == [10, 10, 5, 3]
+    # Cortes só entre tokens: o texto original é preservado
+    assert " ".join(pieces[:3]) == chunk
+
+
+def test_token_stats_report_truncation(token_processor):
+    processor = token_processor(max_seq_length=12)
+    stats = processor.token_stats([words(20), words(5)])
+    assert stats == {
+        "chunks": 2, "tokens_total": 29, "tokens_max": 22, "chunks_truncated": 1, "tokens_truncated": 10
+    }
+
+
+def test_without_tokenizer_falls_back_to_characters(vector_settings, offline_document_processor):
+    vector_settings(chunking_mode="tokens")
+    processor = offline_document_processor()
+    assert (processor.chunking_mode, processor.chunk_size) == ("characters", 500)
+    assert processor.token_stats(["texto"]) is None
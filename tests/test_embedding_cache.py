@@ -0,0 +1,100 @@
+import os
+
+import numpy as np
+
+from app.services.embedding_cache import EmbeddingCache
+
+DIM = 4
+
+
+def vectors(*values):
+    return np.asarray([[value] * DIM for value in values], dtype=np.float32)
+
+
+def test_reload_sees_shards_written_by_another_process(tmp_path):
+    serving = EmbeddingCache(str(tmp_path), dim=DIM)
+    admin = EmbeddingCache(str(tmp_path), dim=DIM)
+    admin.put_many(["a"], vectors(1.0))
+    admin.flush()
+
+    assert serving.get_many(["a"]) == [None]
+    serving.reload()
+    assert np.allclose(serving.get_many(["a"])[0], 1.0)
+
+
+def test_flush_keeps_rows_written_by_another_process(tmp_path):
+    first = EmbeddingCache(str(tmp_path), dim=DIM)
+    second = EmbeddingCache(str(tmp_path), dim=DIM)
+    first.put_many(["a"], vectors(1.0))
+    first.flush()
+    second.put_many(["b"], vectors(2.0))
+    second.flush()
+
+    found = EmbeddingCache(str(tmp_path), dim=DIM).get_many(["a", "b"])
+    assert np.allclose(found[0], 1.0) and np.allclose(found[1], 2.0)
+
+
+def test_pending_vectors_are_flushed_at_max_pending(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), dim=DIM, max_pending=2)
+    cache.put_many(["a"], vectors(1.0))
+    assert len(cache._pending) == 1
+    cache.put_many(["b", "c"], vectors(2.0, 3.0))
+
+    assert not cache._pending
+    assert len(EmbeddingCache(str(tmp_path), dim=DIM)) == 3
+
+
+def test_flush_appends_without_rewriting_the_segment(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), dim=DIM)
+    cache.put_many(["a", "b"], vectors(1.0, 2.0))
+    cache.flush()
+    [vectors_path] = tmp_path.glob("segment_*.f32")
+    before = os.stat(vectors_path)
+    head = vectors_path.read_bytes()
+
+    cache.put_many(["c"], vectors(3.0))
+    cache.flush()
+    after = os.stat(vectors_path)
+    assert after.st_ino == before.st_ino
+    assert after.st_size == 3 * DIM * 4
+    assert vectors_path.read_bytes()[:len(head)] == head
+    assert np.allclose(cache.get_many(["c"])[0], 3.0)
+
+
+def test_segments_roll_over_at_shard_size(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), dim=DIM, shard_size=2)
+    cache.put_many(["a", "b", "c"], vectors(1.0, 2.0, 3.0))
+    cache.flush()
+
+    assert len(list(tmp_path.glob("segment_*.f32"))) == 2
+    reloaded = EmbeddingCache(str(tmp_path), dim=DIM)
+    assert [float(vector[0]) for vector in reloaded.get_many(["a", "b", "c"])] == [1.0, 2.0, 3.0]
+
+
+def test_interrupted_append_is_ignored(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), dim=DIM)
+    cache.put_many(["a"], vectors(1.0))
+    cache.flush()
+    [vectors_path] = tmp_path.glob("segment_*.f32")
+    keys_path = vectors_path.with_suffix(".keys")
+    # Vetor gravado sem chave e chave pela metade (processo interrompido no meio do flush)
+    with open(vectors_path, "ab") as f:
+        f.write(vectors(2.0).tobytes())
+    with open(keys_path, "a", encoding="utf-8") as f:
+        f.write("b")
+
+    reloaded = EmbeddingCache(str(tmp_path), dim=DIM)
+    assert len(reloaded) == 1
+    assert reloaded.get_many(["b"]) == [None]
+
+    # O desalinhamento não contamina novas gravações: a instância passa para outro segmento
+    cache.put_many(["c"], vectors(3.0))
+    cache.flush()
+    assert np.allclose(EmbeddingCache(str(tmp_path), dim=DIM).get_many(["c"])[0], 3.0)
+
+
+def test_shards_from_the_previous_format_are_read(tmp_path):
+    np.save(tmp_path / "shard_00000.npy", vectors(1.0))
+    (tmp_path / "shard_00000.keys").write_text("a\n", encoding="utf-8")
+
+    assert np.allclose(EmbeddingCache(str(tmp_path), dim=DIM).get_many(["a"])[0], 1.0)
@@ -0,0 +1,26 @@
+import asyncio
+
+from conftest import HashingEncoder, make_document
+import app.services.federated_search_service as federated_module
+from app.services.federated_search_service import FederatedSearchService
+from app.core.config import settings
+from app.services.vector_service import VectorService
+
+
+def test_models_are_loaded_at_startup_and_unknown_collections_are_reported(vector_settings, monkeypatch):
+    monkeypatch.setattr(federated_module, "SentenceTransformer", HashingEncoder)
+    monkeypatch.setattr(federated_module, "_MODELS", {})
+    vector_settings(federated_sources=[
+        {"name": "principal"},
+        {"name": "e5", "collection": "documentz", "model": "intfloat/multilingual-e5-small"}
+    ])
+    vector_service = VectorService()
+    asyncio.run(vector_service.add_document(make_document("Reembolso", "Financeiro", "Despesas de viagem.")))
+
+    service = FederatedSearchService(vector_service)
+    assert set(federated_module._MODELS) == {settings.embedding_model, "intfloat/multilingual-e5-small"}
+
+    response = asyncio.run(service.search("despesas de viagem"))
+    statuses = {report["name"]: report["status"] for report in response["search_metadata"]["sources"]}
+    assert statuses == {"principal": "ok", "e5": "unknown_source"}
+    assert "documentz" not in vector_service.collection_names()
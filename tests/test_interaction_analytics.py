@@ -0,0 +1,80 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import app.services.interaction_analytics as interaction_analytics_module
+from app.models.rag_interaction import Base, RAGInteractionDB
+from app.services.interaction_analytics import InteractionAnalytics
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Banco SQLite temporário no lugar do rag_interactions.db; retorna uma função que grava interações"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'interactions.db'}")
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    monkeypatch.setattr(interaction_analytics_module, "AsyncSessionLocal", session_factory)
+
+    async def create_tables():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_tables())
+    counter = iter(range(1_000_000))
+
+    def add(*rows):
+        async def insert():
+            async with session_factory() as session:
+                for fields in rows:
+                    fields = {"timestamp": datetime.utcnow(), **fields}
+                    session.add(RAGInteractionDB(id=str(next(counter)), question="q", answer="a", **fields))
+                await session.commit()
+
+        asyncio.run(insert())
+
+    yield add
+    asyncio.run(engine.dispose())
+
+
+def performance(group_by, **kwargs):
+    return asyncio.run(InteractionAnalytics().performance(group_by, **kwargs))
+
+
+def test_nearest_rank_percentiles_per_group(store):
+    store(*[{"category": "Financeiro", "llm_ms": float(value), "prompt_tokens": 10} for value in range(1, 21)])
+    store(*[{"category": "RH", "llm_ms": float(value)} for value in (40, 10, 30, 20)])
+
+    finance, hr = performance(["category"], metric="llm_ms")
+    assert finance["group"] == {"category": "Financeiro"}
+    assert (finance["samples"], finance["p50"], finance["p95"], finance["p99"]) == (20, 10.0, 19.0, 20.0)
+    assert (finance["mean"], finance["prompt_tokens"], finance["avg_prompt_tokens"]) == (10.5, 200, 10.0)
+    # n=4: p50 é o 2º menor valor; p95/p99 arredondam a posição para cima (o maior)
+    assert (hr["samples"], hr["p50"], hr["p95"], hr["p99"]) == (4, 20.0, 40.0, 40.0)
+
+
+def test_group_without_samples_still_reports_its_interactions(store):
+    store({"category": "Financeiro", "ttft_ms": 120.0}, {"category": "Financeiro", "ttft_ms": None})
+    store({"category": None, "ttft_ms": None}, {"category": None, "ttft_ms": None})
+
+    rows = {row["group"]["category"]: row for row in performance(["category"], metric="ttft_ms")}
+    assert rows["Financeiro"]["interactions"] == 2
+    assert (rows["Financeiro"]["samples"], rows["Financeiro"]["p50"]) == (1, 120.0)
+    empty = rows["sem categoria"]
+    assert (empty["interactions"], empty["samples"]) == (2, 0)
+    assert (empty["mean"], empty["p50"], empty["p95"], empty["p99"]) == (None, None, None, None)
+
+
+def test_without_group_and_with_window(store):
+    old = datetime.utcnow() - timedelta(hours=48)
+    store({"response_time": 0.5, "timestamp": old}, {"response_time": 0.1}, {"response_time": 0.3})
+
+    [recent] = performance([], since_hours=24)
+    assert (recent["group"], recent["interactions"], recent["p50"], recent["p99"]) == ({}, 2, 100.0, 300.0)
+    [everything] = performance([], since_hours=None)
+    assert (everything["interactions"], everything["p50"]) == (3, 300.0)
+
+
+def test_no_interactions_returns_no_rows(store):
+    assert performance(["time", "model"], bucket="day") == []
@@ -0,0 +1,25 @@
+from app.services.lexical_index import BM25Index
+
+
+def test_reindexed_ids_replace_their_row(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add(["a", "b"], ["reembolso de viagem", "troca de senha"], ["Financeiro", "Segurança"])
+    index.add(["a", "a"], ["reembolso antigo", "reembolso de hospedagem"], ["Financeiro", "Financeiro"])
+    index.save()
+
+    reloaded = BM25Index(str(tmp_path))
+    assert sorted(reloaded.ids) == ["a", "b"]
+    assert [doc_id for doc_id, _ in reloaded.search("hospedagem")] == ["a"]
+    assert reloaded.search("viagem") == []
+    reloaded.add(["a"], ["reembolso de viagem"], ["Financeiro"])
+    assert len(reloaded) == 2
+
+
+def test_category_filter(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add(["a", "b"], ["prazo de reembolso", "prazo de senha"], ["Financeiro", "Segurança"])
+
+    assert [doc_id for doc_id, _ in index.search("prazo", category_filter="Segurança")] == ["b"]
+    assert index.search("prazo", category_filter="Inexistente") == []
+    index.add(["c"], ["prazo de férias"], ["RH"])
+    assert [doc_id for doc_id, _ in index.search("prazo", category_filter="RH")] == ["c"]
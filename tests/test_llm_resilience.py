@@ -0,0 +1,123 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.llm_resilience import CircuitBreaker, ResilientCaller, LLMUnavailableError
+from app.services.llm_scheduler import LLMScheduler
+
+
+def hedging_caller(scheduler=None) -> ResilientCaller:
+    """Hedging depois de 10 ms (latências observadas já no mínimo de amostras)"""
+    caller = ResilientCaller(deadline=5.0, hedge_percentile=50, hedge_min_samples=1, scheduler=scheduler)
+    caller._latencies.append(0.01)
+    return caller
+
+
+def test_first_response_wins_and_the_slow_call_is_cancelled():
+    calls = []
+
+    async def factory():
+        attempt = len(calls)
+        calls.append("started")
+        try:
+            await asyncio.sleep(1.0 if attempt == 0 else 0.02)
+            return f"call-{attempt}"
+        except asyncio.CancelledError:
+            calls[attempt] = "cancelled"
+            raise
+
+    async def scenario():
+        caller = hedging_caller()
+        result = await caller.call(factory)
+        await asyncio.sleep(0)
+        return result, caller.stats()
+
+    result, stats = asyncio.run(scenario())
+    assert result == "call-1"
+    assert calls == ["cancelled", "started"]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_hedged_calls_never_exceed_the_scheduler_limit():
+    in_flight, peak = 0, 0
+
+    async def factory():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            await asyncio.sleep(0.05)
+            return "ok"
+        finally:
+            in_flight -= 1
+
+    async def scenario():
+        scheduler = LLMScheduler(
+            max_concurrency=2,
+            class_limits={"interactive": 2},
+            priorities={"interactive": 0},
+            queue_budgets={"interactive": 5.0}
+        )
+        caller = hedging_caller(scheduler)
+
+        async def ask():
+            async with scheduler.slot("interactive"):
+                return await caller.call(factory, llm_class="interactive")
+
+        # Uma pergunta sozinha tem slot livre para a chamada redundante
+        await ask()
+        assert peak == 2
+        await asyncio.gather(*[ask() for _ in range(6)])
+        for _ in range(5):
+            await asyncio.sleep(0)
+        return caller.stats(), scheduler.stats()
+
+    caller_stats, scheduler_stats = asyncio.run(scenario())
+    assert peak == 2
+    assert caller_stats["hedge_skipped"] > 0
+    assert scheduler_stats["in_use"] == 0
+
+
+def test_timeout_counts_as_failure():
+    async def factory():
+        await asyncio.sleep(1.0)
+
+    async def scenario():
+        caller = ResilientCaller(deadline=0.02)
+        with pytest.raises(LLMUnavailableError) as error:
+            await caller.call(factory)
+        return error.value, caller.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.error_code == "LLM_TIMEOUT"
+    assert stats["timeouts"] == 1
+    assert stats["circuit_breaker"]["consecutive_failures"] == 1
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(LLMUnavailableError) as error:
+        breaker.check()
+    assert error.value.error_code == "LLM_CIRCUIT_OPEN"
+
+    time.sleep(0.06)
+    breaker.check()
+    assert breaker.state == "half_open"
+    # Só uma chamada de teste por vez
+    with pytest.raises(LLMUnavailableError):
+        breaker.check()
+
+    # Falha no teste reabre o circuito
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    breaker.check()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.check()
+    assert breaker.stats()["times_opened"] == 2
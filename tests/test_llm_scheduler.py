@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from app.services.llm_scheduler import LLMScheduler, LLMOverloadedError
+
+
+def make_scheduler(max_concurrency: int = 1, budget: float = 5.0) -> LLMScheduler:
+    return LLMScheduler(
+        max_concurrency=max_concurrency,
+        class_limits={"interactive": max_concurrency, "evaluation": max_concurrency},
+        priorities={"interactive": 0, "evaluation": 1},
+        queue_budgets={"interactive": budget, "evaluation": budget}
+    )
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_interactive_requests_go_before_queued_evaluations():
+    async def scenario():
+        scheduler = make_scheduler()
+        order = []
+        release = asyncio.Event()
+
+        async def request(llm_class, name, hold=None):
+            async with scheduler.slot(llm_class):
+                order.append(name)
+                if hold:
+                    await hold.wait()
+
+        holder = asyncio.create_task(request("interactive", "holder", release))
+        await settle()
+        evaluation = asyncio.create_task(request("evaluation", "evaluation"))
+        await settle()
+        interactive = asyncio.create_task(request("interactive", "interactive"))
+        await settle()
+        release.set()
+        await asyncio.gather(holder, evaluation, interactive)
+        return order, scheduler.stats()
+
+    order, stats = asyncio.run(scenario())
+    assert order == ["holder", "interactive", "evaluation"]
+    assert stats["in_use"] == 0 and stats["queue_depth"] == 0
+
+
+def test_cancelled_requests_release_their_slots():
+    async def scenario():
+        scheduler = make_scheduler()
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await settle()
+        waiting = asyncio.create_task(hold())
+        await settle()
+        assert scheduler.stats()["queue_depth"] == 1
+
+        # Um na fila e outro com o slot concedido desistem
+        waiting.cancel()
+        holder.cancel()
+        await asyncio.gather(holder, waiting, return_exceptions=True)
+
+        async with scheduler.slot():
+            pass
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_use"] == 0 and stats["queue_depth"] == 0
+
+
+def test_request_is_rejected_when_the_estimated_wait_exceeds_the_budget():
+    async def scenario():
+        scheduler = make_scheduler(budget=0.5)
+        scheduler._record_service_time("interactive", 1.0)
+        async with scheduler.slot():
+            with pytest.raises(LLMOverloadedError) as error:
+                async with scheduler.slot():
+                    pass
+        return error.value, scheduler.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.error_code == "LLM_OVERLOADED"
+    assert stats["classes"]["interactive"]["rejected"] == 1
+
+
+def test_admitted_request_times_out_in_the_queue():
+    async def scenario():
+        scheduler = make_scheduler(budget=0.05)
+        async with scheduler.slot():
+            with pytest.raises(LLMOverloadedError) as error:
+                async with scheduler.slot():
+                    pass
+        return error.value, scheduler.stats()
+
+    error, stats = asyncio.run(scenario())
+    assert error.error_code == "LLM_QUEUE_TIMEOUT"
+    assert stats["classes"]["interactive"]["timed_out"] == 1
+    assert stats["in_use"] == 0 and stats["queue_depth"] == 0
+
+
+def test_try_acquire_never_passes_queued_requests():
+    async def scenario():
+        scheduler = make_scheduler(max_concurrency=2)
+
+        async def evaluation():
+            async with scheduler.slot("evaluation", weight=2):
+                pass
+
+        async with scheduler.slot():
+            assert scheduler.try_acquire()
+            assert not scheduler.try_acquire()
+            scheduler.release()
+
+            # Avaliação de peso 2 esperando: o slot livre fica reservado para ela
+            waiting = asyncio.create_task(evaluation())
+            await settle()
+            assert not scheduler.try_acquire()
+        await waiting
+        return scheduler.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["in_use"] == 0
@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+
+from app.routes.metrics import router
+from app.services.metrics import StageTimer, runtime_collector
+
+
+@pytest.fixture
+def scrape():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+
+    def get():
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        return {
+            (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+            for family in text_string_to_metric_families(response.text)
+            for sample in family.samples
+        }
+
+    return get
+
+
+def value(samples, name, **labels):
+    return samples.get((name, tuple(sorted(labels.items()))), 0.0)
+
+
+def test_stage_timer_feeds_the_histograms_and_error_counter(scrape):
+    before = scrape()
+    timer = StageTimer()
+    with timer.stage("search"):
+        pass
+    with pytest.raises(ValueError):
+        with timer.stage("llm"):
+            raise ValueError("falhou")
+    after = scrape()
+
+    assert set(timer.timings_ms()) == {"search", "llm"}
+    for stage in ("search", "llm"):
+        count = "rag_stage_duration_seconds_count"
+        assert value(after, count, stage=stage) == value(before, count, stage=stage) + 1
+        assert value(after, "rag_stage_duration_seconds_bucket", stage=stage, le="+Inf") == value(after, count, stage=stage)
+    errors = "rag_errors_total"
+    assert value(after, errors, stage="llm", error="ValueError") == value(before, errors, stage="llm", error="ValueError") + 1
+
+
+def test_runtime_metrics_are_read_at_scrape_time(scrape, monkeypatch):
+    cache = type("Cache", (), {"hits": 3, "misses": 1, "__len__": lambda self: 7})()
+    service = SimpleNamespace(coalescing_stats={"executions": 4, "coalesced": 2}, _in_flight={("pergunta",): None})
+    monkeypatch.setattr(runtime_collector, "_caches", [("query_embeddings", cache)])
+    monkeypatch.setattr(runtime_collector, "_rag_services", [service])
+
+    samples = scrape()
+    assert value(samples, "rag_llm_queue_depth", llm_class="interactive") == 0
+    assert value(samples, "rag_llm_slots_in_use", llm_class="evaluation") == 0
+    assert sum(value(samples, "rag_llm_circuit_state", state=state) for state in ("closed", "open", "half_open")) == 1
+    assert value(samples, "rag_cache_hits_total", cache="query_embeddings") == 3
+    assert value(samples, "rag_cache_entries", cache="query_embeddings") == 7
+    assert value(samples, "rag_pipeline_runs_total", kind="executed") == 4
+    assert value(samples, "rag_pipeline_runs_total", kind="coalesced") == 2
+    assert value(samples, "rag_pipelines_in_flight") == 1
+
+    # Os valores acompanham o estado no momento da coleta
+    service.coalescing_stats["coalesced"] += 1
+    assert value(scrape(), "rag_pipeline_runs_total", kind="coalesced") == 3
@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.services.near_duplicate_index import NearDuplicateIndex, lsh_bands
+
+POLICY = (
+    "O reembolso de despesas de viagem exige nota fiscal, aprovação do gestor imediato "
+    "e envio do formulário em até trinta dias após o retorno da viagem corporativa."
+)
+
+
+def candidate_probability(similarity: float, bands: int, rows: int) -> float:
+    return 1 - (1 - similarity ** rows) ** bands
+
+
+def test_lsh_bands_put_the_s_curve_at_the_threshold():
+    bands, rows = lsh_bands(0.85, 128)
+    assert bands * rows <= 128
+    assert candidate_probability(0.95, bands, rows) > 0.95
+    assert candidate_probability(0.5, bands, rows) < 0.05
+
+    # Limiar mais baixo: bandas menores (mais candidatos)
+    low_bands, low_rows = lsh_bands(0.5, 128)
+    assert low_rows < rows
+
+
+def test_near_duplicates_are_found_and_distinct_text_is_not(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path), threshold=0.8)
+    index.add("policy", POLICY)
+    index.add("security", "Senhas devem ser trocadas a cada noventa dias e bloqueiam o acesso após cinco tentativas.")
+
+    found = index.find(POLICY.upper() + " ")
+    assert found is not None and found[0] == "policy" and found[1] >= 0.8
+    assert index.find("Férias são marcadas com sessenta dias de antecedência no portal do colaborador.") is None
+    # O próprio chunk não conta como duplicata dele mesmo
+    assert index.find(POLICY, exclude_id="policy") is None
+
+
+def test_removed_chunks_stop_matching_and_index_survives_reload(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path), threshold=0.8)
+    index.add("policy", POLICY)
+    index.add("copy", POLICY)
+    index.remove(["policy"])
+    index.save()
+
+    reloaded = NearDuplicateIndex(str(tmp_path), threshold=0.8)
+    assert len(reloaded) == 1
+    assert reloaded.find(POLICY)[0] == "copy"
+    assert np.array_equal(reloaded.signature(POLICY), index.signature(POLICY))
+
+    # Outros parâmetros invalidam o índice salvo
+    assert len(NearDuplicateIndex(str(tmp_path), threshold=0.9)) == 0
+
+
+def test_reload_replaces_the_state_with_what_another_process_saved(tmp_path):
+    serving = NearDuplicateIndex(str(tmp_path), threshold=0.8)
+    serving.add("stale", "Senhas devem ser trocadas a cada noventa dias e bloqueiam o acesso após cinco tentativas.")
+    admin = NearDuplicateIndex(str(tmp_path), threshold=0.8)
+    admin.add("policy", POLICY)
+    admin.save()
+
+    serving.reload()
+    assert len(serving) == 1
+    assert serving.find(POLICY)[0] == "policy"
+    assert serving.find("Senhas devem ser trocadas a cada noventa dias e bloqueiam o acesso após cinco tentativas.") is None
@@ -0,0 +1,48 @@
+import numpy as np
+
+from app.services.quantized_index import QuantizedIndex
+
+
+def unit_vectors(count: int, dim: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_add_existing_id_overwrites_row(tmp_path):
+    index = QuantizedIndex(str(tmp_path), dim=16, mode="int8")
+    first, second = unit_vectors(2, 16, seed=1)
+    index.add(["a", "b"], [first, second], ["x", "x"])
+    index.add(["a"], [second], ["y"])
+
+    assert len(index) == 2
+    assert index.search(second, limit=5)[0][1] > 0.99
+    assert [doc_id for doc_id, _ in index.search(second, limit=5, category_filter="y")] == ["a"]
+
+    reopened = QuantizedIndex(str(tmp_path), dim=16, mode="int8")
+    assert reopened.ids == ["a", "b"] and reopened.categories == ["y", "x"]
+
+
+def test_reload_sees_vectors_written_by_another_instance(tmp_path):
+    serving = QuantizedIndex(str(tmp_path), dim=16, mode="binary")
+    writer = QuantizedIndex(str(tmp_path), dim=16, mode="binary")
+    vectors = unit_vectors(3, 16, seed=2)
+    writer.add(["a", "b", "c"], vectors, ["x", "x", "x"])
+
+    assert serving.search(vectors[0], limit=1) == []
+    serving.reload()
+    assert serving.search(vectors[0], limit=1)[0][0] == "a"
+
+
+def test_category_filter_follows_add_remove_and_reload(tmp_path):
+    index = QuantizedIndex(str(tmp_path), dim=16, mode="int8")
+    vectors = unit_vectors(4, 16, seed=3)
+    index.add(["a", "b", "c"], vectors[:3], ["x", "y", "x"])
+    index.remove(["a"])
+    index.add(["d"], vectors[3:], ["z"])
+
+    assert [doc_id for doc_id, _ in index.search(vectors[0], limit=5, category_filter="x")] == ["c"]
+    assert [doc_id for doc_id, _ in index.search(vectors[3], limit=5, category_filter="z")] == ["d"]
+    assert index.search(vectors[0], limit=5, category_filter="w") == []
+
+    index.reload()
+    assert sorted(doc_id for doc_id, _ in index.search(vectors[1], limit=5, category_filter="y")) == ["b"]
@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langchain.schema")
+from app.core.config import settings
+from app.models.document import DocumentResponse
+from app.services.context_packer import ContextPacker
+from app.services.llm_service import LLMService
+from app.services.rag_service import RAGService
+
+
+def chunk(content: str, score: float, index: int) -> DocumentResponse:
+    return DocumentResponse(
+        id=f"reembolso-{index}", title=f"Reembolso - Chunk {index + 1}", category="Financeiro", content=content,
+        metadata={"source_file": "reembolso.txt", "chunk_index": index}, similarity_score=score
+    )
+
+
+class StubVectorService:
+    context_compressor = None
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def encode_query(self, question):
+        return [0.0]
+
+    async def search_documents(self, **kwargs):
+        return self.documents
+
+
+@pytest.fixture
+def rag(monkeypatch):
+    monkeypatch.setattr(settings, "context_packing_enabled", True)
+    llm_service = LLMService.__new__(LLMService)
+    llm_service.context_packer = ContextPacker(model="gpt-3.5-turbo", max_tokens=1000, score_gap=0.3)
+    llm_service.context_packer._encoding_loaded = True  # 4 caracteres por token, sem tiktoken
+
+    async def invoke(messages):
+        return "Até 30 dias [Documento 1]", {}
+
+    llm_service._invoke = invoke
+    service = RAGService.__new__(RAGService)
+    service.llm_service = llm_service
+    return service
+
+
+def test_saved_contexts_are_the_packed_prompt_contexts(rag):
+    rag.vector_service = StubVectorService([
+        chunk("despesas de viagem são reembolsadas", 0.9, 0),
+        chunk("reembolsadas em até 30 dias", 0.85, 1),
+        chunk("texto pouco relevante", 0.2, 5)
+    ])
+
+    response, contexts = asyncio.run(rag._run_pipeline("Prazo do reembolso?", 5, None, None))
+
+    # Chunks vizinhos fundidos e o de score baixo cortado: o banco guarda o que o LLM leu
+    assert contexts == ["despesas de viagem são reembolsadas em até 30 dias"]
+    assert response["context_used"] == 1
+    assert "contexts" not in response
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain.schema")
+from app.core.config import settings
+from app.services.rag_service import RAGService
+
+
+class GatedPipeline:
+    """_run_pipeline falso: conta execuções e só termina quando o teste libera"""
+
+    def __init__(self, error: Exception = None):
+        self.calls = []
+        self.release = asyncio.Event()
+        self.error = error
+
+    async def __call__(self, question, max_documents, category_filter, search_mode):
+        self.calls.append(question)
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return {"answer": f"resposta {len(self.calls)}", "question": question, "has_context": False}, []
+
+
+@pytest.fixture
+def rag(monkeypatch):
+    monkeypatch.setattr(settings, "request_coalescing_enabled", True)
+    service = RAGService.__new__(RAGService)
+    service._in_flight = {}
+    service.coalescing_stats = {"executions": 0, "coalesced": 0}
+    return service
+
+
+def ask(rag, question, **kwargs):
+    return asyncio.ensure_future(rag.ask_question(question, save_interaction=False, **kwargs))
+
+
+def test_identical_questions_share_one_execution(rag):
+    async def scenario():
+        rag._run_pipeline = pipeline = GatedPipeline()
+        first = ask(rag, "Como pedir reembolso?")
+        second = ask(rag, "  como PEDIR reembolso? ")
+        other = ask(rag, "Como pedir reembolso?", category_filter="Financeiro")
+        await asyncio.sleep(0)
+        pipeline.release.set()
+        return pipeline, await asyncio.gather(first, second, other)
+
+    pipeline, (first, second, other) = asyncio.run(scenario())
+    assert len(pipeline.calls) == 2  # filtro diferente não compartilha a execução
+    assert first["answer"] == second["answer"]
+    assert (first["question"], second["question"]) == ("Como pedir reembolso?", "  como PEDIR reembolso? ")
+    assert rag.coalescing_stats == {"executions": 2, "coalesced": 1}
+    assert rag._in_flight == {}
+
+
+def test_cancelling_one_waiter_does_not_affect_the_others(rag):
+    async def scenario():
+        rag._run_pipeline = pipeline = GatedPipeline()
+        leader = ask(rag, "Quantos dias de férias?")
+        follower = ask(rag, "Quantos dias de férias?")
+        late = ask(rag, "Quantos dias de férias?")
+        await asyncio.sleep(0)
+
+        follower.cancel()
+        await asyncio.sleep(0)
+        pipeline.release.set()
+        results = await asyncio.gather(leader, late)
+        return pipeline, follower, results
+
+    pipeline, follower, (leader, late) = asyncio.run(scenario())
+    assert follower.cancelled()
+    assert len(pipeline.calls) == 1
+    assert leader["answer"] == late["answer"] == "resposta 1"
+
+
+def test_cancelled_leader_keeps_the_execution_running_for_followers(rag):
+    async def scenario():
+        rag._run_pipeline = pipeline = GatedPipeline()
+        leader = ask(rag, "Qual a política de senhas?")
+        await asyncio.sleep(0)
+        follower = ask(rag, "Qual a política de senhas?")
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        assert rag._in_flight  # a execução compartilhada não foi cancelada
+        pipeline.release.set()
+        return pipeline, leader, await follower
+
+    pipeline, leader, follower = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert len(pipeline.calls) == 1
+    assert follower["answer"] == "resposta 1"
+    assert rag._in_flight == {}
+
+
+def test_errors_reach_every_waiter_and_are_not_cached(rag):
+    async def scenario():
+        rag._run_pipeline = pipeline = GatedPipeline(error=RuntimeError("LLM fora do ar"))
+        waiters = [ask(rag, "Como pedir reembolso?") for _ in range(3)]
+        await asyncio.sleep(0)
+        pipeline.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        pipeline.error = None
+        retry = await ask(rag, "Como pedir reembolso?")
+        return pipeline, results, retry
+
+    pipeline, results, retry = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(pipeline.calls) == 2
+    assert retry["answer"] == "resposta 2"
@@ -0,0 +1,78 @@
+import socket
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+import pytest
+
+from app.services.shard_pool import ShardPool
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _BrokenConnection:
+    def send(self, message):
+        raise BrokenPipeError()
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def pool(tmp_path):
+    pool = ShardPool(1, str(tmp_path), "documents", {"hnsw:space": "cosine"}, base_port=free_port(), connections=1)
+    yield pool
+    pool.close()
+
+
+def test_pool_generates_a_secret_key_and_rejects_other_keys(pool):
+    address = pool.shards[0]._address
+    assert len(pool._authkey) == 64
+    with pytest.raises(AuthenticationError):
+        Client(address, authkey=b"rag-vector-shards")
+    assert pool.shards[0].count() == 0
+
+    with pytest.raises(RuntimeError, match="outra chave"):
+        ShardPool(1, pool.directory, "documents", {}, base_port=address[1], authkey="other-secret")
+
+
+def test_pools_on_the_same_directory_share_the_generated_key(pool):
+    # Um segundo worker do uvicorn, sem VECTOR_SHARD_AUTHKEY, reaproveita o shard em execução
+    address = pool.shards[0]._address
+    worker = ShardPool(1, pool.directory, "documents", {}, base_port=address[1], connections=1)
+    try:
+        assert worker._authkey == pool._authkey
+        assert worker._processes == []
+        assert worker.shards[0].count() == 0
+    finally:
+        worker.close()
+
+
+def test_connection_whose_reconnect_failed_is_not_returned_to_the_pool(pool):
+    shard = pool.shards[0]
+    shard._connections.get_nowait().close()
+    shard._connections.put(_BrokenConnection())
+    good_authkey, shard._authkey = shard._authkey, b"wrong-key"
+
+    with pytest.raises(AuthenticationError):
+        shard.count()
+    assert shard._connections.get_nowait() is None
+
+    # A vaga descartada é refeita na próxima chamada
+    shard._connections.put(None)
+    shard._authkey = good_authkey
+    assert shard.count() == 0
+    assert shard._connections.qsize() == 1
+
+
+
+def test_running_shard_of_another_collection_is_refused(pool):
+    address = pool.shards[0]._address
+    with pytest.raises(RuntimeError, match="coleção 'documents'"):
+        ShardPool(1, pool.directory, "other", {}, base_port=address[1], authkey=pool._authkey.decode())
+
+    reused = ShardPool(1, pool.directory, "documents", {}, base_port=address[1], authkey=pool._authkey.decode())
+    assert reused.shards[0].metadata["hnsw:space"] == "cosine"
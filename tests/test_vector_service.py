@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from conftest import make_document
+from app.services.vector_service import VectorService, chunk_id, get_vector_service
+
+FINANCE = "Política de reembolso: despesas de viagem são reembolsadas em até 30 dias após a aprovação."
+SECURITY = "Senhas devem ser trocadas a cada 90 dias e bloqueiam o acesso após 5 tentativas."
+
+
+def ingest(service: VectorService, *documents) -> None:
+    for document in documents:
+        asyncio.run(service.add_document(document))
+    service.flush_indexes()
+
+
+def search(service: VectorService, query: str, **kwargs):
+    return asyncio.run(service.search_documents(query, **kwargs))
+
+
+def test_admin_and_rag_share_one_vector_service(vector_settings):
+    vector_settings(category_partitioning=True)
+    assert get_vector_service() is get_vector_service()
+
+
+def test_partitions_created_by_another_instance_are_searchable(vector_settings):
+    """Ingestão em um processo (admin), consulta em outro (serving) aberto antes da carga"""
+    vector_settings(category_partitioning=True)
+    serving = VectorService()
+    admin = VectorService()
+    assert serving.partitions == {}
+
+    ingest(
+        admin,
+        make_document("Reembolso", "Financeiro", FINANCE),
+        make_document("Senhas", "Segurança", SECURITY)
+    )
+
+    filtered = search(serving, "reembolso de despesas de viagem", category_filter="Financeiro")
+    assert [doc.title for doc in filtered] == ["Reembolso"]
+    unfiltered = search(serving, "trocar senhas bloqueio de acesso", limit=2)
+    assert unfiltered[0].title == "Senhas"
+    assert set(serving.partitions) == {"Financeiro", "Segurança"}
+
+
+def test_rag_path_sees_documents_loaded_by_admin(vector_settings, tmp_path):
+    pytest.importorskip("spacy")
+    pytest.importorskip("langchain.schema")
+    from app.controllers.admin_controller import AdminController
+    from app.services.rag_service import RAGService
+
+    vector_settings(category_partitioning=True, llm_provider="fake", federated_sources=[])
+    rag_service = RAGService()
+    admin_controller = AdminController()
+
+    documents = tmp_path / "docs"
+    documents.mkdir()
+    (documents / "reembolso.txt").write_text(
+        f"Título: Reembolso\nCategoria: Financeiro\n{FINANCE}\n", encoding="utf-8"
+    )
+    result = asyncio.run(admin_controller.load_documents_from_directory(str(documents)))
+    assert result["success"] and result["total_chunks"] > 0
+
+    found = search(rag_service.vector_service, "reembolso de despesas de viagem", category_filter="Financeiro")
+    assert found and found[0].title.startswith("Reembolso")
+
+
+def test_quantized_index_is_backfilled_and_reloaded(vector_settings):
+    finance = make_document("Reembolso", "Financeiro", FINANCE)
+    ingest(VectorService(), finance)
+
+    # Modo ativado depois da ingestão: o índice quantizado é completado a partir do Chroma
+    vector_settings(vector_index_mode="int8")
+    serving = VectorService()
+    admin = VectorService()
+    assert len(serving.quantized_index) == 1
+
+    ingest(admin, make_document("Senhas", "Segurança", SECURITY), finance)
+    assert len(admin.quantized_index) == 2
+
+    found = search(serving, "trocar senhas bloqueio de acesso", limit=1)
+    assert [doc.title for doc in found] == ["Senhas"]
+    assert len(serving.quantized_index) == 2
+
+
+def test_router_uses_centroids_saved_by_another_instance(vector_settings):
+    vector_settings(category_routing=True, category_routing_min_similarity=0.1, category_routing_min_margin=0.0)
+    serving = VectorService()
+    admin = VectorService()
+    ingest(
+        admin,
+        make_document("Reembolso", "Financeiro", FINANCE),
+        make_document("Senhas", "Segurança", SECURITY)
+    )
+
+    serving.refresh()
+    routing = serving.category_router.route(serving.encode_query("reembolso de despesas de viagem"))
+    assert routing["reason"] == "confident"
+    assert routing["category"] == "Financeiro"
+
+
+def test_hybrid_search_finds_lexical_hits_ingested_by_another_instance(vector_settings):
+    serving = VectorService()
+    admin = VectorService()
+    ingest(
+        admin,
+        make_document("Reembolso", "Financeiro", FINANCE),
+        make_document("Normativo", "Compliance", "A política PLD-2023 define os controles de lavagem de dinheiro.")
+    )
+
+    found = search(serving, "PLD-2023", search_mode="hybrid", limit=1)
+    assert [doc.title for doc in found] == ["Normativo"]
+    assert [doc_id for doc_id, _ in serving.lexical_index.search("PLD-2023", 5)] == [found[0].id]
+
+
+def test_document_index_keeps_the_document_title(vector_settings):
+    """Chunks se chamam "X - Chunk N"; o nível de documento guarda o título original"""
+    vector_settings(document_index_enabled=True)
+    service = VectorService()
+    chunk = make_document("Reembolso - Chunk 1", "Financeiro", FINANCE)
+    chunk.metadata["document_title"] = "Reembolso"
+    legacy = make_document("Senhas - Chunk 2", "Segurança", SECURITY)
+    ingest(service, chunk, legacy)
+
+    stored = service.document_index.collection.get(include=["metadatas"])
+    assert sorted(metadata["title"] for metadata in stored["metadatas"]) == ["Reembolso", "Senhas"]
+
+
+def test_sentence_embeddings_precomputed_by_another_instance_are_used(vector_settings):
+    vector_settings(context_compression_enabled=True, context_compression_max_sentences=1)
+    serving = VectorService()
+    admin = VectorService()
+    content = f"{FINANCE} {SECURITY} O prazo começa na data do recibo."
+    ingest(admin, make_document("Reembolso", "Financeiro", content))
+
+    found = search(serving, "reembolso de despesas de viagem")
+    query_embedding = serving.embedding_model.encode("reembolso de despesas de viagem", normalize_embeddings=True)
+    _, stats = serving.context_compressor.compress(query_embedding.tolist(), found)
+    assert stats["sentences_in"] == 3
+    assert stats["encoded_at_query"] == 0
+
+
+def test_reingesting_a_chunk_does_not_count_it_twice(vector_settings):
+    vector_settings(category_routing=True, lexical_index_enabled=True)
+    service = VectorService()
+    finance = make_document("Reembolso", "Financeiro", FINANCE)
+    ingest(service, finance, make_document("Senhas", "Segurança", SECURITY))
+    centroids = service.category_router.summary()
+    ingest(service, finance)
+
+    assert service.category_router.summary() == centroids == {"Financeiro": 1, "Segurança": 1}
+    assert len(service.lexical_index) == 2
+    assert [doc_id for doc_id, _ in service.lexical_index.search("reembolso", 5)] == [chunk_id(finance)]
+    assert service.lexical_index.search("reembolso", 5, category_filter="Segurança") == []
+
+
+def test_duplicates_and_cached_embeddings_from_another_instance_are_reloaded(vector_settings):
+    vector_settings(dedup_enabled=True, embedding_cache_enabled=True)
+    serving = VectorService()
+    admin = VectorService()
+    finance = make_document("Reembolso", "Financeiro", FINANCE)
+    ingest(admin, finance)
+    copy = make_document("Cópia", "Financeiro", FINANCE)
+    assert serving.find_near_duplicate(copy) is None
+
+    serving.refresh()
+    assert serving.find_near_duplicate(copy)[0] == chunk_id(finance)
+    assert serving.embedding_cache.get_many([serving.embedding_cache.key(FINANCE)])[0] is not None